@@ -1,3 +1,15 @@
 """Pacote principal do sistema PDV."""
 
-from .core.config import get_config  # noqa: F401
+from __future__ import annotations
+
+from typing import Any
+
+
+def __getattr__(nome: str) -> Any:
+    # Carregado sob demanda: importar `APP.core.tracing` não deve ler a
+    # configuração nem abrir o log antes do rastreamento começar.
+    if nome == "get_config":
+        from .core.config import get_config
+
+        return get_config
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
@@ -1,4 +1,16 @@
 """Componentes centrais (config, banco, logger, segurança)."""
 
-from .config import get_config  # noqa: F401
-from .database import initialize_database  # noqa: F401
+from __future__ import annotations
+
+import importlib
+from typing import Any
+
+_REEXPORTS = {"get_config": "config", "initialize_database": "database"}
+
+
+def __getattr__(nome: str) -> Any:
+    # Sob demanda para que `from APP.core import tracing` venha sozinho.
+    modulo = _REEXPORTS.get(nome)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    return getattr(importlib.import_module(f".{modulo}", __name__), nome)
@@ -0,0 +1,46 @@
+"""Tempos medidos (em ms) com contagem, média e percentis das últimas amostras."""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List
+
+
+def _percentil(ordenados: List[float], p: float) -> float:
+    if not ordenados:
+        return 0.0
+    idx = min(len(ordenados) - 1, max(0, round(p * (len(ordenados) - 1))))
+    return ordenados[idx]
+
+
+@dataclass(slots=True)
+class Amostras:
+    """Acumula os tempos de uma operação; os percentis usam as 512 mais recentes."""
+
+    nome: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    amostras: Deque[float] = field(default_factory=lambda: deque(maxlen=512))
+
+    def registrar(self, duracao_ms: float) -> None:
+        self.count += 1
+        self.total_ms += duracao_ms
+        self.max_ms = max(self.max_ms, duracao_ms)
+        self.amostras.append(duracao_ms)
+
+    def resumo(self) -> Dict[str, Any]:
+        ordenados = sorted(self.amostras)
+        return {
+            "nome": self.nome,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "media_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(_percentil(ordenados, 0.50), 3),
+            "p99_ms": round(_percentil(ordenados, 0.99), 3),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+__all__ = ["Amostras"]
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-import shutil
+import sqlite3
 from datetime import datetime
 from pathlib import Path
 
+from . import database
 from .config import get_config
 from .logger import get_logger
 
@@ -11,11 +12,22 @@ logger = get_logger()
 
 
 def criar_backup_manual() -> Path:
+    """Copia o banco pela API de backup do SQLite, já com o que está no WAL.
+
+    Copiar só o arquivo principal perderia as páginas ainda não levadas do
+    `-wal` para ele; a cópia sai do escritor, com a escrita travada.
+    """
     cfg = get_config()
     timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
     destino = cfg.backup_dir / f"system_{timestamp}.db"
     destino.parent.mkdir(parents=True, exist_ok=True)
-    shutil.copy2(cfg.database_path, destino)
+    manager = database.get_manager()
+    with manager.write_lock:
+        copia = sqlite3.connect(destino)
+        try:
+            manager.writer().backup(copia)
+        finally:
+            copia.close()
     logger.info("Backup criado em %s", destino)
     return destino
 
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+from .utils import dia_epoch
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """Dicionário limitado que descarta primeiro o item usado há mais tempo.
+
+    O limite pode ser por quantidade de itens e, opcionalmente, por um peso
+    total (ex.: número de linhas guardadas) calculado por `peso(valor)`.
+    """
+
+    def __init__(
+        self,
+        max_itens: int,
+        *,
+        max_peso: Optional[int] = None,
+        peso: Optional[Callable[[V], int]] = None,
+    ) -> None:
+        self._max_itens = max(1, max_itens)
+        self._max_peso = max_peso
+        self._peso = peso or (lambda _valor: 1)
+        self._itens: "OrderedDict[K, V]" = OrderedDict()
+        self._peso_total = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, chave: K, default: Optional[V] = None) -> Optional[V]:
+        with self._lock:
+            try:
+                valor = self._itens[chave]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._itens.move_to_end(chave)
+            self.hits += 1
+            return valor
+
+    def peek(self, chave: K, default: Optional[V] = None) -> Optional[V]:
+        """Lê sem contar acerto/erro nem alterar a ordem de uso."""
+        with self._lock:
+            return self._itens.get(chave, default)
+
+    def put(self, chave: K, valor: V) -> None:
+        with self._lock:
+            anterior = self._itens.pop(chave, None)
+            if anterior is not None:
+                self._peso_total -= self._peso(anterior)
+            self._itens[chave] = valor
+            self._peso_total += self._peso(valor)
+            while len(self._itens) > 1 and (
+                len(self._itens) > self._max_itens
+                or (self._max_peso is not None and self._peso_total > self._max_peso)
+            ):
+                _, removido = self._itens.popitem(last=False)
+                self._peso_total -= self._peso(removido)
+                self.evictions += 1
+
+    def pop(self, chave: K, default: Optional[V] = None) -> Optional[V]:
+        with self._lock:
+            valor = self._itens.pop(chave, None)
+            if valor is None:
+                return default
+            self._peso_total -= self._peso(valor)
+            return valor
+
+    def pop_where(self, predicado: Callable[[K, V], bool]) -> int:
+        """Remove os itens para os quais `predicado(chave, valor)` é verdadeiro."""
+        with self._lock:
+            chaves = [c for c, v in self._itens.items() if predicado(c, v)]
+            for chave in chaves:
+                self._peso_total -= self._peso(self._itens.pop(chave))
+            return len(chaves)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._itens.clear()
+            self._peso_total = 0
+
+    def __len__(self) -> int:
+        return len(self._itens)
+
+    def __contains__(self, chave: object) -> bool:
+        return chave in self._itens
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "itens": len(self._itens),
+                "peso": self._peso_total,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+ChavePeriodo = Tuple[str, int, int]
+
+
+class CachePeriodos:
+    """Resultados de relatórios por (relatório, início, fim), em LRU.
+
+    Um período encerrado antes do dia do cálculo só muda com escrita
+    retroativa: `registrar_escrita(ts)` com `ts` anterior a hoje descarta os
+    períodos que contêm `ts`. Um período que inclui hoje guarda a época de
+    escrita do cálculo e vale só enquanto nenhuma escrita nova acontecer.
+
+    Escritas de outros processos chegam pelo contador `versao()` (mantido
+    por triggers no banco), consultado nas leituras no máximo a cada
+    `revalidar_s()` segundos; se ele andou sem escrita deste processo que o
+    explique, o cache inteiro é descartado.
+    """
+
+    def __init__(
+        self,
+        max_itens: int = 128,
+        *,
+        versao: Optional[Callable[[], int]] = None,
+        revalidar_s: Callable[[], float] = lambda: 0.0,
+    ) -> None:
+        # valor: (época no início do cálculo, período aberto?, resultado)
+        self._cache: LRUCache[ChavePeriodo, Tuple[int, bool, Any]] = LRUCache(max_itens)
+        self._lock = threading.Lock()
+        self._epoca = 0
+        self._epoca_retroativa = 0
+        self._ler_versao = versao
+        self._revalidar_s = revalidar_s
+        self._versao: Optional[int] = None
+        self._verificado_em = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def epoca(self) -> int:
+        return self._epoca
+
+    def _conferir_versao(self) -> None:
+        if self._ler_versao is None:
+            return
+        if (
+            self._versao is not None
+            and time.monotonic() - self._verificado_em < self._revalidar_s()
+        ):
+            return
+        versao = self._ler_versao()
+        with self._lock:
+            if versao != self._versao:
+                self._descartar_tudo()
+                self._versao = versao
+            self._verificado_em = time.monotonic()
+
+    def _descartar_tudo(self) -> None:
+        # Chamar com `_lock`: cálculos em andamento também deixam de valer.
+        self._epoca += 1
+        self._epoca_retroativa = self._epoca
+        self._cache.clear()
+
+    def obter(self, relatorio: str, inicio: int, fim: int, calcular: Callable[[], V]) -> V:
+        self._conferir_versao()
+        chave = (relatorio, inicio, fim)
+        entrada = self._cache.get(chave)
+        if entrada is not None:
+            epoca, aberto, valor = entrada
+            if not aberto or epoca == self._epoca:
+                self.hits += 1
+                return valor
+            self._cache.pop(chave)
+        self.misses += 1
+        epoca = self._epoca
+        valor = calcular()
+        with self._lock:
+            # Escrita retroativa durante o cálculo: o resultado pode não vê-la.
+            if self._epoca_retroativa <= epoca:
+                aberto = fim > dia_epoch(int(time.time()))
+                self._cache.put(chave, (epoca, aberto, valor))
+        return valor
+
+    def registrar_escrita(
+        self, ts: Optional[int] = None, versoes: Optional[Tuple[int, int]] = None
+    ) -> None:
+        """Avisa que vendas/caixa/estoque mudaram no instante `ts` (padrão: agora).
+
+        `versoes` é o par (antes, depois) de `versao()` lido na transação da
+        escrita; se o "antes" não bate com o conhecido, outro processo gravou
+        no meio e nada do que está guardado é confiável.
+        """
+        with self._lock:
+            if versoes is not None:
+                anterior, atual = versoes
+                if anterior != self._versao:
+                    self._descartar_tudo()
+                    self._versao = atual
+                    return
+                self._versao = atual
+            self._epoca += 1
+            if ts is None or ts >= dia_epoch(int(time.time())):
+                return
+            self._epoca_retroativa = self._epoca
+            self._cache.pop_where(lambda chave, _valor: chave[1] <= ts < chave[2])
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._descartar_tudo()
+            self._versao = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._cache.stats(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "epoca": self._epoca,
+            "versao": self._versao,
+        }
+
+
+__all__ = ["CachePeriodos", "LRUCache"]
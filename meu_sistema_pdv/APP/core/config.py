@@ -5,9 +5,39 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+from . import tracing
+
 BASE_DIR = Path(__file__).resolve().parents[2]
 CONFIG_FILE = BASE_DIR / "config.json"
 
+DATABASE_DEFAULTS: Dict[str, Any] = {
+    "read_pool_size": 4,
+    "busy_timeout_ms": 5000,
+    "cache_size_kb": 16384,
+    "mmap_size_mb": 128,
+    "synchronous": "NORMAL",
+    "instrumentation": True,
+    "slow_query_ms": 50,
+    "catalog_revalidate_s": 2.0,
+}
+
+# Etiquetas de balança (EAN-13 de uso interno, prefixo "2"). Em `padrao`:
+# dígitos fixos, P = código PLU do produto, V = valor, X = ignorado e
+# C = dígito verificador. `tipo` "preco" traz o total em centavos;
+# "peso" traz o peso (decimais=3 para kg).
+BALANCA_DEFAULTS: Dict[str, Any] = {
+    "layouts": [
+        {"padrao": "2PPPPXVVVVVVC", "tipo": "preco", "decimais": 2},
+    ],
+}
+
+# Inicialização: orçamento do teste de partida a frio e onde gravar o
+# relatório do rastreamento (`python main.py --trace-startup`).
+STARTUP_DEFAULTS: Dict[str, Any] = {
+    "budget_ms": 1500,
+    "report_path": "DATA/startup_trace.json",
+}
+
 
 @dataclass(slots=True)
 class Config:
@@ -19,6 +49,9 @@ class Config:
     theme: str
     default_admin: Dict[str, Any]
     company: Dict[str, Any]
+    database: Dict[str, Any]
+    balanca: Dict[str, Any]
+    startup: Dict[str, Any]
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "Config":
@@ -49,8 +82,15 @@ class Config:
                     "logo": "",
                 },
             ),
+            database={**DATABASE_DEFAULTS, **data.get("database", {})},
+            balanca={**BALANCA_DEFAULTS, **data.get("balanca", {})},
+            startup={**STARTUP_DEFAULTS, **data.get("startup", {})},
         )
 
+    @property
+    def startup_report_path(self) -> Path:
+        return (BASE_DIR / self.startup["report_path"]).resolve()
+
 
 _config: Optional[Config] = None
 
@@ -60,9 +100,10 @@ def load_config(path: Optional[Path] = None) -> Config:
     global _config
     if _config is None or path:
         cfg_path = path or CONFIG_FILE
-        with cfg_path.open("r", encoding="utf-8-sig") as cfg_file:
-            data = json.load(cfg_file)
-        _config = Config.from_dict(data)
+        with tracing.span("config"):
+            with cfg_path.open("r", encoding="utf-8-sig") as cfg_file:
+                data = json.load(cfg_file)
+            _config = Config.from_dict(data)
     return _config
 
 
@@ -70,4 +111,12 @@ def get_config() -> Config:
     return load_config()
 
 
-__all__ = ["Config", "get_config", "load_config", "BASE_DIR"]
+__all__ = [
+    "Config",
+    "get_config",
+    "load_config",
+    "BASE_DIR",
+    "DATABASE_DEFAULTS",
+    "BALANCA_DEFAULTS",
+    "STARTUP_DEFAULTS",
+]
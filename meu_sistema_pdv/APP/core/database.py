@@ -1,49 +1,239 @@
 from __future__ import annotations
 
+import queue
 import sqlite3
 import threading
+import time
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, Generator, Iterable, Optional
+from typing import Any, Dict, Generator, Iterable, Iterator, List, Optional
 
+from . import tracing
 from .config import get_config
 from .logger import get_logger
+from .query_stats import stats as query_stats
 
 logger = get_logger()
-_thread_local = threading.local()
 
 
-def _connect() -> sqlite3.Connection:
+def _apply_pragmas(conn: sqlite3.Connection, *, readonly: bool) -> None:
+    opts = get_config().database
+    conn.execute("PRAGMA foreign_keys = ON;")
+    conn.execute(f"PRAGMA busy_timeout = {int(opts['busy_timeout_ms'])};")
+    # cache_size negativo = tamanho em KiB, independente do page_size.
+    conn.execute(f"PRAGMA cache_size = -{int(opts['cache_size_kb'])};")
+    conn.execute(f"PRAGMA mmap_size = {int(opts['mmap_size_mb']) * 1024 * 1024};")
+    conn.execute("PRAGMA temp_store = MEMORY;")
+    if readonly:
+        conn.execute("PRAGMA query_only = ON;")
+    else:
+        conn.execute("PRAGMA journal_mode = WAL;")
+        conn.execute(f"PRAGMA synchronous = {opts['synchronous']};")
+
+
+def _connect(*, readonly: bool = False) -> sqlite3.Connection:
     cfg = get_config()
     db_path: Path = cfg.database_path
     conn = sqlite3.connect(db_path, check_same_thread=False)
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON;")
+    _apply_pragmas(conn, readonly=readonly)
     return conn
 
 
+class ConnectionManager:
+    """Um único escritor serializado e um pool limitado de leitores.
+
+    Em modo WAL os leitores enxergam o último commit sem bloquear o escritor,
+    então consultas longas de relatório não atrasam o registro de vendas.
+    """
+
+    def __init__(self, read_pool_size: int) -> None:
+        self._read_pool_size = max(1, read_pool_size)
+        self._readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._all_readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._write_lock = threading.RLock()
+
+    @property
+    def write_lock(self) -> threading.RLock:
+        return self._write_lock
+
+    def writer(self) -> sqlite3.Connection:
+        if self._writer is None:
+            with self._write_lock:
+                if self._writer is None:
+                    self._writer = _connect()
+        return self._writer
+
+    def acquire_reader(self) -> sqlite3.Connection:
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+        with self._readers_lock:
+            if len(self._all_readers) < self._read_pool_size:
+                # Garante que o arquivo e o modo WAL existam antes do 1º leitor.
+                self.writer()
+                conn = _connect(readonly=True)
+                self._all_readers.append(conn)
+                return conn
+        return self._readers.get()
+
+    def release_reader(self, conn: sqlite3.Connection) -> None:
+        self._readers.put(conn)
+
+    def close(self) -> None:
+        with self._write_lock:
+            with self._readers_lock:
+                for conn in self._all_readers:
+                    conn.close()
+                self._all_readers.clear()
+                self._readers = queue.LifoQueue()
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+
+def _medir(conn: sqlite3.Connection, query: str, params: Any, funcao, *args) -> Any:
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    query_stats.registrar(query, params, (time.perf_counter() - inicio) * 1000, conn)
+    return resultado
+
+
+class _CursorMedido:
+    """Cursor do escritor que registra cada comando em `query_stats`."""
+
+    __slots__ = ("_cursor",)
+
+    def __init__(self, cursor: sqlite3.Cursor) -> None:
+        self._cursor = cursor
+
+    def execute(self, query: str, params: Any = ()) -> "_CursorMedido":
+        _medir(self._cursor.connection, query, params, self._cursor.execute, query, params)
+        return self
+
+    def executemany(self, query: str, seq_params: Iterable[Any]) -> "_CursorMedido":
+        _medir(self._cursor.connection, query, (), self._cursor.executemany, query, seq_params)
+        return self
+
+    def executescript(self, script: str) -> "_CursorMedido":
+        _medir(self._cursor.connection, script, (), self._cursor.executescript, script)
+        return self
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, nome: str) -> Any:
+        return getattr(self._cursor, nome)
+
+
+class _ConexaoMedida:
+    """Conexão de escrita entregue por `transaction()` com a instrumentação ligada.
+
+    Os comandos das transações (checkout, cadastro, caixa, migrações) passam
+    por aqui para entrar nas mesmas estatísticas de `execute()`.
+    """
+
+    __slots__ = ("_conn",)
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self._conn = conn
+
+    def cursor(self) -> _CursorMedido:
+        return _CursorMedido(self._conn.cursor())
+
+    def execute(self, query: str, params: Any = ()) -> _CursorMedido:
+        return self.cursor().execute(query, params)
+
+    def executemany(self, query: str, seq_params: Iterable[Any]) -> _CursorMedido:
+        return self.cursor().executemany(query, seq_params)
+
+    def executescript(self, script: str) -> _CursorMedido:
+        return self.cursor().executescript(script)
+
+    def __enter__(self) -> "_ConexaoMedida":
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, *exc: Any) -> Any:
+        return self._conn.__exit__(*exc)
+
+    def __getattr__(self, nome: str) -> Any:
+        return getattr(self._conn, nome)
+
+
+def _medida(conn: sqlite3.Connection) -> sqlite3.Connection:
+    return _ConexaoMedida(conn) if query_stats.enabled else conn  # type: ignore[return-value]
+
+
+_manager: Optional[ConnectionManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_manager() -> ConnectionManager:
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                pool_size = int(get_config().database["read_pool_size"])
+                _manager = ConnectionManager(pool_size)
+    return _manager
+
+
 def get_connection() -> sqlite3.Connection:
-    conn = getattr(_thread_local, "connection", None)
-    if conn is None:
-        conn = _connect()
-        _thread_local.connection = conn
-    return conn
+    """Conexão de escrita. Use `transaction()` para escrever com segurança."""
+    return get_manager().writer()
+
+
+@contextmanager
+def transaction() -> Generator[sqlite3.Connection, None, None]:
+    """Abre uma transação no escritor, com commit/rollback automáticos.
+
+    BEGIN IMMEDIATE reserva a escrita já no início, então leituras feitas
+    dentro da transação não mudam até o commit (nem por outros processos).
+    """
+    manager = get_manager()
+    with manager.write_lock:
+        conn = manager.writer()
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                yield _medida(conn)
+        except Exception:
+            logger.exception("Erro em transação com o banco de dados")
+            raise
 
 
 @contextmanager
 def db_cursor(commit: bool = False) -> Generator[sqlite3.Cursor, None, None]:
-    conn = get_connection()
+    manager = get_manager()
+    if commit:
+        with manager.write_lock:
+            conn = manager.writer()
+            cursor = conn.cursor()
+            try:
+                yield cursor
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                logger.exception("Erro em operação com o banco de dados")
+                raise
+            finally:
+                cursor.close()
+        return
+
+    conn = manager.acquire_reader()
     cursor = conn.cursor()
     try:
         yield cursor
-        if commit:
-            conn.commit()
     except Exception:
-        conn.rollback()
         logger.exception("Erro em operação com o banco de dados")
         raise
     finally:
         cursor.close()
+        manager.release_reader(conn)
 
 
 def execute(
@@ -56,12 +246,43 @@ def execute(
 ) -> Any:
     params = params or ()
     with db_cursor(commit=commit) as cursor:
+        inicio = time.perf_counter()
         cursor.execute(query, params)
         if fetchone:
-            return cursor.fetchone()
-        if fetchall:
-            return cursor.fetchall()
-        return cursor.lastrowid
+            resultado = cursor.fetchone()
+        elif fetchall:
+            resultado = cursor.fetchall()
+        else:
+            resultado = cursor.lastrowid
+        if query_stats.enabled:
+            duracao_ms = (time.perf_counter() - inicio) * 1000
+            query_stats.registrar(query, params, duracao_ms, cursor.connection)
+        return resultado
+
+
+def iterate(
+    query: str,
+    params: Iterable[Any] | Dict[str, Any] | None = None,
+    *,
+    lote: int = 500,
+) -> Iterator[sqlite3.Row]:
+    """Percorre o resultado em lotes de `lote` linhas, sem montar a lista toda.
+
+    Segura um leitor do pool até o fim da iteração: consuma tudo ou feche o
+    gerador (`close()`) para devolvê-lo.
+    """
+    params = params or ()
+    with db_cursor() as cursor:
+        inicio = time.perf_counter()
+        cursor.execute(query, params)
+        if query_stats.enabled:
+            duracao_ms = (time.perf_counter() - inicio) * 1000
+            query_stats.registrar(query, params, duracao_ms, cursor.connection)
+        while True:
+            linhas = cursor.fetchmany(lote)
+            if not linhas:
+                return
+            yield from linhas
 
 
 def executescript(script: str) -> None:
@@ -73,24 +294,41 @@ def initialize_database() -> None:
     logger.info("Inicializando banco de dados...")
     from . import migrations  # import local para evitar ciclos
 
-    conn = get_connection()
-    migrations.create_tables(conn)
-    migrations.seed_initial_data(conn)
-    logger.info("Banco de dados pronto.")
+    inicio = time.perf_counter()
+    with tracing.span("banco"), get_manager().write_lock:
+        with tracing.span("conexão"):
+            conn = get_connection()
+        versao = migrations.migrate(_medida(conn))
+    logger.info(
+        "Banco de dados pronto (versão %d) em %.1f ms.",
+        versao,
+        (time.perf_counter() - inicio) * 1000,
+    )
+
+
+def dump_query_stats(limite: int = 20) -> List[Dict[str, Any]]:
+    """Escreve no log e retorna as estatísticas de latência por consulta."""
+    return query_stats.dump(limite)
 
 
 def close_connection() -> None:
-    conn: Optional[sqlite3.Connection] = getattr(_thread_local, "connection", None)
-    if conn is not None:
-        conn.close()
-        _thread_local.connection = None
+    global _manager
+    with _manager_lock:
+        if _manager is not None:
+            _manager.close()
+            _manager = None
 
 
 __all__ = [
+    "ConnectionManager",
+    "get_manager",
     "get_connection",
+    "transaction",
     "db_cursor",
     "execute",
+    "iterate",
     "executescript",
     "initialize_database",
+    "dump_query_stats",
     "close_connection",
 ]
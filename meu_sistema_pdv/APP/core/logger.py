@@ -5,6 +5,7 @@ from logging.handlers import RotatingFileHandler
 from pathlib import Path
 from typing import Optional
 
+from . import tracing
 from .config import get_config
 
 LOGGER_NAME = "sistema_logger"
@@ -17,26 +18,36 @@ def configure_logger() -> logging.Logger:
         return _logger
 
     cfg = get_config()
-    log_path: Path = cfg.log_path
-    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with tracing.span("logger"):
+        return _configurar(cfg.log_path, cfg.debug)
 
-    logger = logging.getLogger(LOGGER_NAME)
-    logger.setLevel(logging.DEBUG if cfg.debug else logging.INFO)
 
-    formatter = logging.Formatter(
+def _formatter() -> logging.Formatter:
+    return logging.Formatter(
         "%(asctime)s [%(levelname)s] %(name)s :: %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S",
     )
 
+
+def _handler_arquivo(log_path: Path) -> RotatingFileHandler:
+    log_path.parent.mkdir(parents=True, exist_ok=True)
     file_handler = RotatingFileHandler(
         log_path, maxBytes=2_000_000, backupCount=5, encoding="utf-8"
     )
-    file_handler.setFormatter(formatter)
+    file_handler.setFormatter(_formatter())
+    return file_handler
+
+
+def _configurar(log_path: Optional[Path], debug: bool) -> logging.Logger:
+    global _logger
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(logging.DEBUG if debug else logging.INFO)
 
     console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
+    console_handler.setFormatter(_formatter())
 
-    logger.addHandler(file_handler)
+    if log_path is not None:
+        logger.addHandler(_handler_arquivo(log_path))
     logger.addHandler(console_handler)
     logger.propagate = False
 
@@ -45,8 +56,21 @@ def configure_logger() -> logging.Logger:
     return logger
 
 
+def redirecionar_arquivo(log_path: Optional[Path]) -> None:
+    """Troca o arquivo do log (ex.: banco de testes); None para de gravar em arquivo."""
+    if _logger is None:
+        _configurar(log_path, get_config().debug)
+        return
+    logger = _logger
+    for handler in [h for h in logger.handlers if isinstance(h, RotatingFileHandler)]:
+        logger.removeHandler(handler)
+        handler.close()
+    if log_path is not None:
+        logger.addHandler(_handler_arquivo(log_path))
+
+
 def get_logger() -> logging.Logger:
     return configure_logger()
 
 
-__all__ = ["get_logger", "configure_logger", "LOGGER_NAME"]
+__all__ = ["get_logger", "configure_logger", "redirecionar_arquivo", "LOGGER_NAME"]
@@ -1,12 +1,20 @@
 from __future__ import annotations
 
 import sqlite3
-from datetime import datetime
-from typing import Set
+from typing import Callable, Iterator, List, Set, Tuple
 
+from . import tracing
 from .config import get_config
 from .logger import get_logger
-from .utils import hash_password
+from .utils import (
+    POPULARIDADE_REFERENCIA_TS,
+    dia_epoch,
+    hash_password,
+    hora_epoch,
+    normalizar_busca,
+    nova_referencia_popularidade,
+    peso_popularidade,
+)
 
 logger = get_logger()
 
@@ -120,6 +128,27 @@ CREATE INDEX IF NOT EXISTS idx_clientes_nome ON clientes(nome);
 """
 
 
+def _split_script(script: str) -> Iterator[str]:
+    """Quebra um script em comandos completos (respeitando blocos de trigger)."""
+    atual: List[str] = []
+    for linha in script.splitlines(keepends=True):
+        atual.append(linha)
+        comando = "".join(atual)
+        if sqlite3.complete_statement(comando):
+            if comando.strip():
+                yield comando.strip()
+            atual = []
+    resto = "".join(atual).strip()
+    if resto:
+        yield resto
+
+
+def _run_script(conn: sqlite3.Connection, script: str) -> None:
+    # executescript() faria COMMIT implícito e quebraria a transação única.
+    for comando in _split_script(script):
+        conn.execute(comando)
+
+
 def _ensure_column(
     conn: sqlite3.Connection, table: str, column: str, column_type: str
 ) -> None:
@@ -128,14 +157,11 @@ def _ensure_column(
     if column not in existing:
         logger.info("Adicionando coluna %s à tabela %s", column, table)
         conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
-        conn.commit()
 
 
 def create_tables(conn: sqlite3.Connection) -> None:
     logger.debug("Aplicando script de criação de tabelas.")
-    conn.executescript(CREATE_SCRIPT)
-    conn.commit()
-
+    _run_script(conn, CREATE_SCRIPT)
     _ensure_column(conn, "caixa_movimentos", "descricao", "TEXT")
 
 
@@ -184,9 +210,523 @@ def seed_initial_data(conn: sqlite3.Connection) -> None:
                 company.get("logo", ""),
             ),
         )
+    logger.debug("Dados iniciais aplicados.")
+
+
+HOT_PATH_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_caixa_mov_tipo_data
+    ON caixa_movimentos(tipo, criado_em, valor);
+CREATE INDEX IF NOT EXISTS idx_caixa_mov_caixa
+    ON caixa_movimentos(caixa_id, forma_pagamento, valor);
+CREATE INDEX IF NOT EXISTS idx_venda_itens_venda
+    ON venda_itens(venda_id, produto_id, quantidade);
+CREATE INDEX IF NOT EXISTS idx_pagamentos_venda
+    ON pagamentos(venda_id, forma_pagamento, valor);
+CREATE INDEX IF NOT EXISTS idx_caixas_status_usuario
+    ON caixas(status, usuario_id, aberto_em);
+"""
+
+
+def create_hot_path_indexes(conn: sqlite3.Connection) -> None:
+    _run_script(conn, HOT_PATH_INDEXES)
+
+    # Código vazio vindo de cadastros antigos vira NULL para não colidir no índice único.
+    conn.execute(
+        "UPDATE produtos SET codigo_barras = NULL WHERE TRIM(codigo_barras) = ''"
+    )
+    duplicados = conn.execute(
+        """
+        SELECT codigo_barras, COUNT(*) AS qtd FROM produtos
+        WHERE codigo_barras IS NOT NULL
+        GROUP BY codigo_barras HAVING COUNT(*) > 1
+        """
+    ).fetchall()
+    if duplicados:
+        logger.warning(
+            "Códigos de barras duplicados (%s); índice criado sem restrição de unicidade.",
+            ", ".join(row[0] for row in duplicados),
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_produtos_codigo ON produtos(codigo_barras) "
+            "WHERE codigo_barras IS NOT NULL"
+        )
+    else:
+        conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_produtos_codigo ON produtos(codigo_barras) "
+            "WHERE codigo_barras IS NOT NULL"
+        )
+    conn.execute("ANALYZE")
+
+
+# Textos com "T" foram gravados pelo Python em hora local; os com espaço vieram
+# do CURRENT_TIMESTAMP do SQLite, que é UTC.
+_EPOCH_FROM_TEXT = """
+CASE
+    WHEN {col} IS NULL THEN NULL
+    WHEN instr({col}, 'T') > 0
+        THEN CAST(strftime('%s', replace({col}, 'T', ' '), 'utc') AS INTEGER)
+    ELSE CAST(strftime('%s', {col}) AS INTEGER)
+END
+"""
+
+EPOCH_COLUMNS = (
+    ("vendas", "criado_ts", "criado_em"),
+    ("pagamentos", "criado_ts", "criado_em"),
+    ("caixa_movimentos", "criado_ts", "criado_em"),
+    ("caixas", "aberto_ts", "aberto_em"),
+    ("caixas", "fechado_ts", "fechado_em"),
+)
+
+EPOCH_INDEXES = """
+DROP INDEX IF EXISTS idx_vendas_data;
+DROP INDEX IF EXISTS idx_caixa_mov_tipo_data;
+DROP INDEX IF EXISTS idx_caixas_status_usuario;
+CREATE INDEX IF NOT EXISTS idx_vendas_criado_ts ON vendas(criado_ts);
+CREATE INDEX IF NOT EXISTS idx_caixa_mov_tipo_ts
+    ON caixa_movimentos(tipo, criado_ts, valor);
+CREATE INDEX IF NOT EXISTS idx_caixas_aberto_ts ON caixas(aberto_ts);
+CREATE INDEX IF NOT EXISTS idx_caixas_status_usuario_ts
+    ON caixas(status, usuario_id, aberto_ts);
+"""
+
+
+def add_epoch_columns(conn: sqlite3.Connection) -> None:
+    for table, ts_column, text_column in EPOCH_COLUMNS:
+        _ensure_column(conn, table, ts_column, "INTEGER")
+        conn.execute(
+            f"UPDATE {table} SET {ts_column} = "
+            f"{_EPOCH_FROM_TEXT.format(col=text_column)} WHERE {ts_column} IS NULL"
+        )
+    _run_script(conn, EPOCH_INDEXES)
+    conn.execute("ANALYZE")
+
+
+# Contadores de versão consultados pelos caches em memória. O estoque fica de
+# fora do trigger de produtos: cada venda o altera e não deve invalidar o
+# catálogo de todos os terminais.
+CHANGE_COUNTERS = """
+CREATE TABLE IF NOT EXISTS contadores (
+    nome TEXT PRIMARY KEY,
+    valor INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO contadores (nome, valor) VALUES ('produtos', 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_produtos_versao_ins AFTER INSERT ON produtos
+BEGIN
+    UPDATE contadores SET valor = valor + 1 WHERE nome = 'produtos';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_produtos_versao_del AFTER DELETE ON produtos
+BEGIN
+    UPDATE contadores SET valor = valor + 1 WHERE nome = 'produtos';
+END;
 
-    conn.commit()
-    logger.debug("Dados iniciais aplicados em %s", datetime.utcnow().isoformat())
+CREATE TRIGGER IF NOT EXISTS trg_produtos_versao_upd
+AFTER UPDATE OF nome, preco_venda, estoque_minimo, codigo_barras, categoria,
+    data_validade, lote ON produtos
+BEGIN
+    UPDATE contadores SET valor = valor + 1 WHERE nome = 'produtos';
+END;
+"""
+
+
+def create_change_counters(conn: sqlite3.Connection) -> None:
+    _run_script(conn, CHANGE_COUNTERS)
+
+
+# Índice de texto externo (content=produtos): guarda só os tokens, o conteúdo
+# continua na tabela produtos. Prefixos de 2 e 3 letras aceleram o type-ahead.
+PRODUCT_SEARCH_FTS = """
+CREATE VIRTUAL TABLE IF NOT EXISTS produtos_fts USING fts5(
+    nome,
+    codigo_barras,
+    categoria,
+    content = 'produtos',
+    content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+"""
+
+PRODUCT_SEARCH_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS trg_produtos_fts_ins AFTER INSERT ON produtos
+BEGIN
+    INSERT INTO produtos_fts (rowid, nome, codigo_barras, categoria)
+    VALUES (new.id, new.nome, new.codigo_barras, new.categoria);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_produtos_fts_del AFTER DELETE ON produtos
+BEGIN
+    INSERT INTO produtos_fts (produtos_fts, rowid, nome, codigo_barras, categoria)
+    VALUES ('delete', old.id, old.nome, old.codigo_barras, old.categoria);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_produtos_fts_upd
+AFTER UPDATE OF nome, codigo_barras, categoria ON produtos
+BEGIN
+    INSERT INTO produtos_fts (produtos_fts, rowid, nome, codigo_barras, categoria)
+    VALUES ('delete', old.id, old.nome, old.codigo_barras, old.categoria);
+    INSERT INTO produtos_fts (rowid, nome, codigo_barras, categoria)
+    VALUES (new.id, new.nome, new.codigo_barras, new.categoria);
+END;
+"""
+
+
+def create_product_search(conn: sqlite3.Connection) -> None:
+    try:
+        _run_script(conn, PRODUCT_SEARCH_FTS)
+    except sqlite3.OperationalError:
+        # SQLite sem FTS5: as buscas continuam usando LIKE.
+        logger.warning("FTS5 indisponível; busca de produtos seguirá com LIKE.")
+        return
+    _run_script(conn, PRODUCT_SEARCH_TRIGGERS)
+    conn.execute("INSERT INTO produtos_fts (produtos_fts) VALUES ('rebuild')")
+
+
+# Chave de busca sem acentos/caixa (utils.normalizar_busca), gravada pelos
+# models junto com o nome. UPPER()/LIKE do SQLite só tratam ASCII.
+SEARCH_KEY_TABLES = ("produtos", "clientes")
+
+
+def add_search_keys(conn: sqlite3.Connection) -> None:
+    for table in SEARCH_KEY_TABLES:
+        _ensure_column(conn, table, "busca", "TEXT")
+        rows = conn.execute(f"SELECT id, nome FROM {table}").fetchall()
+        conn.executemany(
+            f"UPDATE {table} SET busca = ? WHERE id = ?",
+            [(normalizar_busca(nome), row_id) for row_id, nome in rows],
+        )
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_busca ON {table}(busca)")
+    conn.execute("ANALYZE")
+
+
+# Contadores de vendas por produto, mantidos pelo checkout (vendas_models):
+# um acumulado com a popularidade (para sugestões/ranking sem agregar
+# venda_itens) e um por dia, para "mais vendidos" de qualquer período.
+SALES_COUNTERS = """
+CREATE TABLE IF NOT EXISTS produto_popularidade (
+    produto_id INTEGER PRIMARY KEY REFERENCES produtos(id) ON DELETE CASCADE,
+    quantidade REAL NOT NULL DEFAULT 0,
+    vendas INTEGER NOT NULL DEFAULT 0,
+    ultima_venda_ts INTEGER,
+    score REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_popularidade_score ON produto_popularidade(score);
+
+CREATE TABLE IF NOT EXISTS produto_vendas_dia (
+    dia INTEGER NOT NULL,
+    produto_id INTEGER NOT NULL REFERENCES produtos(id) ON DELETE CASCADE,
+    quantidade REAL NOT NULL DEFAULT 0,
+    vendas INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (dia, produto_id)
+) WITHOUT ROWID;
+"""
+
+
+def create_sales_counters(conn: sqlite3.Connection) -> None:
+    _run_script(conn, SALES_COUNTERS)
+    rebuild_sales_counters(conn)
+    conn.execute("ANALYZE")
+
+
+def rebuild_sales_counters(conn: sqlite3.Connection) -> None:
+    """Refaz popularidade e vendas por dia de cada produto a partir de `venda_itens`."""
+    conn.execute("DELETE FROM produto_popularidade")
+    conn.execute("DELETE FROM produto_vendas_dia")
+    rows = conn.execute(
+        """
+        SELECT vi.produto_id, v.criado_ts, SUM(vi.quantidade)
+        FROM venda_itens vi
+        JOIN vendas v ON v.id = vi.venda_id
+        JOIN produtos p ON p.id = vi.produto_id
+        WHERE v.criado_ts IS NOT NULL
+        GROUP BY vi.venda_id, vi.produto_id
+        """
+    ).fetchall()
+    por_dia: dict = {}
+    por_produto: dict = {}
+    referencia = POPULARIDADE_REFERENCIA_TS
+    if rows:
+        referencia = nova_referencia_popularidade(max(r[1] for r in rows), referencia) or referencia
+    if referencia != POPULARIDADE_REFERENCIA_TS:
+        conn.execute(
+            "INSERT OR REPLACE INTO contadores (nome, valor) VALUES ('popularidade_referencia', ?)",
+            (referencia,),
+        )
+    for produto_id, ts, quantidade in rows:
+        dia = por_dia.setdefault((dia_epoch(ts), produto_id), [0.0, 0])
+        dia[0] += quantidade
+        dia[1] += 1
+        total = por_produto.setdefault(produto_id, [0.0, 0, ts, 0.0])
+        total[0] += quantidade
+        total[1] += 1
+        total[2] = max(total[2], ts)
+        total[3] += quantidade * peso_popularidade(ts, referencia)
+    conn.executemany(
+        "INSERT INTO produto_vendas_dia (dia, produto_id, quantidade, vendas) VALUES (?, ?, ?, ?)",
+        [(dia, produto_id, q, n) for (dia, produto_id), (q, n) in por_dia.items()],
+    )
+    conn.executemany(
+        "INSERT INTO produto_popularidade "
+        "(produto_id, quantidade, vendas, ultima_venda_ts, score) VALUES (?, ?, ?, ?, ?)",
+        [(produto_id, *valores) for produto_id, valores in por_produto.items()],
+    )
+
+
+# Resumos de vendas por dia e por hora (hora contada da meia-noite local,
+# ver utils.hora_epoch), mantidos pelo checkout na mesma transação. As
+# métricas da venda vão para a linha da forma principal; `pagamentos` soma o
+# valor pago em cada forma. Vendas com `resumida` nula ainda não entraram nos
+# resumos e são lidas direto de `vendas` pelo índice parcial.
+SALES_ROLLUPS = """
+CREATE TABLE IF NOT EXISTS resumo_vendas_dia (
+    dia INTEGER NOT NULL,
+    forma_pagamento TEXT NOT NULL,
+    usuario_id INTEGER NOT NULL,
+    vendas INTEGER NOT NULL DEFAULT 0,
+    total_bruto REAL NOT NULL DEFAULT 0,
+    descontos REAL NOT NULL DEFAULT 0,
+    total_liquido REAL NOT NULL DEFAULT 0,
+    pagamentos REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (dia, forma_pagamento, usuario_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS resumo_vendas_hora (
+    hora INTEGER NOT NULL,
+    forma_pagamento TEXT NOT NULL,
+    usuario_id INTEGER NOT NULL,
+    vendas INTEGER NOT NULL DEFAULT 0,
+    total_bruto REAL NOT NULL DEFAULT 0,
+    descontos REAL NOT NULL DEFAULT 0,
+    total_liquido REAL NOT NULL DEFAULT 0,
+    pagamentos REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (hora, forma_pagamento, usuario_id)
+) WITHOUT ROWID;
+"""
+
+
+def rebuild_sales_rollups(conn: sqlite3.Connection) -> int:
+    """Refaz os resumos a partir de `vendas`/`pagamentos`; devolve o nº de vendas."""
+    chaves_hora: dict = {}
+
+    def _hora(ts: int) -> int:
+        # Todo fuso tem deslocamento múltiplo de 15 min: blocos de 900 s
+        # caem sempre no mesmo dia e na mesma hora local.
+        bloco = ts - ts % 900
+        if bloco not in chaves_hora:
+            chaves_hora[bloco] = hora_epoch(bloco)
+        return chaves_hora[bloco]
+
+    linhas: dict = {}
+
+    def _linha(hora: int, forma: str, usuario_id: int) -> list:
+        return linhas.setdefault((hora, forma, usuario_id), [0, 0.0, 0.0, 0.0, 0.0])
+
+    vendas = conn.execute(
+        """
+        SELECT criado_ts, COALESCE(forma_pagamento, ''), usuario_id,
+            total_bruto, desconto_percentual, total_liquido
+        FROM vendas WHERE criado_ts IS NOT NULL
+        """
+    ).fetchall()
+    for ts, forma, usuario_id, bruto, desconto, liquido in vendas:
+        linha = _linha(_hora(ts), forma, usuario_id)
+        linha[0] += 1
+        linha[1] += bruto or 0
+        linha[2] += desconto or 0
+        linha[3] += liquido or 0
+    for ts, forma, usuario_id, valor in conn.execute(
+        """
+        SELECT v.criado_ts, p.forma_pagamento, v.usuario_id, p.valor
+        FROM pagamentos p JOIN vendas v ON v.id = p.venda_id
+        WHERE v.criado_ts IS NOT NULL
+        """
+    ):
+        _linha(_hora(ts), forma, usuario_id)[4] += valor or 0
+
+    dias: dict = {}
+    for (hora, forma, usuario_id), valores in linhas.items():
+        dia = dias.setdefault((dia_epoch(hora), forma, usuario_id), [0, 0.0, 0.0, 0.0, 0.0])
+        for i, valor in enumerate(valores):
+            dia[i] += valor
+
+    for tabela, coluna, dados in (
+        ("resumo_vendas_hora", "hora", linhas),
+        ("resumo_vendas_dia", "dia", dias),
+    ):
+        conn.execute(f"DELETE FROM {tabela}")
+        conn.executemany(
+            f"INSERT INTO {tabela} ({coluna}, forma_pagamento, usuario_id, vendas, "
+            "total_bruto, descontos, total_liquido, pagamentos) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(*chave, *valores) for chave, valores in dados.items()],
+        )
+    conn.execute("UPDATE vendas SET resumida = 1 WHERE criado_ts IS NOT NULL")
+    return len(vendas)
+
+
+def create_sales_rollups(conn: sqlite3.Connection) -> None:
+    _run_script(conn, SALES_ROLLUPS)
+    _ensure_column(conn, "vendas", "resumida", "INTEGER")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_vendas_nao_resumidas "
+        "ON vendas(criado_ts) WHERE resumida IS NULL"
+    )
+    rebuild_sales_rollups(conn)
+    conn.execute("ANALYZE")
+
+
+# Versão dos relatórios: o cache de períodos de cada processo compara este
+# contador para saber se outro terminal gravou vendas ou movimentos de caixa.
+# `resumida` fica de fora: marcar vendas já resumidas não muda nenhum total.
+REPORT_COUNTERS = """
+INSERT OR IGNORE INTO contadores (nome, valor) VALUES ('relatorios', 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_vendas_versao_ins AFTER INSERT ON vendas
+BEGIN
+    UPDATE contadores SET valor = valor + 1 WHERE nome = 'relatorios';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_vendas_versao_del AFTER DELETE ON vendas
+BEGIN
+    UPDATE contadores SET valor = valor + 1 WHERE nome = 'relatorios';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_vendas_versao_upd
+AFTER UPDATE OF codigo, usuario_id, cliente_id, total_bruto, desconto_percentual,
+    total_liquido, forma_pagamento, criado_em, criado_ts ON vendas
+BEGIN
+    UPDATE contadores SET valor = valor + 1 WHERE nome = 'relatorios';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_caixa_mov_versao_ins AFTER INSERT ON caixa_movimentos
+BEGIN
+    UPDATE contadores SET valor = valor + 1 WHERE nome = 'relatorios';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_caixa_mov_versao_del AFTER DELETE ON caixa_movimentos
+BEGIN
+    UPDATE contadores SET valor = valor + 1 WHERE nome = 'relatorios';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_caixa_mov_versao_upd AFTER UPDATE ON caixa_movimentos
+BEGIN
+    UPDATE contadores SET valor = valor + 1 WHERE nome = 'relatorios';
+END;
+"""
+
+
+def create_report_counters(conn: sqlite3.Connection) -> None:
+    _run_script(conn, REPORT_COUNTERS)
+
+
+# Os alertas de estoque baixo e de validade também saem do cache de
+# relatórios: mudanças nessas colunas, vindas de qualquer terminal, movem o
+# mesmo contador.
+REPORT_PRODUCT_COUNTERS = """
+CREATE TRIGGER IF NOT EXISTS trg_produtos_relatorios_ins AFTER INSERT ON produtos
+BEGIN
+    UPDATE contadores SET valor = valor + 1 WHERE nome = 'relatorios';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_produtos_relatorios_del AFTER DELETE ON produtos
+BEGIN
+    UPDATE contadores SET valor = valor + 1 WHERE nome = 'relatorios';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_produtos_relatorios_upd
+AFTER UPDATE OF estoque, estoque_minimo, data_validade, nome ON produtos
+BEGIN
+    UPDATE contadores SET valor = valor + 1 WHERE nome = 'relatorios';
+END;
+"""
+
+
+def create_report_product_counters(conn: sqlite3.Connection) -> None:
+    _run_script(conn, REPORT_PRODUCT_COUNTERS)
+
+
+# Ranking de um dia lido direto do índice: "mais vendidos de hoje" percorre
+# só `limite` entradas, sem somar os contadores do dia.
+PRODUCT_DAY_RANKING = """
+CREATE INDEX IF NOT EXISTS idx_produto_vendas_dia_ranking
+    ON produto_vendas_dia(dia, quantidade DESC);
+"""
+
+
+def create_product_day_ranking(conn: sqlite3.Connection) -> None:
+    _run_script(conn, PRODUCT_DAY_RANKING)
+    conn.execute("ANALYZE")
+
+
+# Cada migração precisa ser idempotente: bancos antigos (user_version = 0)
+# já podem ter parte do schema criado pelas versões anteriores do sistema.
+# Novas alterações entram sempre no fim da lista, com número sequencial.
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "schema base", create_tables),
+    (2, "dados iniciais", seed_initial_data),
+    (3, "índices dos caminhos quentes", create_hot_path_indexes),
+    (4, "timestamps inteiros (epoch)", add_epoch_columns),
+    (5, "contador de versão do catálogo", create_change_counters),
+    (6, "busca textual de produtos (FTS5)", create_product_search),
+    (7, "chave de busca sem acentos", add_search_keys),
+    (8, "contadores de vendas por produto", create_sales_counters),
+    (9, "resumos de vendas por dia e hora", create_sales_rollups),
+    (10, "contador de versão dos relatórios", create_report_counters),
+    (11, "versão dos relatórios segue os alertas de produtos", create_report_product_counters),
+    (12, "ranking diário de mais vendidos", create_product_day_ranking),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    return int(conn.execute("PRAGMA user_version").fetchone()[0])
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Aplica as migrações pendentes numa única transação.
+
+    Bancos já atualizados custam apenas a leitura de `PRAGMA user_version`.
+    """
+    if current_version(conn) >= LATEST_VERSION:
+        return LATEST_VERSION
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Relê dentro da transação: outro processo pode ter migrado antes.
+        versao = current_version(conn)
+        for numero, descricao, aplicar in MIGRATIONS:
+            if numero <= versao:
+                continue
+            logger.info("Aplicando migração %03d: %s", numero, descricao)
+            with tracing.span(f"migração {numero:03d}: {descricao}"):
+                aplicar(conn)
+        conn.execute(f"PRAGMA user_version = {LATEST_VERSION}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        logger.exception("Falha ao aplicar migrações; nenhuma alteração foi gravada.")
+        raise
+    return LATEST_VERSION
 
 
-__all__ = ["create_tables", "seed_initial_data"]
+__all__ = [
+    "create_tables",
+    "create_hot_path_indexes",
+    "add_epoch_columns",
+    "create_change_counters",
+    "create_product_search",
+    "add_search_keys",
+    "create_sales_counters",
+    "create_sales_rollups",
+    "create_report_counters",
+    "create_report_product_counters",
+    "create_product_day_ranking",
+    "rebuild_sales_counters",
+    "rebuild_sales_rollups",
+    "seed_initial_data",
+    "migrate",
+    "current_version",
+    "MIGRATIONS",
+    "LATEST_VERSION",
+]
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+from .amostras import Amostras
+from .config import get_config
+from .logger import get_logger
+
+logger = get_logger()
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(query: str) -> str:
+    """Normaliza o SQL para agrupar execuções do mesmo comando."""
+    texto = _STRING_RE.sub("?", query)
+    texto = _NUMBER_RE.sub("?", texto)
+    texto = _IN_LIST_RE.sub("(?+)", texto)
+    return _SPACES_RE.sub(" ", texto).strip().rstrip(";").lower()
+
+
+class QueryStat(Amostras):
+    """Tempos de um fingerprint de SQL; o resumo traz o fingerprint no lugar do nome."""
+
+    __slots__ = ()
+
+    @property
+    def fingerprint(self) -> str:
+        return self.nome
+
+    def resumo(self) -> Dict[str, Any]:
+        resumo = Amostras.resumo(self)
+        return {"fingerprint": resumo.pop("nome"), **resumo}
+
+
+class QueryStats:
+    """Acumula tempos por fingerprint e registra consultas lentas no log."""
+
+    def __init__(self) -> None:
+        self._stats: Dict[str, QueryStat] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(get_config().database["instrumentation"])
+
+    @property
+    def slow_query_ms(self) -> float:
+        return float(get_config().database["slow_query_ms"])
+
+    def registrar(
+        self,
+        query: str,
+        params: Iterable[Any] | Dict[str, Any],
+        duracao_ms: float,
+        conn: Optional[sqlite3.Connection] = None,
+    ) -> None:
+        chave = fingerprint(query)
+        with self._lock:
+            stat = self._stats.get(chave)
+            if stat is None:
+                stat = self._stats[chave] = QueryStat(chave)
+            stat.registrar(duracao_ms)
+        if duracao_ms >= self.slow_query_ms:
+            plano = explain(conn, query, params) if conn is not None else []
+            logger.warning(
+                "Consulta lenta (%.1f ms): %s | plano: %s",
+                duracao_ms,
+                chave,
+                " / ".join(plano) or "-",
+            )
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            resumos = [stat.resumo() for stat in self._stats.values()]
+        return sorted(resumos, key=lambda r: r["total_ms"], reverse=True)
+
+    def dump(self, limite: int = 20) -> List[Dict[str, Any]]:
+        resumos = self.snapshot()
+        logger.info("Estatísticas de consultas (%d fingerprints):", len(resumos))
+        for r in resumos[:limite]:
+            logger.info(
+                "%6d x | total %9.1f ms | p50 %7.2f | p99 %7.2f | max %7.2f | %s",
+                r["count"],
+                r["total_ms"],
+                r["p50_ms"],
+                r["p99_ms"],
+                r["max_ms"],
+                r["fingerprint"],
+            )
+        return resumos
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+def explain(
+    conn: sqlite3.Connection,
+    query: str,
+    params: Iterable[Any] | Dict[str, Any] | None = None,
+) -> List[str]:
+    """Retorna as linhas do EXPLAIN QUERY PLAN (vazio para não-SELECTs)."""
+    if not query.lstrip().upper().startswith(("SELECT", "WITH")):
+        return []
+    try:
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {query}", params or ()).fetchall()
+    except sqlite3.Error:
+        return []
+    return [row[3] for row in rows]
+
+
+stats = QueryStats()
+
+__all__ = ["QueryStat", "QueryStats", "fingerprint", "explain", "stats"]
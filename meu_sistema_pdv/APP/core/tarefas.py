@@ -0,0 +1,147 @@
+"""Consultas das telas em segundo plano, num pool de threads compartilhado.
+
+O pool tem o tamanho do pool de leitores do banco (`database.read_pool_size`):
+mais threads que isso só esperariam por uma conexão livre. O resultado chega
+pela callback `ao_concluir`, na thread do pool, e só se o `Cancelamento` da
+carga ainda não tiver sido acionado (ex.: o usuário trocou as datas).
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+from .config import get_config
+from .logger import get_logger
+
+logger = get_logger()
+
+T = TypeVar("T")
+
+
+class Cancelamento:
+    """Sinal compartilhado pelas tarefas de uma mesma carga de tela."""
+
+    def __init__(self) -> None:
+        self._evento = threading.Event()
+        self._lock = threading.Lock()
+        self._futuros: List[Future] = []
+
+    @property
+    def cancelado(self) -> bool:
+        return self._evento.is_set()
+
+    def cancelar(self) -> None:
+        """Descarta os resultados pendentes; tarefas ainda na fila nem rodam."""
+        self._evento.set()
+        with self._lock:
+            futuros, self._futuros = self._futuros, []
+        for futuro in futuros:
+            futuro.cancel()
+
+    def _acompanhar(self, futuro: Future) -> None:
+        with self._lock:
+            self._futuros = [f for f in self._futuros if not f.done()]
+            self._futuros.append(futuro)
+        if self.cancelado:
+            futuro.cancel()
+
+
+class Tarefas:
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        self._max_workers = max_workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.enviadas = 0
+        self.concluidas = 0
+        self.descartadas = 0
+        self.falhas = 0
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    workers = self._max_workers or int(get_config().database["read_pool_size"])
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=max(1, workers), thread_name_prefix="tarefas"
+                    )
+        return self._pool
+
+    def enviar(
+        self,
+        funcao: Callable[[], T],
+        *,
+        token: Cancelamento,
+        ao_concluir: Callable[[T], None],
+        ao_falhar: Optional[Callable[[BaseException], None]] = None,
+    ) -> Future:
+        def executar() -> Any:
+            if token.cancelado:
+                return None
+            return funcao()
+
+        with self._lock:
+            self.enviadas += 1
+        futuro = self._executor().submit(executar)
+        token._acompanhar(futuro)
+        futuro.add_done_callback(lambda f: self._entregar(f, token, ao_concluir, ao_falhar))
+        return futuro
+
+    def _entregar(
+        self,
+        futuro: Future,
+        token: Cancelamento,
+        ao_concluir: Callable[[Any], None],
+        ao_falhar: Optional[Callable[[BaseException], None]],
+    ) -> None:
+        if futuro.cancelled() or token.cancelado:
+            with self._lock:
+                self.descartadas += 1
+            return
+        erro = futuro.exception()
+        try:
+            if erro is None:
+                ao_concluir(futuro.result())
+                with self._lock:
+                    self.concluidas += 1
+                return
+            with self._lock:
+                self.falhas += 1
+            logger.error("Falha em tarefa de segundo plano", exc_info=erro)
+            if ao_falhar is not None:
+                ao_falhar(erro)
+        except Exception:
+            logger.exception("Falha ao entregar o resultado de uma tarefa")
+
+    def encerrar(self, esperar: bool = True) -> None:
+        """Fecha o pool; com `esperar`, roda e entrega tudo o que está na fila."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=esperar, cancel_futures=not esperar)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "enviadas": self.enviadas,
+                "concluidas": self.concluidas,
+                "descartadas": self.descartadas,
+                "falhas": self.falhas,
+            }
+
+
+tarefas = Tarefas()
+
+
+def enviar(
+    funcao: Callable[[], T],
+    *,
+    token: Cancelamento,
+    ao_concluir: Callable[[T], None],
+    ao_falhar: Optional[Callable[[BaseException], None]] = None,
+) -> Future:
+    return tarefas.enviar(funcao, token=token, ao_concluir=ao_concluir, ao_falhar=ao_falhar)
+
+
+__all__ = ["Cancelamento", "Tarefas", "enviar", "tarefas"]
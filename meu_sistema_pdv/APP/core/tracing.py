@@ -0,0 +1,152 @@
+"""Rastreamento opcional das fases de inicialização.
+
+Liga com a variável de ambiente `PDV_TRACE_STARTUP=1` ou com
+`python main.py --trace-startup`. Desligado, `span()` não mede nada.
+Este módulo só usa a biblioteca padrão para poder ser importado antes de
+qualquer outra parte do sistema.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, List, Optional
+
+ENV_VAR = "PDV_TRACE_STARTUP"
+FLAG = "--trace-startup"
+
+
+@dataclass(slots=True)
+class Span:
+    nome: str
+    inicio: float
+    fim: Optional[float] = None
+    filhos: List["Span"] = field(default_factory=list)
+
+    @property
+    def duracao_ms(self) -> float:
+        fim = self.fim if self.fim is not None else time.perf_counter()
+        return (fim - self.inicio) * 1000
+
+    def como_dict(self, origem: float) -> Dict[str, Any]:
+        return {
+            "nome": self.nome,
+            "inicio_ms": round((self.inicio - origem) * 1000, 3),
+            "duracao_ms": round(self.duracao_ms, 3),
+            "filhos": [filho.como_dict(origem) for filho in self.filhos],
+        }
+
+    def procurar(self, nome: str) -> Optional["Span"]:
+        if self.nome == nome:
+            return self
+        for filho in self.filhos:
+            encontrado = filho.procurar(nome)
+            if encontrado:
+                return encontrado
+        return None
+
+
+class Rastreador:
+    """Monta uma árvore de spans a partir de blocos `with span(nome)`.
+
+    Cada thread tem sua pilha; o primeiro span de uma thread entra como
+    filho da raiz (o `main(page)` do Flet roda fora da thread do import).
+    """
+
+    def __init__(self, ativo: bool = False) -> None:
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.ativo = False
+        self.raiz = Span("inicializacao", time.perf_counter())
+        self.iniciado_em = time.time()
+        if ativo:
+            self.ativar()
+
+    def ativar(self) -> None:
+        self.ativo = True
+
+    def span(self, nome: str) -> ContextManager[None]:
+        if not self.ativo:
+            return nullcontext()
+        return self._medir(nome)
+
+    @contextmanager
+    def _medir(self, nome: str) -> Iterator[None]:
+        pilha: List[Span] = getattr(self._local, "pilha", None) or [self.raiz]
+        self._local.pilha = pilha
+        atual = Span(nome, time.perf_counter())
+        with self._lock:
+            pilha[-1].filhos.append(atual)
+        pilha.append(atual)
+        try:
+            yield
+        finally:
+            atual.fim = time.perf_counter()
+            pilha.pop()
+
+    def concluir(self, caminho: Optional[Path] = None) -> Optional[Span]:
+        """Fecha a raiz, desliga o rastreamento e grava o relatório em JSON."""
+        if not self.ativo:
+            return None
+        self.ativo = False
+        self.raiz.fim = time.perf_counter()
+        if caminho is not None:
+            caminho.parent.mkdir(parents=True, exist_ok=True)
+            caminho.write_text(
+                json.dumps(self.relatorio(), ensure_ascii=False, indent=2),
+                encoding="utf-8",
+            )
+        return self.raiz
+
+    def relatorio(self) -> Dict[str, Any]:
+        return {
+            "iniciado_em": self.iniciado_em,
+            "total_ms": round(self.raiz.duracao_ms, 3),
+            "arvore": self.raiz.como_dict(self.raiz.inicio),
+        }
+
+    def formatar(self) -> str:
+        linhas: List[str] = []
+
+        def visitar(span: Span, nivel: int) -> None:
+            inicio = (span.inicio - self.raiz.inicio) * 1000
+            linhas.append(
+                f"{'  ' * nivel}{span.nome}: {span.duracao_ms:.1f} ms (+{inicio:.1f} ms)"
+            )
+            for filho in span.filhos:
+                visitar(filho, nivel + 1)
+
+        visitar(self.raiz, 0)
+        return "\n".join(linhas)
+
+
+rastreador = Rastreador(ativo=os.environ.get(ENV_VAR, "") not in ("", "0"))
+
+
+def span(nome: str) -> ContextManager[None]:
+    return rastreador.span(nome)
+
+
+def ativar() -> None:
+    rastreador.ativar()
+
+
+def ativo() -> bool:
+    return rastreador.ativo
+
+
+__all__ = [
+    "ENV_VAR",
+    "FLAG",
+    "Rastreador",
+    "Span",
+    "ativar",
+    "ativo",
+    "rastreador",
+    "span",
+]
@@ -4,8 +4,11 @@ import hashlib
 import hmac
 import os
 import secrets
-from datetime import date, datetime
-from typing import Tuple
+import unicodedata
+from datetime import date, datetime, timedelta
+from typing import Optional, Tuple, Union
+
+Momento = Union[int, float, date, datetime, str]
 
 
 def hash_password(password: str) -> str:
@@ -35,21 +38,104 @@ def format_currency(valor: float) -> str:
     return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
 
 
-def hoje_intervalo() -> Tuple[str, str]:
-    hoje = date.today()
-    inicio = datetime.combine(hoje, datetime.min.time())
-    fim = datetime.combine(hoje, datetime.max.time())
-    return inicio.isoformat(), fim.isoformat()
+def normalizar_busca(texto: Optional[str]) -> str:
+    """Chave de busca: sem acentos, casefold e espaços simples ("Pão  DOCE" -> "pao doce")."""
+    if not texto:
+        return ""
+    decomposto = unicodedata.normalize("NFKD", texto)
+    sem_acentos = "".join(c for c in decomposto if not unicodedata.combining(c))
+    return " ".join(sem_acentos.casefold().split())
+
+
+def prefixo_intervalo(prefixo: str) -> Tuple[str, str]:
+    """Limites [prefixo, próximo) para buscar por prefixo num índice de texto."""
+    return prefixo, prefixo[:-1] + chr(ord(prefixo[-1]) + 1)
+
+
+def agora_carimbo() -> Tuple[int, str]:
+    """Instante atual como (epoch em segundos, ISO local legível)."""
+    agora = datetime.now().replace(microsecond=0)
+    return int(agora.timestamp()), agora.isoformat()
+
+
+def para_epoch(valor: Momento) -> int:
+    """Converte datas/horários locais (ou epoch) para segundos desde 1970."""
+    if isinstance(valor, (int, float)):
+        return int(valor)
+    if isinstance(valor, str):
+        valor = datetime.fromisoformat(valor.strip())
+    if not isinstance(valor, datetime):
+        valor = datetime.combine(valor, datetime.min.time())
+    return int(valor.timestamp())
+
+
+def intervalo_dias(inicio: date | str, fim: date | str | None = None) -> Tuple[int, int]:
+    """Intervalo semiaberto [inicio 00:00, dia seguinte a fim 00:00) em epoch."""
+    if isinstance(inicio, str):
+        inicio = date.fromisoformat(inicio.strip()[:10])
+    if fim is None:
+        fim = inicio
+    elif isinstance(fim, str):
+        fim = date.fromisoformat(fim.strip()[:10])
+    return para_epoch(inicio), para_epoch(fim + timedelta(days=1))
+
+
+def dia_epoch(ts: int) -> int:
+    """Epoch da meia-noite local do dia que contém `ts`."""
+    return para_epoch(datetime.fromtimestamp(ts).date())
+
+
+def proximo_dia_epoch(ts: int) -> int:
+    """Meia-noite local seguinte a `ts` (dias de 23 a 25 h no horário de verão)."""
+    return dia_epoch(dia_epoch(ts) + 30 * 3600)
+
+
+def hora_epoch(ts: int) -> int:
+    """Início da hora de `ts`, contada a partir da meia-noite local do dia.
+
+    Assim as horas de um dia nunca atravessam a virada, mesmo em fusos
+    com deslocamento fracionário.
+    """
+    dia = dia_epoch(ts)
+    return dia + (ts - dia) // 3600 * 3600
+
+
+# Popularidade com decaimento "para frente": cada venda soma
+# quantidade * 2^((ts - referência) / meia-vida). Vendas recentes pesam mais
+# sem precisar reescrever os valores antigos; só a ordem relativa importa.
+# Para o peso não estourar o float (2^1024), a referência anda em meias-vidas
+# inteiras depois de `POPULARIDADE_REBASE_MEIAS_VIDAS` (~5 anos) e os scores
+# são multiplicados pela potência de 2 correspondente, o que é exato. A
+# referência em uso fica em `contadores.popularidade_referencia`.
+POPULARIDADE_REFERENCIA_TS = 1_704_067_200  # 2024-01-01 UTC
+POPULARIDADE_MEIA_VIDA_S = 14 * 86_400
+POPULARIDADE_REBASE_MEIAS_VIDAS = 128
+
+
+def peso_popularidade(ts: int, referencia: int = POPULARIDADE_REFERENCIA_TS) -> float:
+    return 2.0 ** ((ts - referencia) / POPULARIDADE_MEIA_VIDA_S)
+
+
+def nova_referencia_popularidade(ts: int, referencia: int) -> Optional[int]:
+    """Referência adiantada para `ts`, ou None se o peso ainda está longe do limite."""
+    meias_vidas = (ts - referencia) // POPULARIDADE_MEIA_VIDA_S
+    if meias_vidas < POPULARIDADE_REBASE_MEIAS_VIDAS:
+        return None
+    return referencia + meias_vidas * POPULARIDADE_MEIA_VIDA_S
+
+
+def hoje_intervalo() -> Tuple[int, int]:
+    return intervalo_dias(date.today())
 
 
-def mes_atual_intervalo() -> Tuple[str, str]:
+def mes_atual_intervalo() -> Tuple[int, int]:
     hoje = date.today()
-    inicio = datetime(hoje.year, hoje.month, 1)
+    inicio = date(hoje.year, hoje.month, 1)
     if hoje.month == 12:
-        fim = datetime(hoje.year + 1, 1, 1)
+        proximo = date(hoje.year + 1, 1, 1)
     else:
-        fim = datetime(hoje.year, hoje.month + 1, 1)
-    return inicio.isoformat(), fim.isoformat()
+        proximo = date(hoje.year, hoje.month + 1, 1)
+    return para_epoch(inicio), para_epoch(proximo)
 
 
 __all__ = [
@@ -57,6 +143,17 @@ __all__ = [
     "check_password",
     "gerar_chave_unica",
     "format_currency",
+    "normalizar_busca",
+    "prefixo_intervalo",
+    "Momento",
+    "agora_carimbo",
+    "para_epoch",
+    "intervalo_dias",
+    "dia_epoch",
+    "proximo_dia_epoch",
+    "hora_epoch",
+    "peso_popularidade",
+    "nova_referencia_popularidade",
     "hoje_intervalo",
     "mes_atual_intervalo",
 ]
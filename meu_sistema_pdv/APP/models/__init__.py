@@ -2,8 +2,11 @@
 
 from . import (
     caixa_models,
+    carrinho,
     clientes_models,
     produtos_models,
+    relatorios_models,
+    resumos_models,
     usuarios_models,
     vendas_models,
 )
@@ -14,4 +17,7 @@ __all__ = [
     "vendas_models",
     "caixa_models",
     "clientes_models",
+    "carrinho",
+    "resumos_models",
+    "relatorios_models",
 ]
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import List, Optional
+import sqlite3
+from typing import Dict, List, Optional, Sequence, Tuple
 
-from APP.core.database import execute, get_connection
+from APP.core.database import execute, transaction
 from APP.core.logger import get_logger
-from APP.core.utils import gerar_chave_unica
+from APP.core.utils import Momento, agora_carimbo, gerar_chave_unica, para_epoch
+
+from .resumos_models import relatorios_cache, versao_relatorios
 
 logger = get_logger()
 
@@ -13,33 +15,49 @@ logger = get_logger()
 def caixa_aberto(usuario_id: Optional[int] = None):
     if usuario_id:
         return execute(
-            "SELECT * FROM caixas WHERE status = 'aberto' AND usuario_id = ? ORDER BY aberto_em DESC LIMIT 1",
+            "SELECT * FROM caixas WHERE status = 'aberto' AND usuario_id = ? ORDER BY aberto_ts DESC LIMIT 1",
             (usuario_id,),
             fetchone=True,
         )
     return execute(
-        "SELECT * FROM caixas WHERE status = 'aberto' ORDER BY aberto_em DESC LIMIT 1",
+        "SELECT * FROM caixas WHERE status = 'aberto' ORDER BY aberto_ts DESC LIMIT 1",
         fetchone=True,
     )
 
 
 def abrir_caixa(usuario_id: int, valor_abertura: float):
-    conn = get_connection()
-    with conn:
+    with transaction() as conn:
         cursor = conn.cursor()
         codigo = gerar_chave_unica("CX")
+        agora_ts, agora = agora_carimbo()
         cursor.execute(
             """
-            INSERT INTO caixas (codigo, usuario_id, aberto_em, valor_abertura, status)
-            VALUES (?, ?, CURRENT_TIMESTAMP, ?, 'aberto')
+            INSERT INTO caixas (codigo, usuario_id, aberto_em, aberto_ts, valor_abertura, status)
+            VALUES (?, ?, ?, ?, ?, 'aberto')
             """,
-            (codigo, usuario_id, valor_abertura),
+            (codigo, usuario_id, agora, agora_ts, valor_abertura),
         )
         caixa_id = cursor.lastrowid
+    relatorios_cache.registrar_escrita(agora_ts)
     logger.info("Caixa %s aberto por usuário %s", codigo, usuario_id)
     return caixa_id
 
 
+_INSERT_MOVIMENTO = """
+INSERT INTO caixa_movimentos (
+    caixa_id,
+    tipo,
+    valor,
+    forma_pagamento,
+    referencia_venda_id,
+    descricao,
+    criado_em,
+    criado_ts
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
 def registrar_movimento(
     caixa_id: int,
     *,
@@ -49,23 +67,52 @@ def registrar_movimento(
     venda_id: Optional[int] = None,
     descricao: str | None = None,
 ) -> None:
-    agora = datetime.now().isoformat()
-    execute(
-        """
-        INSERT INTO caixa_movimentos (
-            caixa_id,
-            tipo,
-            valor,
-            forma_pagamento,
-            referencia_venda_id,
-            descricao,
-            criado_em
+    agora_ts, agora = agora_carimbo()
+    with transaction() as conn:
+        versao_anterior = versao_relatorios(conn)
+        conn.execute(
+            _INSERT_MOVIMENTO,
+            (caixa_id, tipo, valor, forma_pagamento, venda_id, descricao, agora, agora_ts),
         )
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-        """,
-        (caixa_id, tipo, valor, forma_pagamento, venda_id, descricao, agora),
-        commit=True,
+        versoes = (versao_anterior, versao_relatorios(conn))
+    relatorios_cache.registrar_escrita(agora_ts, versoes)
+
+
+def registrar_movimentos_venda(
+    cursor: sqlite3.Cursor,
+    *,
+    usuario_id: int,
+    venda_id: int,
+    codigo: str,
+    pagamentos: Sequence[Dict],
+    carimbo: Tuple[int, str],
+) -> Optional[int]:
+    """Lança os pagamentos da venda no caixa aberto, dentro da transação dada."""
+    row = cursor.execute(
+        "SELECT id FROM caixas WHERE status = 'aberto' AND usuario_id = ? ORDER BY aberto_ts DESC LIMIT 1",
+        (usuario_id,),
+    ).fetchone()
+    if row is None:
+        return None
+    caixa_id = row[0]
+    agora_ts, agora = carimbo
+    cursor.executemany(
+        _INSERT_MOVIMENTO,
+        [
+            (
+                caixa_id,
+                "venda",
+                pagamento["valor"],
+                pagamento["forma"],
+                venda_id,
+                f"Venda {codigo}",
+                agora,
+                agora_ts,
+            )
+            for pagamento in pagamentos
+        ],
     )
+    return caixa_id
 
 
 def total_por_forma(caixa_id: int) -> List:
@@ -82,88 +129,99 @@ def total_por_forma(caixa_id: int) -> List:
 
 
 def fechar_caixa(caixa_id: int, valor_fechamento: float) -> None:
+    agora_ts, agora = agora_carimbo()
     execute(
         """
         UPDATE caixas
         SET status = 'fechado',
-            fechado_em = CURRENT_TIMESTAMP,
+            fechado_em = ?,
+            fechado_ts = ?,
             valor_fechamento = ?
         WHERE id = ?
         """,
-        (valor_fechamento, caixa_id),
+        (agora, agora_ts, valor_fechamento, caixa_id),
         commit=True,
     )
+    relatorios_cache.registrar_escrita(agora_ts)
     logger.info("Caixa %s fechado.", caixa_id)
 
 
-def relatorio_caixas(inicio: str, fim: str) -> List:
+def relatorio_caixas(inicio: Momento, fim: Momento) -> List:
+    # Subconsultas correlacionadas mantêm o filtro de período no índice de
+    # aberto_ts; um GROUP BY c.id faria o SQLite varrer todos os caixas.
     return execute(
         """
         SELECT
             c.*,
             u.nome AS operador,
-            COALESCE(SUM(m.valor), 0) AS total_movimentado,
-            COALESCE(SUM(CASE WHEN m.tipo = 'venda' THEN m.valor ELSE 0 END), 0) AS total_vendas
+            (
+                SELECT COALESCE(SUM(m.valor), 0)
+                FROM caixa_movimentos m
+                WHERE m.caixa_id = c.id
+            ) AS total_movimentado,
+            (
+                SELECT COALESCE(SUM(m.valor), 0)
+                FROM caixa_movimentos m
+                WHERE m.caixa_id = c.id AND m.tipo = 'venda'
+            ) AS total_vendas
         FROM caixas c
         JOIN usuarios u ON u.id = c.usuario_id
-        LEFT JOIN caixa_movimentos m ON m.caixa_id = c.id
-        WHERE c.aberto_em BETWEEN ? AND ?
-        GROUP BY c.id
-        ORDER BY c.aberto_em DESC
+        WHERE c.aberto_ts >= ? AND c.aberto_ts < ?
+        ORDER BY c.aberto_ts DESC
         """,
-        (inicio, fim),
+        (para_epoch(inicio), para_epoch(fim)),
         fetchall=True,
     )
 
 
-def total_saidas_periodo(inicio: str, fim: str) -> float:
+def total_saidas_periodo(inicio: Momento, fim: Momento) -> float:
     row = execute(
         """
         SELECT COALESCE(SUM(valor), 0) AS total
         FROM caixa_movimentos
-        WHERE tipo = 'saida_caixa' AND criado_em BETWEEN ? AND ?
+        WHERE tipo = 'saida_caixa' AND criado_ts >= ? AND criado_ts < ?
         """,
-        (inicio, fim),
+        (para_epoch(inicio), para_epoch(fim)),
         fetchone=True,
     )
     return abs(float(row["total"] if row else 0))
 
 
-def saidas_por_periodo(inicio: str, fim: str) -> List:
+def saidas_por_periodo(inicio: Momento, fim: Momento) -> List:
     return execute(
         """
         SELECT descricao, valor, criado_em
         FROM caixa_movimentos
-        WHERE tipo = 'saida_caixa' AND criado_em BETWEEN ? AND ?
-        ORDER BY criado_em DESC
+        WHERE tipo = 'saida_caixa' AND criado_ts >= ? AND criado_ts < ?
+        ORDER BY criado_ts DESC
         """,
-        (inicio, fim),
+        (para_epoch(inicio), para_epoch(fim)),
         fetchall=True,
     )
 
 
-def total_perdas_periodo(inicio: str, fim: str) -> float:
+def total_perdas_periodo(inicio: Momento, fim: Momento) -> float:
     row = execute(
         """
         SELECT COALESCE(SUM(valor), 0) AS total
         FROM caixa_movimentos
-        WHERE tipo = 'perda' AND criado_em BETWEEN ? AND ?
+        WHERE tipo = 'perda' AND criado_ts >= ? AND criado_ts < ?
         """,
-        (inicio, fim),
+        (para_epoch(inicio), para_epoch(fim)),
         fetchone=True,
     )
     return abs(float(row["total"] if row else 0))
 
 
-def perdas_por_periodo(inicio: str, fim: str) -> List:
+def perdas_por_periodo(inicio: Momento, fim: Momento) -> List:
     return execute(
         """
         SELECT descricao, valor, criado_em
         FROM caixa_movimentos
-        WHERE tipo = 'perda' AND criado_em BETWEEN ? AND ?
-        ORDER BY criado_em DESC
+        WHERE tipo = 'perda' AND criado_ts >= ? AND criado_ts < ?
+        ORDER BY criado_ts DESC
         """,
-        (inicio, fim),
+        (para_epoch(inicio), para_epoch(fim)),
         fetchall=True,
     )
 
@@ -172,6 +230,7 @@ __all__ = [
     "caixa_aberto",
     "abrir_caixa",
     "registrar_movimento",
+    "registrar_movimentos_venda",
     "total_por_forma",
     "fechar_caixa",
     "relatorio_caixas",
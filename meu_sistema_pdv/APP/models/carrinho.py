@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from typing import Dict, Iterator, List, Optional
+
+
+class ItemCarrinho:
+    __slots__ = ("produto_id", "nome", "preco_unitario", "quantidade")
+
+    def __init__(
+        self, produto_id: int, nome: str, preco_unitario: float, quantidade: float
+    ) -> None:
+        self.produto_id = produto_id
+        self.nome = nome
+        self.preco_unitario = preco_unitario
+        self.quantidade = quantidade
+
+    @property
+    def total(self) -> float:
+        return self.quantidade * self.preco_unitario
+
+    def como_dict(self) -> dict:
+        return {
+            "produto_id": self.produto_id,
+            "nome": self.nome,
+            "preco_unitario": self.preco_unitario,
+            "quantidade": self.quantidade,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"ItemCarrinho({self.produto_id}, {self.nome!r}, "
+            f"{self.preco_unitario}, {self.quantidade})"
+        )
+
+
+class Carrinho:
+    """Itens da venda em andamento, indexados por produto.
+
+    O dicionário por `produto_id` guarda também a ordem de inclusão, então
+    somar, alterar ou remover um item não percorre as outras linhas, e o
+    subtotal é mantido a cada operação em vez de recalculado.
+    """
+
+    QUANTIDADE_MINIMA = 0.01
+
+    def __init__(self) -> None:
+        self._itens: Dict[int, ItemCarrinho] = {}
+        self._subtotal = 0.0
+        self._desconto = 0.0
+
+    def __len__(self) -> int:
+        return len(self._itens)
+
+    def __bool__(self) -> bool:
+        return bool(self._itens)
+
+    def __iter__(self) -> Iterator[ItemCarrinho]:
+        return iter(self._itens.values())
+
+    def __contains__(self, produto_id: object) -> bool:
+        return produto_id in self._itens
+
+    def item(self, produto_id: int) -> Optional[ItemCarrinho]:
+        return self._itens.get(produto_id)
+
+    def ultimo(self) -> Optional[ItemCarrinho]:
+        return next(reversed(self._itens.values()), None)
+
+    def adicionar(
+        self, produto_id: int, nome: str, preco_unitario: float, quantidade: float
+    ) -> ItemCarrinho:
+        """Inclui o produto ou soma a quantidade na linha que já existe."""
+        item = self._itens.get(produto_id)
+        if item is None:
+            item = self._itens[produto_id] = ItemCarrinho(
+                produto_id, nome, preco_unitario, quantidade
+            )
+            self._subtotal += item.total
+        else:
+            self._definir_quantidade(item, item.quantidade + quantidade)
+        return item
+
+    def ajustar_quantidade(self, produto_id: int, delta: float) -> Optional[ItemCarrinho]:
+        item = self._itens.get(produto_id)
+        if item is not None:
+            self._definir_quantidade(
+                item, max(self.QUANTIDADE_MINIMA, item.quantidade + delta)
+            )
+        return item
+
+    def alterar_preco(self, produto_id: int, preco_unitario: float) -> Optional[ItemCarrinho]:
+        item = self._itens.get(produto_id)
+        if item is not None:
+            self._subtotal += item.quantidade * (preco_unitario - item.preco_unitario)
+            item.preco_unitario = preco_unitario
+        return item
+
+    def remover(self, produto_id: int) -> Optional[ItemCarrinho]:
+        item = self._itens.pop(produto_id, None)
+        if item is not None:
+            if self._itens:
+                self._subtotal -= item.total
+            else:
+                self._subtotal = 0.0  # sem resíduo de ponto flutuante
+        return item
+
+    def limpar(self) -> None:
+        self._itens.clear()
+        self._subtotal = 0.0
+        self._desconto = 0.0
+
+    def _definir_quantidade(self, item: ItemCarrinho, quantidade: float) -> None:
+        self._subtotal += (quantidade - item.quantidade) * item.preco_unitario
+        item.quantidade = quantidade
+
+    @property
+    def subtotal(self) -> float:
+        return max(self._subtotal, 0.0)
+
+    @property
+    def desconto(self) -> float:
+        """Desconto informado, limitado ao subtotal atual."""
+        return max(0.0, min(self._desconto, self.subtotal))
+
+    @desconto.setter
+    def desconto(self, valor: float) -> None:
+        self._desconto = valor
+
+    @property
+    def total(self) -> float:
+        return self.subtotal - self.desconto
+
+    def itens_venda(self) -> List[dict]:
+        """Linhas no formato esperado por `vendas_models.finalizar_venda`."""
+        return [item.como_dict() for item in self._itens.values()]
+
+
+__all__ = ["Carrinho", "ItemCarrinho"]
@@ -3,18 +3,18 @@ from __future__ import annotations
 from typing import List, Optional
 
 from APP.core.database import execute
+from APP.core.utils import normalizar_busca
 
 
 def listar_clientes(busca: Optional[str] = None) -> List:
     if busca:
-        like = f"%{busca.upper()}%"
         return execute(
             """
             SELECT * FROM clientes
-            WHERE UPPER(nome) LIKE ? OR UPPER(documento) LIKE ?
+            WHERE busca LIKE ? OR documento LIKE ?
             ORDER BY nome
             """,
-            (like, like),
+            (f"%{normalizar_busca(busca)}%", f"%{busca.strip()}%"),
             fetchall=True,
         )
     return execute("SELECT * FROM clientes ORDER BY nome", fetchall=True)
@@ -37,10 +37,10 @@ def criar_cliente(
 ) -> int:
     return execute(
         """
-        INSERT INTO clientes (nome, documento, telefone, email, observacoes)
-        VALUES (?, ?, ?, ?, ?)
+        INSERT INTO clientes (nome, busca, documento, telefone, email, observacoes)
+        VALUES (?, ?, ?, ?, ?, ?)
         """,
-        (nome, documento, telefone, email, observacoes),
+        (nome, normalizar_busca(nome), documento, telefone, email, observacoes),
         commit=True,
     )
 
@@ -56,10 +56,10 @@ def atualizar_cliente(
     execute(
         """
         UPDATE clientes
-        SET nome = ?, documento = ?, telefone = ?, email = ?, observacoes = ?
+        SET nome = ?, busca = ?, documento = ?, telefone = ?, email = ?, observacoes = ?
         WHERE id = ?
         """,
-        (nome, documento, telefone, email, observacoes, cliente_id),
+        (nome, normalizar_busca(nome), documento, telefone, email, observacoes, cliente_id),
         commit=True,
     )
 
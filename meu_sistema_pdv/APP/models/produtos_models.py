@@ -1,25 +1,257 @@
 from __future__ import annotations
 
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
-from APP.core.database import execute
+from APP.core.cache import LRUCache
+from APP.core.config import get_config
+from APP.core.database import execute, transaction
 from APP.core.logger import get_logger
+from APP.core.utils import normalizar_busca, prefixo_intervalo
+
+from .resumos_models import relatorios_cache, versao_relatorios
 
 logger = get_logger()
 
 
+def _versao_catalogo(conn: Optional[sqlite3.Connection] = None) -> int:
+    query = "SELECT valor FROM contadores WHERE nome = 'produtos'"
+    row = conn.execute(query).fetchone() if conn else execute(query, fetchone=True)
+    return int(row[0]) if row else 0
+
+
+# (produto_id, linha gravada ou None se excluída, versão antes, versão depois)
+EscritaCatalogo = Tuple[int, Optional[dict], int, int]
+
+
+class CatalogoCache:
+    """Cópia em memória de `produtos` com índices por código de barras e PLU.
+
+    Escritas deste processo atualizam o cache logo após o commit; as de
+    outros processos são detectadas pelo contador `contadores.produtos`
+    (mantido por triggers), consultado no máximo a cada `revalidar_s`.
+    O estoque do cache acompanha apenas as baixas deste processo; telas que
+    precisam do saldo exato devem usar `obter_produto`.
+    """
+
+    def __init__(self) -> None:
+        self._por_id: Dict[int, dict] = {}
+        self._por_codigo: Dict[str, int] = {}
+        self._por_plu: Dict[int, int] = {}
+        self._versao: Optional[int] = None
+        self._verificado_em = 0.0
+        self._lock = threading.RLock()
+
+    def _carregar(self) -> None:
+        with self._lock:
+            versao = _versao_catalogo()
+            rows = execute("SELECT * FROM produtos", fetchall=True)
+            self._por_id = {}
+            self._por_codigo = {}
+            self._por_plu = {}
+            for row in rows:
+                self._indexar(dict(row))
+            self._versao = versao
+            self._verificado_em = time.monotonic()
+            logger.debug("Catálogo carregado: %d produtos (versão %d)", len(rows), versao)
+
+    def _garantir(self) -> None:
+        if self._versao is None:
+            self._carregar()
+            return
+        revalidar_s = float(get_config().database["catalog_revalidate_s"])
+        if time.monotonic() - self._verificado_em < revalidar_s:
+            return
+        with self._lock:
+            if _versao_catalogo() != self._versao:
+                self._carregar()
+            else:
+                self._verificado_em = time.monotonic()
+
+    def _indexar(self, produto: dict) -> None:
+        anterior = self._por_id.get(produto["id"])
+        if anterior:
+            self._desindexar_codigos(anterior)
+        self._por_id[produto["id"]] = produto
+        if produto["codigo_barras"]:
+            self._por_codigo[produto["codigo_barras"]] = produto["id"]
+            plu = _plu(produto["codigo_barras"])
+            if plu is not None:
+                self._por_plu[plu] = produto["id"]
+
+    def _desindexar_codigos(self, produto: dict) -> None:
+        if produto["codigo_barras"]:
+            self._por_codigo.pop(produto["codigo_barras"], None)
+            plu = _plu(produto["codigo_barras"])
+            if plu is not None and self._por_plu.get(plu) == produto["id"]:
+                del self._por_plu[plu]
+
+    def _copia(self, produto_id: Optional[int]) -> Optional[dict]:
+        # Quem lê recebe uma cópia: alterá-la não pode mexer no cache de todos.
+        produto = self._por_id.get(produto_id) if produto_id is not None else None
+        return dict(produto) if produto is not None else None
+
+    def por_codigo(self, codigo: str) -> Optional[dict]:
+        self._garantir()
+        return self._copia(self._por_codigo.get(codigo))
+
+    def por_plu(self, plu: int) -> Optional[dict]:
+        self._garantir()
+        return self._copia(self._por_plu.get(plu))
+
+    def por_id(self, produto_id: int) -> Optional[dict]:
+        self._garantir()
+        return self._copia(produto_id)
+
+    def versao(self) -> Optional[int]:
+        """Versão em memória, revalidada como nas leituras."""
+        self._garantir()
+        return self._versao
+
+    def ler_escrita(
+        self, conn: sqlite3.Connection, produto_id: int, versao_anterior: int
+    ) -> EscritaCatalogo:
+        """Lê, na transação `conn` ainda aberta, o que `aplicar_escrita` levará ao cache."""
+        row = conn.execute("SELECT * FROM produtos WHERE id = ?", (produto_id,)).fetchone()
+        produto = dict(row) if row is not None else None
+        return produto_id, produto, versao_anterior, _versao_catalogo(conn)
+
+    def aplicar_escrita(self, escrita: EscritaCatalogo) -> None:
+        """Reflete no cache uma escrita lida por `ler_escrita`, depois do commit.
+
+        Se a transação falhar o cache nem é tocado, então ninguém enxerga um
+        produto que foi desfeito.
+        """
+        produto_id, produto, versao_anterior, versao = escrita
+        with self._lock:
+            if self._versao is None:
+                return
+            if produto is None:
+                anterior = self._por_id.pop(produto_id, None)
+                if anterior:
+                    self._desindexar_codigos(anterior)
+            else:
+                self._indexar(produto)
+            if versao_anterior == self._versao:
+                self._versao = versao
+            else:
+                # Outro processo (ou outra escrita) mudou o catálogo antes:
+                # recarrega no próximo uso.
+                self._versao = -1
+                self._verificado_em = 0.0
+
+    def ajustar_estoque(self, produto_id: int, delta: float) -> None:
+        with self._lock:
+            produto = self._por_id.get(produto_id)
+            if produto is not None:
+                produto["estoque"] = produto["estoque"] + delta
+
+    def invalidar(self) -> None:
+        with self._lock:
+            self._versao = None
+            self._por_id = {}
+            self._por_codigo = {}
+            self._por_plu = {}
+
+
+def _plu(codigo_barras: str) -> Optional[int]:
+    """Produtos de balança são cadastrados com o PLU (até 6 dígitos) como código."""
+    if codigo_barras.isdigit() and len(codigo_barras) <= 6:
+        return int(codigo_barras)
+    return None
+
+
+catalogo = CatalogoCache()
+
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_fts_disponivel: Optional[bool] = None
+
+
+def fts_disponivel() -> bool:
+    """Indica se o índice FTS5 de produtos existe neste banco."""
+    global _fts_disponivel
+    if _fts_disponivel is None:
+        row = execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'produtos_fts'",
+            fetchone=True,
+        )
+        _fts_disponivel = row is not None
+    return _fts_disponivel
+
+
+def _expressao_fts(termo: str) -> Optional[str]:
+    """Converte o texto digitado em consulta FTS5: todos os termos, por prefixo."""
+    tokens = _TOKEN_RE.findall(normalizar_busca(termo))
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def _buscar_fts(termo: str, *, ordem: str, limite: Optional[int] = None) -> Optional[List]:
+    """Executa a busca no FTS5; retorna None quando é preciso usar o LIKE."""
+    global _fts_disponivel
+    expressao = _expressao_fts(termo)
+    if expressao is None or not fts_disponivel():
+        return None
+    sql = f"""
+        SELECT p.*, COALESCE(pp.score, 0) AS popularidade
+        FROM produtos_fts
+        JOIN produtos p ON p.id = produtos_fts.rowid
+        LEFT JOIN produto_popularidade pp ON pp.produto_id = p.id
+        WHERE produtos_fts MATCH ?
+        ORDER BY {ordem}
+    """
+    params: tuple = (expressao,)
+    if limite is not None:
+        sql += " LIMIT ?"
+        params += (limite,)
+    try:
+        return execute(sql, params, fetchall=True)
+    except sqlite3.OperationalError:
+        logger.warning("Busca FTS5 indisponível; usando LIKE.", exc_info=True)
+        _fts_disponivel = False
+        return None
+
+
+# Pesos do bm25 por coluna: nome, codigo_barras, categoria.
+_ORDEM_RELEVANCIA = "bm25(produtos_fts, 10.0, 5.0, 1.0), p.nome"
+# Sugestões: o que mais sai (com decaimento no tempo) vem primeiro.
+_ORDEM_SUGESTOES = "popularidade DESC, " + _ORDEM_RELEVANCIA
+_SELECT_SUGESTOES = """
+    SELECT p.*, COALESCE(pp.score, 0) AS popularidade
+    FROM produtos p
+    LEFT JOIN produto_popularidade pp ON pp.produto_id = p.id
+"""
+
+
+def invalidar_caches() -> None:
+    """Descarta tudo o que foi memorizado sobre o banco (ex.: ao trocar de arquivo)."""
+    global _fts_disponivel
+    _fts_disponivel = None
+    catalogo.invalidar()
+    sugestoes_cache.limpar()
+    relatorios_cache.limpar()
+
+
 def listar_produtos(busca: Optional[str] = None) -> List:
     if busca:
-        like = f"%{busca.upper()}%"
+        resultado = _buscar_fts(busca, ordem="p.nome")
+        if resultado is not None:
+            return resultado
         return execute(
             """
             SELECT * FROM produtos
-            WHERE UPPER(nome) LIKE ?
-               OR UPPER(codigo_barras) LIKE ?
+            WHERE busca LIKE ?
+               OR codigo_barras LIKE ?
             ORDER BY nome
             """,
-            (like, like),
+            (f"%{normalizar_busca(busca)}%", f"%{busca.strip()}%"),
             fetchall=True,
         )
     return execute("SELECT * FROM produtos ORDER BY nome", fetchall=True)
@@ -34,35 +266,318 @@ def obter_produto(produto_id: int):
 
 
 def buscar_por_codigo(codigo: str):
-    return execute(
-        "SELECT * FROM produtos WHERE codigo_barras = ?",
-        (codigo,),
-        fetchone=True,
-    )
+    return catalogo.por_codigo(codigo)
+
+
+def digito_verificador_ean(corpo: str) -> int:
+    """Dígito verificador EAN/GTIN para os dígitos de `corpo` (sem o DV)."""
+    soma = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(reversed(corpo), 1))
+    return (10 - soma % 10) % 10
+
+
+@dataclass(frozen=True, slots=True)
+class LayoutBalanca:
+    """Formato de etiqueta de balança; ver `BALANCA_DEFAULTS` em config."""
+
+    padrao: str
+    tipo: str
+    decimais: int
+    fixos: Tuple[Tuple[int, str], ...]
+    plu: Tuple[int, ...]
+    valor: Tuple[int, ...]
+    verificador: Optional[int]
+
+    @classmethod
+    def de_config(cls, dados: dict) -> "LayoutBalanca":
+        padrao = dados["padrao"]
+        tipo = dados.get("tipo", "preco")
+        if tipo not in ("preco", "peso"):
+            raise ValueError(f"Tipo de etiqueta inválido: {tipo!r}")
+        posicoes: Dict[str, List[int]] = {}
+        for i, c in enumerate(padrao):
+            posicoes.setdefault(c, []).append(i)
+        return cls(
+            padrao=padrao,
+            tipo=tipo,
+            decimais=int(dados.get("decimais", 2 if tipo == "preco" else 3)),
+            fixos=tuple((i, c) for i, c in enumerate(padrao) if c.isdigit()),
+            plu=tuple(posicoes.get("P", ())),
+            valor=tuple(posicoes.get("V", ())),
+            verificador=posicoes["C"][0] if "C" in posicoes else None,
+        )
+
+    def decodificar(self, codigo: str) -> Optional["EtiquetaBalanca"]:
+        if len(codigo) != len(self.padrao) or not codigo.isdigit():
+            return None
+        if any(codigo[i] != c for i, c in self.fixos):
+            return None
+        if self.verificador is not None and int(codigo[self.verificador]) != (
+            digito_verificador_ean(codigo[: self.verificador])
+        ):
+            return None
+        plu = int("".join(codigo[i] for i in self.plu))
+        valor = int("".join(codigo[i] for i in self.valor)) / 10**self.decimais
+        return EtiquetaBalanca(plu=plu, tipo=self.tipo, valor=valor)
+
+
+@dataclass(frozen=True, slots=True)
+class EtiquetaBalanca:
+    plu: int
+    tipo: str
+    valor: float
+
+
+@dataclass(frozen=True, slots=True)
+class LeituraCodigo:
+    """Produto lido no PDV; `quantidade` vem preenchida em etiquetas de balança."""
+
+    produto: dict
+    quantidade: Optional[float] = None
+    etiqueta: Optional[EtiquetaBalanca] = None
+
+
+_layouts: Tuple[Optional[list], Tuple[LayoutBalanca, ...]] = (None, ())
+
+
+def layouts_balanca() -> Tuple[LayoutBalanca, ...]:
+    global _layouts
+    configurados = get_config().balanca["layouts"]
+    if _layouts[0] is not configurados:
+        _layouts = (configurados, tuple(LayoutBalanca.de_config(d) for d in configurados))
+    return _layouts[1]
+
+
+def decodificar_etiqueta(codigo: str) -> List[EtiquetaBalanca]:
+    """Leituras possíveis do código, na ordem dos layouts configurados."""
+    etiquetas = []
+    for layout in layouts_balanca():
+        etiqueta = layout.decodificar(codigo)
+        if etiqueta is not None:
+            etiquetas.append(etiqueta)
+    return etiquetas
+
+
+def ler_codigo(codigo: str) -> Optional[LeituraCodigo]:
+    """Resolve um código lido: código de barras exato ou etiqueta de balança."""
+    codigo = codigo.strip()
+    if not codigo:
+        return None
+    produto = catalogo.por_codigo(codigo)
+    if produto is not None:
+        return LeituraCodigo(produto)
+    # Layouts podem se sobrepor (ex.: "2..." e "21..."): vale o primeiro
+    # cuja PLU existe no catálogo.
+    for etiqueta in decodificar_etiqueta(codigo):
+        produto = catalogo.por_plu(etiqueta.plu)
+        if produto is None:
+            continue
+        if etiqueta.tipo == "peso":
+            return LeituraCodigo(produto, etiqueta.valor, etiqueta)
+        if produto["preco_venda"]:
+            # Etiqueta de preço: converte para quantidade pelo preço cadastrado,
+            # assim o total do item fica igual ao impresso.
+            return LeituraCodigo(produto, etiqueta.valor / produto["preco_venda"], etiqueta)
+    return None
 
 
 def buscar_por_nome(fragmento: str):
-    frase = f"%{fragmento.upper()}%"
+    resultado = _buscar_fts(fragmento, ordem=_ORDEM_RELEVANCIA, limite=1)
+    if resultado is not None:
+        return resultado[0] if resultado else None
     return execute(
-        "SELECT * FROM produtos WHERE UPPER(nome) LIKE ? ORDER BY nome LIMIT 1",
-        (frase,),
+        "SELECT * FROM produtos WHERE busca LIKE ? ORDER BY nome LIMIT 1",
+        (f"%{normalizar_busca(fragmento)}%",),
         fetchone=True,
     )
 
 
-def buscar_sugestoes(termo: str, limite: int = 5) -> List:
-    like = f"%{termo.upper()}%"
-    return execute(
-        """
-        SELECT * FROM produtos
-        WHERE UPPER(nome) LIKE ?
-           OR UPPER(codigo_barras) LIKE ?
-        ORDER BY nome
-        LIMIT ?
-        """,
-        (like, like, limite),
-        fetchall=True,
+def _consultar_sugestoes(termo: str, limite: int) -> List:
+    resultado = _buscar_fts(termo, ordem=_ORDEM_SUGESTOES, limite=limite)
+    if resultado is not None:
+        return resultado
+    chave = normalizar_busca(termo)
+    if not chave:
+        return execute(
+            _SELECT_SUGESTOES + " ORDER BY popularidade DESC, p.nome LIMIT ?",
+            (limite,),
+            fetchall=True,
+        )
+    # Prefixo do nome primeiro (faixa no índice de busca); só completa com
+    # ocorrências no meio do nome/código quando faltam sugestões.
+    inicio, fim = prefixo_intervalo(chave)
+    sugestoes = list(
+        execute(
+            _SELECT_SUGESTOES
+            + """
+            WHERE p.busca >= ? AND p.busca < ?
+            ORDER BY popularidade DESC, p.busca
+            LIMIT ?
+            """,
+            (inicio, fim, limite),
+            fetchall=True,
+        )
+    )
+    if len(sugestoes) < limite:
+        sugestoes += execute(
+            _SELECT_SUGESTOES
+            + """
+            WHERE (p.busca LIKE ? OR p.codigo_barras LIKE ?)
+              AND NOT (p.busca >= ? AND p.busca < ?)
+            ORDER BY popularidade DESC, p.nome
+            LIMIT ?
+            """,
+            (f"%{chave}%", f"%{termo.strip()}%", inicio, fim, limite - len(sugestoes)),
+            fetchall=True,
+        )
+    return sugestoes
+
+
+# Ids (com a popularidade usada na ordenação) e se a lista está completa.
+_EntradaSugestoes = Tuple[Tuple[Tuple[int, float], ...], bool]
+
+
+class SugestoesCache:
+    """Resultados de `buscar_sugestoes` por termo normalizado, em LRU.
+
+    Quem digita "arr", "arro", "arroz" só consulta o banco na primeira tecla:
+    um termo que estende outro já guardado casa com um subconjunto dele, então
+    basta filtrar em memória os candidatos — desde que a lista guardada esteja
+    completa (menos de `candidatos` linhas). Guardamos só ids e popularidade e
+    montamos o retorno pelo catálogo, que já acompanha preço e estoque;
+    qualquer mudança na versão do catálogo descarta tudo.
+    """
+
+    def __init__(
+        self, *, candidatos: int = 200, max_termos: int = 256, max_ids: int = 20_000
+    ) -> None:
+        self.candidatos = candidatos
+        self._cache: LRUCache[Tuple[bool, str], _EntradaSugestoes] = LRUCache(
+            max_termos, max_peso=max_ids, peso=lambda entrada: len(entrada[0]) + 1
+        )
+        self._versao: Optional[int] = None
+        self._lock = threading.Lock()
+        self.consultas = 0
+        self.estreitadas = 0
+
+    def buscar(self, termo: str, chave: str, limite: int) -> List[dict]:
+        versao = catalogo.versao()
+        with self._lock:
+            if versao != self._versao:
+                self._cache.clear()
+                self._versao = versao
+        fts = fts_disponivel()
+        entrada = self._cache.get((fts, chave))
+        if entrada is None:
+            entrada = self._estreitar(fts, chave)
+        if entrada is None:
+            return self._consultar(termo, chave, fts, versao, limite)
+        produtos = []
+        for produto_id, popularidade in entrada[0]:
+            produto = catalogo.por_id(produto_id)
+            if produto is not None:
+                produtos.append(_sugestao(produto, popularidade))
+                if len(produtos) == limite:
+                    break
+        return produtos
+
+    def _consultar(
+        self, termo: str, chave: str, fts: bool, versao: Optional[int], limite: int
+    ) -> List[dict]:
+        rows = _consultar_sugestoes(termo, self.candidatos)
+        self.consultas += 1
+        ids = tuple((row["id"], row["popularidade"]) for row in rows)
+        if versao == self._versao:
+            self._cache.put((fts, chave), (ids, len(ids) < self.candidatos))
+        return [_sugestao(row, row["popularidade"]) for row in rows[:limite]]
+
+    def _estreitar(
+        self, fts: bool, chave: str
+    ) -> Optional[_EntradaSugestoes]:
+        for tamanho in range(len(chave) - 1, 0, -1):
+            base = self._cache.peek((fts, chave[:tamanho]))
+            if base is None:
+                continue
+            if not base[1]:
+                return None
+            candidatos = [
+                (catalogo.por_id(produto_id), popularidade)
+                for produto_id, popularidade in base[0]
+            ]
+            if fts:
+                # A base já vem por popularidade; filtrar preserva a ordem.
+                tokens = _TOKEN_RE.findall(chave)
+                filtrados = [(p, pop) for p, pop in candidatos if p and _casa_tokens(p, tokens)]
+            else:
+                filtrados = [(p, pop) for p, pop in candidatos if p and _casa_trecho(p, chave)]
+                # Mesma ordem do LIKE: prefixos do nome antes, depois o resto.
+                filtrados.sort(
+                    key=lambda par: (0, -par[1], _chave_produto(par[0]))
+                    if _chave_produto(par[0]).startswith(chave)
+                    else (1, -par[1], par[0]["nome"])
+                )
+            entrada = (tuple((p["id"], pop) for p, pop in filtrados), True)
+            self._cache.put((fts, chave), entrada)
+            self.estreitadas += 1
+            return entrada
+        return None
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._versao = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            **self._cache.stats(),
+            "consultas": self.consultas,
+            "estreitadas": self.estreitadas,
+        }
+
+
+def _sugestao(produto, popularidade: float) -> dict:
+    """Formato único das sugestões, venha do banco ou do cache: colunas de
+    `produtos` mais `popularidade`, numa cópia que o chamador pode alterar."""
+    sugestao = {chave: produto[chave] for chave in produto.keys() if chave != "popularidade"}
+    sugestao["popularidade"] = popularidade
+    return sugestao
+
+
+def _chave_produto(produto: dict) -> str:
+    return produto.get("busca") or normalizar_busca(produto["nome"])
+
+
+def _casa_tokens(produto: dict, tokens: List[str]) -> bool:
+    """Mesmo critério do MATCH com prefixo: cada termo inicia alguma palavra."""
+    texto = " ".join(
+        (
+            _chave_produto(produto),
+            normalizar_busca(produto["codigo_barras"]),
+            normalizar_busca(produto["categoria"]),
+        )
     )
+    palavras = _TOKEN_RE.findall(texto)
+    return all(any(p.startswith(t) for p in palavras) for t in tokens)
+
+
+def _casa_trecho(produto: dict, chave: str) -> bool:
+    return chave in _chave_produto(produto) or chave in normalizar_busca(
+        produto["codigo_barras"]
+    )
+
+
+sugestoes_cache = SugestoesCache()
+
+
+def buscar_sugestoes(termo: str, limite: int = 5) -> List:
+    chave = normalizar_busca(termo)
+    if not chave:
+        return [_sugestao(row, row["popularidade"]) for row in _consultar_sugestoes(termo, limite)]
+    return sugestoes_cache.buscar(termo, chave, limite)
+
+
+def _normalizar_codigo(codigo_barras: Optional[str]) -> Optional[str]:
+    codigo = (codigo_barras or "").strip()
+    return codigo or None
 
 
 def criar_produto(
@@ -77,24 +592,32 @@ def criar_produto(
     lote: Optional[str] = None,
 ) -> int:
     logger.info("Cadastrando produto %s", nome)
-    return execute(
-        """
-        INSERT INTO produtos
-        (nome, preco_venda, estoque, estoque_minimo, codigo_barras, categoria, data_validade, lote)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            nome,
-            preco_venda,
-            estoque,
-            estoque_minimo,
-            codigo_barras,
-            categoria,
-            data_validade,
-            lote,
-        ),
-        commit=True,
-    )
+    with transaction() as conn:
+        versao = _versao_catalogo(conn)
+        versao_relatorios_anterior = versao_relatorios(conn)
+        produto_id = conn.execute(
+            """
+            INSERT INTO produtos
+            (nome, busca, preco_venda, estoque, estoque_minimo, codigo_barras, categoria, data_validade, lote)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                nome,
+                normalizar_busca(nome),
+                preco_venda,
+                estoque,
+                estoque_minimo,
+                _normalizar_codigo(codigo_barras),
+                categoria,
+                data_validade,
+                lote,
+            ),
+        ).lastrowid
+        escrita = catalogo.ler_escrita(conn, produto_id, versao)
+        versoes = (versao_relatorios_anterior, versao_relatorios(conn))
+    catalogo.aplicar_escrita(escrita)
+    relatorios_cache.registrar_escrita(versoes=versoes)
+    return produto_id
 
 
 def atualizar_produto(
@@ -109,38 +632,72 @@ def atualizar_produto(
     data_validade: Optional[str],
     lote: Optional[str],
 ) -> None:
-    execute(
-        """
-        UPDATE produtos
-        SET nome = ?, preco_venda = ?, estoque = ?, estoque_minimo = ?,
-            codigo_barras = ?, categoria = ?, data_validade = ?, lote = ?,
-            atualizado_em = CURRENT_TIMESTAMP
-        WHERE id = ?
-        """,
-        (
-            nome,
-            preco_venda,
-            estoque,
-            estoque_minimo,
-            codigo_barras,
-            categoria,
-            data_validade,
-            lote,
-            produto_id,
-        ),
-        commit=True,
-    )
+    with transaction() as conn:
+        versao = _versao_catalogo(conn)
+        versao_relatorios_anterior = versao_relatorios(conn)
+        conn.execute(
+            """
+            UPDATE produtos
+            SET nome = ?, busca = ?, preco_venda = ?, estoque = ?, estoque_minimo = ?,
+                codigo_barras = ?, categoria = ?, data_validade = ?, lote = ?,
+                atualizado_em = CURRENT_TIMESTAMP
+            WHERE id = ?
+            """,
+            (
+                nome,
+                normalizar_busca(nome),
+                preco_venda,
+                estoque,
+                estoque_minimo,
+                _normalizar_codigo(codigo_barras),
+                categoria,
+                data_validade,
+                lote,
+                produto_id,
+            ),
+        )
+        escrita = catalogo.ler_escrita(conn, produto_id, versao)
+        versoes = (versao_relatorios_anterior, versao_relatorios(conn))
+    catalogo.aplicar_escrita(escrita)
+    relatorios_cache.registrar_escrita(versoes=versoes)
 
 
 def excluir_produto(produto_id: int) -> None:
-    execute("DELETE FROM produtos WHERE id = ?", (produto_id,), commit=True)
+    with transaction() as conn:
+        versao = _versao_catalogo(conn)
+        versao_relatorios_anterior = versao_relatorios(conn)
+        conn.execute("DELETE FROM produtos WHERE id = ?", (produto_id,))
+        escrita = catalogo.ler_escrita(conn, produto_id, versao)
+        versoes = (versao_relatorios_anterior, versao_relatorios(conn))
+    catalogo.aplicar_escrita(escrita)
+    relatorios_cache.registrar_escrita(versoes=versoes)
 
 
 def atualizar_estoque(produto_id: int, delta: float) -> None:
-    execute(
-        "UPDATE produtos SET estoque = estoque + ?, atualizado_em = CURRENT_TIMESTAMP WHERE id = ?",
-        (delta, produto_id),
-        commit=True,
+    with transaction() as conn:
+        versao_anterior = versao_relatorios(conn)
+        conn.execute(
+            "UPDATE produtos SET estoque = estoque + ?, atualizado_em = CURRENT_TIMESTAMP "
+            "WHERE id = ?",
+            (delta, produto_id),
+        )
+        versoes = (versao_anterior, versao_relatorios(conn))
+    catalogo.ajustar_estoque(produto_id, delta)
+    relatorios_cache.registrar_escrita(versoes=versoes)
+
+
+def produtos_populares(limite: int = 10) -> List:
+    """Mais vendidos pela popularidade acumulada (lê só `limite` linhas do índice)."""
+    return execute(
+        """
+        SELECT p.*, pp.quantidade AS quantidade_vendida, pp.vendas, pp.score AS popularidade
+        FROM produto_popularidade pp
+        JOIN produtos p ON p.id = pp.produto_id
+        ORDER BY pp.score DESC
+        LIMIT ?
+        """,
+        (limite,),
+        fetchall=True,
     )
 
 
@@ -166,15 +723,29 @@ def produtos_proximos_validade(dias: int = 15) -> List:
 
 
 __all__ = [
+    "CatalogoCache",
+    "catalogo",
+    "SugestoesCache",
+    "sugestoes_cache",
+    "fts_disponivel",
+    "invalidar_caches",
     "listar_produtos",
     "obter_produto",
     "buscar_por_codigo",
+    "LayoutBalanca",
+    "EtiquetaBalanca",
+    "LeituraCodigo",
+    "digito_verificador_ean",
+    "layouts_balanca",
+    "decodificar_etiqueta",
+    "ler_codigo",
     "buscar_por_nome",
     "buscar_sugestoes",
     "criar_produto",
     "atualizar_produto",
     "excluir_produto",
     "atualizar_estoque",
+    "produtos_populares",
     "produtos_estoque_baixo",
     "produtos_proximos_validade",
 ]
@@ -0,0 +1,191 @@
+"""Resumo completo de um período para a tela de relatórios e o PDF.
+
+`resumo_periodo` junta num único objeto o que antes eram onze consultas
+separadas: as vendas saem dos resumos por dia/hora, saídas e perdas de uma
+única leitura de `caixa_movimentos` e os alertas de estoque e validade de
+uma única leitura de `produtos`.
+
+Cada parte (`PARTES`) pode ser pedida sozinha, para a tela preencher os
+cards conforme chegam. As partes ficam em `relatorios_cache` separadas: os
+números de um período fechado não mudam, mas os alertas valem só até a
+próxima escrita. As linhas guardadas são entregues como mapeamentos só de
+leitura: o mesmo objeto vai para a tela, para o PDF e fica no cache.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from types import MappingProxyType
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Mapping, Tuple
+
+from APP.core.database import execute, iterate
+from APP.core.utils import Momento, hoje_intervalo, para_epoch
+
+from . import resumos_models, vendas_models
+from .resumos_models import ResumoVendas, relatorios_cache
+
+LIMITE_TOP_PRODUTOS = 5
+DIAS_VALIDADE = 15
+
+
+@dataclass(frozen=True, slots=True)
+class ResumoPeriodo:
+    inicio: int
+    fim: int
+    vendas: ResumoVendas
+    saidas_total: float
+    saidas: Tuple[Mapping, ...]
+    perdas_total: float
+    perdas: Tuple[Mapping, ...]
+    top_produtos: Tuple[Mapping, ...]
+    estoque_baixo: Tuple[Mapping, ...]
+    validade: Tuple[Mapping, ...]
+
+
+def _somente_leitura(row) -> Mapping:
+    return MappingProxyType(dict(row))
+
+
+def _movimentos(inicio: int, fim: int) -> Dict[str, Tuple[Mapping, ...]]:
+    """Saídas e perdas do período, mais recentes primeiro, numa só leitura."""
+    rows = execute(
+        """
+        SELECT tipo, descricao, valor, criado_em
+        FROM caixa_movimentos
+        WHERE tipo IN ('saida_caixa', 'perda') AND criado_ts >= ? AND criado_ts < ?
+        ORDER BY criado_ts DESC
+        """,
+        (inicio, fim),
+        fetchall=True,
+    )
+    por_tipo: Dict[str, List[Mapping]] = {"saida_caixa": [], "perda": []}
+    for row in rows:
+        movimento = dict(row)
+        por_tipo[movimento.pop("tipo")].append(MappingProxyType(movimento))
+    return {tipo: tuple(movimentos) for tipo, movimentos in por_tipo.items()}
+
+
+def _alertas_produtos(dias_validade: int) -> Tuple[Tuple[Mapping, ...], Tuple[Mapping, ...]]:
+    """(estoque baixo por nome, validades próximas por data) numa só leitura."""
+    limite = (datetime.now() + timedelta(days=dias_validade)).date().isoformat()
+    rows = execute(
+        """
+        SELECT * FROM produtos
+        WHERE estoque < estoque_minimo
+           OR (data_validade IS NOT NULL AND data_validade <= ?)
+        """,
+        (limite,),
+        fetchall=True,
+    )
+    produtos = [_somente_leitura(row) for row in rows]
+    estoque_baixo = sorted(
+        (p for p in produtos if p["estoque"] < p["estoque_minimo"]), key=lambda p: p["nome"]
+    )
+    validade = sorted(
+        (p for p in produtos if p["data_validade"] is not None and p["data_validade"] <= limite),
+        key=lambda p: p["data_validade"],
+    )
+    return tuple(estoque_baixo), tuple(validade)
+
+
+def _parte_vendas(inicio: int, fim: int, limite_top: int) -> Dict:
+    return {"vendas": resumos_models.resumo_periodo(inicio, fim)}
+
+
+def _parte_movimentos(inicio: int, fim: int, limite_top: int) -> Dict:
+    movimentos = relatorios_cache.obter(
+        "movimentos", inicio, fim, lambda: _movimentos(inicio, fim)
+    )
+    return {
+        "saidas_total": abs(sum(m["valor"] or 0 for m in movimentos["saida_caixa"])),
+        "saidas": movimentos["saida_caixa"],
+        "perdas_total": abs(sum(m["valor"] or 0 for m in movimentos["perda"])),
+        "perdas": movimentos["perda"],
+    }
+
+
+def _parte_top_produtos(inicio: int, fim: int, limite_top: int) -> Dict:
+    top = relatorios_cache.obter(
+        f"top_produtos:{limite_top}",
+        inicio,
+        fim,
+        lambda: tuple(
+            _somente_leitura(row)
+            for row in vendas_models.produtos_mais_vendidos(inicio, fim, limite_top)
+        ),
+    )
+    return {"top_produtos": top}
+
+
+def _parte_alertas(inicio: int, fim: int, limite_top: int) -> Dict:
+    estoque_baixo, validade = alertas_produtos()
+    return {"estoque_baixo": estoque_baixo, "validade": validade}
+
+
+# Partes independentes do resumo: cada card da tela carrega a sua em paralelo.
+PARTES: Dict[str, Callable[[int, int, int], Dict]] = {
+    "vendas": _parte_vendas,
+    "movimentos": _parte_movimentos,
+    "top_produtos": _parte_top_produtos,
+    "alertas": _parte_alertas,
+}
+
+
+def alertas_produtos(
+    dias_validade: int = DIAS_VALIDADE,
+) -> Tuple[Tuple[Mapping, ...], Tuple[Mapping, ...]]:
+    """(estoque baixo, validades próximas), válidos até a próxima escrita."""
+    return relatorios_cache.obter(
+        f"alertas:{dias_validade}", *hoje_intervalo(), lambda: _alertas_produtos(dias_validade)
+    )
+
+
+def iterar_movimentos(tipo: str, inicio: Momento, fim: Momento) -> Iterator[sqlite3.Row]:
+    """Movimentos de um `tipo` no período, mais recentes primeiro, linha a linha."""
+    return iterate(
+        """
+        SELECT descricao, valor, criado_em
+        FROM caixa_movimentos
+        WHERE tipo = ? AND criado_ts >= ? AND criado_ts < ?
+        ORDER BY criado_ts DESC
+        """,
+        (tipo, para_epoch(inicio), para_epoch(fim)),
+    )
+
+
+def parte_periodo(
+    parte: str, inicio: Momento, fim: Momento, *, limite_top: int = LIMITE_TOP_PRODUTOS
+) -> Dict:
+    """Campos de `ResumoPeriodo` que a `parte` preenche."""
+    return PARTES[parte](para_epoch(inicio), para_epoch(fim), limite_top)
+
+
+def montar_resumo(inicio: Momento, fim: Momento, partes: Dict[str, Dict]) -> ResumoPeriodo:
+    campos: Dict = {}
+    for nome in PARTES:
+        campos.update(partes[nome])
+    return ResumoPeriodo(inicio=para_epoch(inicio), fim=para_epoch(fim), **campos)
+
+
+def resumo_periodo(
+    inicio: Momento, fim: Momento, *, limite_top: int = LIMITE_TOP_PRODUTOS
+) -> ResumoPeriodo:
+    partes = {
+        nome: parte_periodo(nome, inicio, fim, limite_top=limite_top) for nome in PARTES
+    }
+    return montar_resumo(inicio, fim, partes)
+
+
+__all__ = [
+    "DIAS_VALIDADE",
+    "LIMITE_TOP_PRODUTOS",
+    "PARTES",
+    "ResumoPeriodo",
+    "alertas_produtos",
+    "iterar_movimentos",
+    "montar_resumo",
+    "parte_periodo",
+    "resumo_periodo",
+]
@@ -0,0 +1,222 @@
+"""Resumos de vendas por dia e por hora, mantidos pelo checkout.
+
+`resumo_periodo` responde com O(dias + horas) linhas dos resumos, mais as
+vendas brutas das pontas do período que não fecham uma hora inteira e as
+vendas ainda não resumidas (ex.: importadas direto no banco). Para refazer
+tudo: `python -m APP.models.resumos_models`.
+
+`relatorios_cache` memoriza os resumos por período (este e os das telas de
+relatórios e dashboard); quem grava vendas, caixa ou estoque chama
+`relatorios_cache.registrar_escrita(ts)` depois do commit. Quem grava em
+`vendas`, `caixa_movimentos` ou `produtos` passa também as `versoes` lidas com
+`versao_relatorios(conn)` no início e no fim da transação, para o cache
+separar as próprias escritas das de outros terminais.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from APP.core import migrations
+from APP.core.cache import CachePeriodos
+from APP.core.config import get_config
+from APP.core.database import execute, transaction
+from APP.core.logger import get_logger
+from APP.core.utils import Momento, dia_epoch, hora_epoch, para_epoch, proximo_dia_epoch
+
+logger = get_logger()
+
+
+def versao_relatorios(conn: Optional[sqlite3.Connection] = None) -> int:
+    query = "SELECT valor FROM contadores WHERE nome = 'relatorios'"
+    row = conn.execute(query).fetchone() if conn else execute(query, fetchone=True)
+    return int(row[0]) if row else 0
+
+
+relatorios_cache = CachePeriodos(
+    versao=versao_relatorios,
+    revalidar_s=lambda: float(get_config().database["catalog_revalidate_s"]),
+)
+
+Intervalo = Tuple[int, int]
+
+_UPSERT = """
+INSERT INTO {tabela} ({coluna}, forma_pagamento, usuario_id, vendas,
+    total_bruto, descontos, total_liquido, pagamentos)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT({coluna}, forma_pagamento, usuario_id) DO UPDATE SET
+    vendas = vendas + excluded.vendas,
+    total_bruto = total_bruto + excluded.total_bruto,
+    descontos = descontos + excluded.descontos,
+    total_liquido = total_liquido + excluded.total_liquido,
+    pagamentos = pagamentos + excluded.pagamentos
+"""
+
+_SOMA_RESUMO = """
+SELECT forma_pagamento, usuario_id, SUM(vendas), SUM(total_bruto),
+    SUM(descontos), SUM(total_liquido), SUM(pagamentos)
+FROM {tabela}
+WHERE {coluna} >= ? AND {coluna} < ?
+GROUP BY forma_pagamento, usuario_id
+"""
+
+_SOMA_VENDAS = """
+SELECT COALESCE(forma_pagamento, ''), usuario_id, COUNT(*), SUM(total_bruto),
+    SUM(desconto_percentual), SUM(total_liquido), 0
+FROM vendas
+WHERE criado_ts >= ? AND criado_ts < ? AND {filtro}
+GROUP BY 1, 2
+"""
+
+_SOMA_PAGAMENTOS = """
+SELECT p.forma_pagamento, v.usuario_id, 0, 0, 0, 0, SUM(p.valor)
+FROM vendas v
+JOIN pagamentos p ON p.venda_id = v.id
+WHERE v.criado_ts >= ? AND v.criado_ts < ? AND {filtro}
+GROUP BY 1, 2
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class ResumoVendas:
+    vendas: int
+    total_bruto: float
+    descontos: float
+    total_liquido: float
+    # (forma, total pago), do maior para o menor.
+    pagamentos: Tuple[Tuple[str, float], ...]
+    # (usuario_id, total líquido), do maior para o menor.
+    por_operador: Tuple[Tuple[int, float], ...]
+
+
+def somar_venda(
+    cursor: sqlite3.Cursor,
+    *,
+    ts: int,
+    usuario_id: int,
+    forma_principal: str,
+    total_bruto: float,
+    desconto: float,
+    total_liquido: float,
+    pagamentos: Sequence[Dict],
+) -> None:
+    """Soma a venda nos resumos de dia e hora, na transação do checkout."""
+    por_forma: Dict[str, float] = {}
+    for pagamento in pagamentos:
+        por_forma[pagamento["forma"]] = por_forma.get(pagamento["forma"], 0) + pagamento["valor"]
+    linhas = [(forma_principal, 1, total_bruto, desconto, total_liquido, por_forma.pop(forma_principal, 0))]
+    linhas += [(forma, 0, 0, 0, 0, valor) for forma, valor in por_forma.items()]
+    for tabela, coluna, chave in (
+        ("resumo_vendas_hora", "hora", hora_epoch(ts)),
+        ("resumo_vendas_dia", "dia", dia_epoch(ts)),
+    ):
+        cursor.executemany(
+            _UPSERT.format(tabela=tabela, coluna=coluna),
+            [(chave, forma, usuario_id, *valores) for forma, *valores in linhas],
+        )
+
+
+def reconstruir() -> int:
+    """Refaz os resumos a partir das vendas gravadas; devolve quantas vendas."""
+    with transaction() as conn:
+        total = migrations.rebuild_sales_rollups(conn)
+        # `resumida = 1` vale para os dois: resumos e contadores por produto.
+        migrations.rebuild_sales_counters(conn)
+    relatorios_cache.limpar()
+    logger.info("Resumos de vendas reconstruídos (%d vendas).", total)
+    return total
+
+
+def _fatias(inicio: int, fim: int) -> Tuple[List[Intervalo], List[Intervalo], List[Intervalo]]:
+    """Divide [inicio, fim) em dias inteiros, horas inteiras e pontas brutas."""
+    dias: List[Intervalo] = []
+    restos: List[Intervalo] = [(inicio, fim)]
+    primeiro_dia = inicio if dia_epoch(inicio) == inicio else proximo_dia_epoch(inicio)
+    ultimo_dia = dia_epoch(fim)
+    if primeiro_dia < ultimo_dia:
+        dias.append((primeiro_dia, ultimo_dia))
+        restos = [(inicio, primeiro_dia), (ultimo_dia, fim)]
+
+    horas: List[Intervalo] = []
+    pontas: List[Intervalo] = []
+    for a, b in restos:
+        if a >= b:
+            continue
+        primeira_hora = hora_epoch(a)
+        if primeira_hora != a:
+            primeira_hora += 3600
+        ultima_hora = hora_epoch(b)
+        if primeira_hora < ultima_hora:
+            horas.append((primeira_hora, ultima_hora))
+            pontas += [(a, primeira_hora), (ultima_hora, b)]
+        else:
+            pontas.append((a, b))
+    return dias, horas, [(a, b) for a, b in pontas if a < b]
+
+
+def resumo_periodo(inicio: Momento, fim: Momento) -> ResumoVendas:
+    inicio_ts, fim_ts = para_epoch(inicio), para_epoch(fim)
+    return relatorios_cache.obter(
+        "vendas", inicio_ts, fim_ts, lambda: _calcular_resumo(inicio_ts, fim_ts)
+    )
+
+
+def _calcular_resumo(inicio_ts: int, fim_ts: int) -> ResumoVendas:
+    acumulado: Dict[Tuple[str, int], List[float]] = {}
+
+    def somar(sql: str, params: Tuple) -> None:
+        for forma, usuario_id, *valores in execute(sql, params, fetchall=True):
+            linha = acumulado.setdefault((forma, usuario_id), [0, 0.0, 0.0, 0.0, 0.0])
+            for i, valor in enumerate(valores):
+                linha[i] += valor or 0
+
+    dias, horas, pontas = _fatias(inicio_ts, fim_ts)
+    for intervalo in dias:
+        somar(_SOMA_RESUMO.format(tabela="resumo_vendas_dia", coluna="dia"), intervalo)
+    for intervalo in horas:
+        somar(_SOMA_RESUMO.format(tabela="resumo_vendas_hora", coluna="hora"), intervalo)
+    # Pontas: só as vendas já resumidas; as não resumidas entram abaixo,
+    # no período todo, pelo índice parcial.
+    consultas = [(intervalo, "resumida IS NOT NULL") for intervalo in pontas]
+    consultas.append(((inicio_ts, fim_ts), "resumida IS NULL"))
+    for intervalo, filtro in consultas:
+        somar(_SOMA_VENDAS.format(filtro=filtro), intervalo)
+        somar(_SOMA_PAGAMENTOS.format(filtro=f"v.{filtro}"), intervalo)
+
+    totais = [0, 0.0, 0.0, 0.0]
+    pagamentos: Dict[str, float] = {}
+    operadores: Dict[int, float] = {}
+    for (forma, usuario_id), (vendas, bruto, descontos, liquido, pago) in acumulado.items():
+        for i, valor in enumerate((vendas, bruto, descontos, liquido)):
+            totais[i] += valor
+        if pago:
+            pagamentos[forma] = pagamentos.get(forma, 0) + pago
+        if vendas:
+            operadores[usuario_id] = operadores.get(usuario_id, 0) + liquido
+    return ResumoVendas(
+        vendas=int(totais[0]),
+        total_bruto=totais[1],
+        descontos=totais[2],
+        total_liquido=totais[3],
+        pagamentos=tuple(sorted(pagamentos.items(), key=lambda p: p[1], reverse=True)),
+        por_operador=tuple(sorted(operadores.items(), key=lambda o: o[1], reverse=True)),
+    )
+
+
+__all__ = [
+    "ResumoVendas",
+    "reconstruir",
+    "relatorios_cache",
+    "resumo_periodo",
+    "somar_venda",
+    "versao_relatorios",
+]
+
+
+if __name__ == "__main__":  # pragma: no cover - comando de manutenção
+    from APP.core.database import initialize_database
+
+    initialize_database()
+    print(f"{reconstruir()} vendas resumidas.")
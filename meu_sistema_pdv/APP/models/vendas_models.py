@@ -1,11 +1,23 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Dict, Iterable, List, Optional, Sequence
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
 
-from APP.core.database import execute, get_connection
+from APP.core.database import execute, iterate, transaction
 from APP.core.logger import get_logger
-from APP.core.utils import gerar_chave_unica
+from APP.core.utils import (
+    POPULARIDADE_REFERENCIA_TS,
+    Momento,
+    agora_carimbo,
+    dia_epoch,
+    gerar_chave_unica,
+    nova_referencia_popularidade,
+    para_epoch,
+    peso_popularidade,
+    proximo_dia_epoch,
+)
+
+from . import caixa_models, produtos_models, resumos_models
 
 logger = get_logger()
 
@@ -20,158 +32,340 @@ FORMAS_PAGAMENTO = [
 ]
 
 
-def registrar_venda(
+def _gravar_venda(
+    cursor: sqlite3.Cursor,
     itens: Sequence[Dict],
     *,
     usuario_id: int,
     cliente_id: Optional[int],
     desconto_valor: float,
-    pagamentos: Optional[Sequence[Dict[str, float]]] = None,
-    forma_principal: Optional[str] = None,
+    pagamentos: Optional[Sequence[Dict[str, float]]],
+    forma_principal: Optional[str],
 ) -> Dict:
-    if not itens:
-        raise ValueError("Carrinho vazio.")
+    """Grava venda, itens, baixa de estoque e pagamentos na transação aberta."""
+    total_bruto = sum(item["quantidade"] * item["preco_unitario"] for item in itens)
+    desconto_valor = max(0, desconto_valor)
+    desconto_valor = min(desconto_valor, total_bruto)
+    total_liquido = total_bruto - desconto_valor
+    codigo = gerar_chave_unica("VENDA")
+    agora_ts, agora = agora_carimbo()
+    forma = forma_principal or (pagamentos[0]["forma"] if pagamentos else "Dinheiro")
+    cursor.execute(
+        """
+        INSERT INTO vendas (codigo, usuario_id, cliente_id, total_bruto,
+            desconto_percentual, total_liquido, forma_pagamento, criado_em, criado_ts,
+            resumida)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
+        """,
+        (
+            codigo,
+            usuario_id,
+            cliente_id,
+            total_bruto,
+            desconto_valor,
+            total_liquido,
+            forma,
+            agora,
+            agora_ts,
+        ),
+    )
+    venda_id = cursor.lastrowid
 
-    conn = get_connection()
-    with conn:
-        cursor = conn.cursor()
-        total_bruto = sum(item["quantidade"] * item["preco_unitario"] for item in itens)
-        desconto_valor = max(0, desconto_valor)
-        desconto_valor = min(desconto_valor, total_bruto)
-        total_liquido = total_bruto - desconto_valor
-        codigo = gerar_chave_unica("VENDA")
-        agora = datetime.now().isoformat()
-        cursor.execute(
-            """
-            INSERT INTO vendas (codigo, usuario_id, cliente_id, total_bruto,
-                desconto_percentual, total_liquido, forma_pagamento, criado_em)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+    cursor.executemany(
+        """
+        INSERT INTO venda_itens (venda_id, produto_id, quantidade, preco_unitario, total_item)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        [
             (
-                codigo,
-                usuario_id,
-                cliente_id,
-                total_bruto,
-                desconto_valor,
-                total_liquido,
-                forma_principal or (pagamentos[0]["forma"] if pagamentos else "Dinheiro"),
-                agora,
-            ),
-        )
-        venda_id = cursor.lastrowid
-
-        for item in itens:
-            cursor.execute(
-                """
-                INSERT INTO venda_itens (venda_id, produto_id, quantidade, preco_unitario, total_item)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (
-                    venda_id,
-                    item["produto_id"],
-                    item["quantidade"],
-                    item["preco_unitario"],
-                    item["quantidade"] * item["preco_unitario"],
-                ),
-            )
-            cursor.execute(
-                "UPDATE produtos SET estoque = estoque - ? WHERE id = ?",
-                (item["quantidade"], item["produto_id"]),
-            )
-
-        pagamentos = pagamentos or [{"forma": forma_principal or "Dinheiro", "valor": total_liquido}]
-        for pagamento in pagamentos:
-            cursor.execute(
-                """
-                INSERT INTO pagamentos (venda_id, forma_pagamento, valor)
-                VALUES (?, ?, ?)
-                """,
-                (venda_id, pagamento["forma"], pagamento["valor"]),
+                venda_id,
+                item["produto_id"],
+                item["quantidade"],
+                item["preco_unitario"],
+                item["quantidade"] * item["preco_unitario"],
             )
+            for item in itens
+        ],
+    )
+    cursor.executemany(
+        "UPDATE produtos SET estoque = estoque - ? WHERE id = ?",
+        [(item["quantidade"], item["produto_id"]) for item in itens],
+    )
+    _somar_contadores(cursor, itens, agora_ts)
 
-    logger.info("Venda %s registrada com %d itens.", codigo, len(itens))
+    pagamentos = pagamentos or [{"forma": forma_principal or "Dinheiro", "valor": total_liquido}]
+    cursor.executemany(
+        """
+        INSERT INTO pagamentos (venda_id, forma_pagamento, valor, criado_em, criado_ts)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        [(venda_id, p["forma"], p["valor"], agora, agora_ts) for p in pagamentos],
+    )
+    resumos_models.somar_venda(
+        cursor,
+        ts=agora_ts,
+        usuario_id=usuario_id,
+        forma_principal=forma,
+        total_bruto=total_bruto,
+        desconto=desconto_valor,
+        total_liquido=total_liquido,
+        pagamentos=pagamentos,
+    )
     return {
         "id": venda_id,
         "codigo": codigo,
         "total": total_liquido,
         "desconto_valor": desconto_valor,
         "criado_em": agora,
+        "criado_ts": agora_ts,
         "itens": itens,
         "pagamentos": pagamentos,
     }
 
 
-def vendas_por_periodo(inicio: str, fim: str) -> List:
-    return execute(
+def _referencia_popularidade(cursor: sqlite3.Cursor, ts: int) -> int:
+    """Referência dos scores de popularidade; adianta e reescala quando preciso."""
+    row = cursor.execute(
+        "SELECT valor FROM contadores WHERE nome = 'popularidade_referencia'"
+    ).fetchone()
+    referencia = int(row[0]) if row else POPULARIDADE_REFERENCIA_TS
+    nova = nova_referencia_popularidade(ts, referencia)
+    if nova is None:
+        return referencia
+    cursor.execute(
+        "UPDATE produto_popularidade SET score = score * ?",
+        (peso_popularidade(referencia, nova),),
+    )
+    cursor.execute(
         """
-        SELECT v.*, v.desconto_percentual AS desconto_valor, u.nome AS vendedor, c.nome AS cliente
-        FROM vendas v
-        LEFT JOIN usuarios u ON u.id = v.usuario_id
-        LEFT JOIN clientes c ON c.id = v.cliente_id
-        WHERE v.criado_em BETWEEN ? AND ?
-        ORDER BY v.criado_em DESC
+        INSERT INTO contadores (nome, valor) VALUES ('popularidade_referencia', ?)
+        ON CONFLICT(nome) DO UPDATE SET valor = excluded.valor
         """,
-        (inicio, fim),
-        fetchall=True,
+        (nova,),
     )
+    logger.info("Referência da popularidade adiantada para %d; scores reescalados.", nova)
+    return nova
 
 
-def total_vendas_periodo(inicio: str, fim: str) -> float:
-    row = execute(
-        "SELECT COALESCE(SUM(total_liquido), 0) AS total FROM vendas WHERE criado_em BETWEEN ? AND ?",
-        (inicio, fim),
-        fetchone=True,
+def _somar_contadores(cursor: sqlite3.Cursor, itens: Sequence[Dict], ts: int) -> None:
+    """Soma a venda nos contadores por produto (popularidade e totais do dia)."""
+    por_produto: Dict[int, float] = {}
+    for item in itens:
+        produto_id = item["produto_id"]
+        por_produto[produto_id] = por_produto.get(produto_id, 0) + item["quantidade"]
+    peso = peso_popularidade(ts, _referencia_popularidade(cursor, ts))
+    cursor.executemany(
+        """
+        INSERT INTO produto_popularidade (produto_id, quantidade, vendas, ultima_venda_ts, score)
+        VALUES (?, ?, 1, ?, ?)
+        ON CONFLICT(produto_id) DO UPDATE SET
+            quantidade = quantidade + excluded.quantidade,
+            vendas = vendas + 1,
+            ultima_venda_ts = MAX(COALESCE(ultima_venda_ts, 0), excluded.ultima_venda_ts),
+            score = score + excluded.score
+        """,
+        [(produto_id, qtd, ts, qtd * peso) for produto_id, qtd in por_produto.items()],
+    )
+    dia = dia_epoch(ts)
+    cursor.executemany(
+        """
+        INSERT INTO produto_vendas_dia (dia, produto_id, quantidade, vendas)
+        VALUES (?, ?, ?, 1)
+        ON CONFLICT(dia, produto_id) DO UPDATE SET
+            quantidade = quantidade + excluded.quantidade,
+            vendas = vendas + 1
+        """,
+        [(dia, produto_id, qtd) for produto_id, qtd in por_produto.items()],
     )
-    return float(row["total"] if row else 0)
 
 
-def quantidade_vendas_periodo(inicio: str, fim: str) -> int:
-    row = execute(
-        "SELECT COUNT(*) AS qtd FROM vendas WHERE criado_em BETWEEN ? AND ?",
-        (inicio, fim),
-        fetchone=True,
-    )
-    return int(row["qtd"] if row else 0)
+def _refletir_baixa_estoque(itens: Sequence[Dict]) -> None:
+    for item in itens:
+        produtos_models.catalogo.ajustar_estoque(item["produto_id"], -item["quantidade"])
+    # A ordem das sugestões depende da popularidade, que acabou de mudar.
+    produtos_models.sugestoes_cache.limpar()
+
 
+def registrar_venda(
+    itens: Sequence[Dict],
+    *,
+    usuario_id: int,
+    cliente_id: Optional[int],
+    desconto_valor: float,
+    pagamentos: Optional[Sequence[Dict[str, float]]] = None,
+    forma_principal: Optional[str] = None,
+) -> Dict:
+    if not itens:
+        raise ValueError("Carrinho vazio.")
 
-def total_descontos_periodo(inicio: str, fim: str) -> float:
+    with transaction() as conn:
+        versao_anterior = resumos_models.versao_relatorios(conn)
+        venda = _gravar_venda(
+            conn.cursor(),
+            itens,
+            usuario_id=usuario_id,
+            cliente_id=cliente_id,
+            desconto_valor=desconto_valor,
+            pagamentos=pagamentos,
+            forma_principal=forma_principal,
+        )
+        versoes = (versao_anterior, resumos_models.versao_relatorios(conn))
+
+    _refletir_baixa_estoque(itens)
+    resumos_models.relatorios_cache.registrar_escrita(venda["criado_ts"], versoes)
+    logger.info("Venda %s registrada com %d itens.", venda["codigo"], len(itens))
+    return venda
+
+
+def finalizar_venda(
+    itens: Sequence[Dict],
+    *,
+    usuario_id: int,
+    cliente_id: Optional[int],
+    desconto_valor: float,
+    pagamentos: Optional[Sequence[Dict[str, float]]] = None,
+    forma_principal: Optional[str] = None,
+) -> Dict:
+    """Checkout completo: venda e movimento do caixa aberto num só commit.
+
+    O retorno traz tudo o que a tela precisa (inclusive `caixa_id`, que fica
+    `None` quando o operador não tem caixa aberto).
+    """
+    if not itens:
+        raise ValueError("Carrinho vazio.")
+
+    with transaction() as conn:
+        versao_anterior = resumos_models.versao_relatorios(conn)
+        cursor = conn.cursor()
+        venda = _gravar_venda(
+            cursor,
+            itens,
+            usuario_id=usuario_id,
+            cliente_id=cliente_id,
+            desconto_valor=desconto_valor,
+            pagamentos=pagamentos,
+            forma_principal=forma_principal,
+        )
+        venda["caixa_id"] = caixa_models.registrar_movimentos_venda(
+            cursor,
+            usuario_id=usuario_id,
+            venda_id=venda["id"],
+            codigo=venda["codigo"],
+            pagamentos=venda["pagamentos"],
+            carimbo=(venda["criado_ts"], venda["criado_em"]),
+        )
+        versoes = (versao_anterior, resumos_models.versao_relatorios(conn))
+
+    _refletir_baixa_estoque(itens)
+    resumos_models.relatorios_cache.registrar_escrita(venda["criado_ts"], versoes)
+    logger.info("Venda %s registrada com %d itens.", venda["codigo"], len(itens))
+    return venda
+
+
+_SQL_VENDAS_PERIODO = """
+    SELECT v.*, v.desconto_percentual AS desconto_valor, u.nome AS vendedor, c.nome AS cliente
+    FROM vendas v
+    LEFT JOIN usuarios u ON u.id = v.usuario_id
+    LEFT JOIN clientes c ON c.id = v.cliente_id
+    WHERE v.criado_ts >= ? AND v.criado_ts < ?
+    ORDER BY v.criado_ts DESC
+"""
+
+
+def vendas_por_periodo(inicio: Momento, fim: Momento) -> List:
+    return execute(_SQL_VENDAS_PERIODO, (para_epoch(inicio), para_epoch(fim)), fetchall=True)
+
+
+def iterar_vendas_periodo(inicio: Momento, fim: Momento) -> Iterator[sqlite3.Row]:
+    """Como `vendas_por_periodo`, mas linha a linha (para o PDF de períodos longos)."""
+    return iterate(_SQL_VENDAS_PERIODO, (para_epoch(inicio), para_epoch(fim)))
+
+
+def total_vendas_periodo(inicio: Momento, fim: Momento) -> float:
+    return resumos_models.resumo_periodo(inicio, fim).total_liquido
+
+
+def quantidade_vendas_periodo(inicio: Momento, fim: Momento) -> int:
+    return resumos_models.resumo_periodo(inicio, fim).vendas
+
+
+def total_descontos_periodo(inicio: Momento, fim: Momento) -> float:
+    return resumos_models.resumo_periodo(inicio, fim).descontos
+
+
+def pagamentos_por_periodo(inicio: Momento, fim: Momento) -> List[Dict]:
+    return [
+        {"forma_pagamento": forma, "total": total}
+        for forma, total in resumos_models.resumo_periodo(inicio, fim).pagamentos
+    ]
+
+
+_SQL_TOP_DIA = """
+SELECT pr.nome, d.quantidade
+FROM produto_vendas_dia d
+JOIN produtos pr ON pr.id = d.produto_id
+WHERE d.dia = ?
+ORDER BY d.quantidade DESC
+LIMIT ?
+"""
+
+# Contadores dos dias inteiros mais as vendas ainda não resumidas (ex.:
+# importadas direto no banco), que só existem em `venda_itens`.
+_SQL_TOP_DIAS = """
+SELECT pr.nome, SUM(t.quantidade) AS quantidade
+FROM (
+    SELECT produto_id, quantidade FROM produto_vendas_dia WHERE dia >= ? AND dia < ?
+    UNION ALL
+    SELECT vi.produto_id, vi.quantidade
+    FROM vendas v
+    JOIN venda_itens vi ON vi.venda_id = v.id
+    WHERE v.resumida IS NULL AND v.criado_ts >= ? AND v.criado_ts < ?
+) t
+JOIN produtos pr ON pr.id = t.produto_id
+GROUP BY t.produto_id
+ORDER BY quantidade DESC
+LIMIT ?
+"""
+
+_SQL_TOP_VENDAS = """
+SELECT pr.nome, SUM(vi.quantidade) AS quantidade
+FROM venda_itens vi
+JOIN vendas v ON v.id = vi.venda_id
+JOIN produtos pr ON pr.id = vi.produto_id
+WHERE v.criado_ts >= ? AND v.criado_ts < ?
+GROUP BY vi.produto_id
+ORDER BY quantidade DESC
+LIMIT ?
+"""
+
+
+def _ha_vendas_nao_resumidas(inicio_ts: int, fim_ts: int) -> bool:
     row = execute(
-        "SELECT COALESCE(SUM(desconto_percentual), 0) AS total FROM vendas WHERE criado_em BETWEEN ? AND ?",
-        (inicio, fim),
+        "SELECT 1 FROM vendas WHERE resumida IS NULL AND criado_ts >= ? AND criado_ts < ? LIMIT 1",
+        (inicio_ts, fim_ts),
         fetchone=True,
     )
-    return float(row["total"] if row else 0)
+    return row is not None
 
-def pagamentos_por_periodo(inicio: str, fim: str) -> List:
-    return execute(
-        """
-        SELECT p.forma_pagamento, SUM(p.valor) AS total
-        FROM pagamentos p
-        INNER JOIN vendas v ON v.id = p.venda_id
-        WHERE v.criado_em BETWEEN ? AND ?
-        GROUP BY p.forma_pagamento
-        ORDER BY total DESC
-        """,
-        (inicio, fim),
-        fetchall=True,
-    )
 
+def produtos_mais_vendidos(inicio: Momento, fim: Momento, limite: int = 5) -> List:
+    """(nome, quantidade) dos `limite` produtos mais vendidos no período.
 
-def produtos_mais_vendidos(inicio: str, fim: str, limite: int = 5) -> List:
-    return execute(
-        f"""
-        SELECT pr.nome, SUM(vi.quantidade) AS quantidade
-        FROM venda_itens vi
-        JOIN vendas v ON v.id = vi.venda_id
-        JOIN produtos pr ON pr.id = vi.produto_id
-        WHERE v.criado_em BETWEEN ? AND ?
-        GROUP BY pr.nome
-        ORDER BY quantidade DESC
-        LIMIT {limite}
-        """,
-        (inicio, fim),
-        fetchall=True,
-    )
+    Custo conforme o período:
+    - um dia inteiro: lê `limite` linhas do índice de ranking do dia;
+    - vários dias inteiros: soma os contadores diários, O(dias × produtos
+      vendidos no período), sem tocar em `venda_itens`;
+    - período que corta um dia no meio: agrega os itens das vendas do período.
+    Vendas ainda não resumidas entram sempre, lidas de `venda_itens`, como nos
+    totais de `resumos_models`.
+    """
+    inicio_ts, fim_ts = para_epoch(inicio), para_epoch(fim)
+    if dia_epoch(inicio_ts) != inicio_ts or dia_epoch(fim_ts) != fim_ts:
+        return execute(_SQL_TOP_VENDAS, (inicio_ts, fim_ts, limite), fetchall=True)
+    nao_resumidas = _ha_vendas_nao_resumidas(inicio_ts, fim_ts)
+    if proximo_dia_epoch(inicio_ts) == fim_ts and not nao_resumidas:
+        return execute(_SQL_TOP_DIA, (inicio_ts, limite), fetchall=True)
+    return execute(_SQL_TOP_DIAS, (inicio_ts, fim_ts, inicio_ts, fim_ts, limite), fetchall=True)
 
 
 def historico_por_cliente(cliente_id: int) -> List:
@@ -181,7 +375,7 @@ def historico_por_cliente(cliente_id: int) -> List:
         FROM vendas v
         JOIN usuarios u ON u.id = v.usuario_id
         WHERE v.cliente_id = ?
-        ORDER BY v.criado_em DESC
+        ORDER BY v.criado_ts DESC
         """,
         (cliente_id,),
         fetchall=True,
@@ -218,7 +412,9 @@ def itens_da_venda(venda_id: int):
 
 __all__ = [
     "registrar_venda",
+    "finalizar_venda",
     "vendas_por_periodo",
+    "iterar_vendas_periodo",
     "total_vendas_periodo",
     "quantidade_vendas_periodo",
     "total_descontos_periodo",
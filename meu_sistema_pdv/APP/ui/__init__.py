@@ -1,13 +1,41 @@
-from .login_ui import build_login_view
-from .dashboard_ui import build_dashboard_view
-from .vendas_ui import build_pdv_view
-from .produtos_ui import build_produtos_view
-from .usuarios_ui import build_usuarios_view
-from .relatorios_ui import build_relatorios_view
-from .caixa_ui import build_caixa_view
-from .logs_viewer import build_logs_view
-from .config_ui import build_config_view
-from .pedidos_ui import build_pedidos_view
+"""Telas do sistema.
+
+Os construtores são importados sob demanda (PEP 562): abrir o app não
+carrega o módulo de cada tela, nem dependências pesadas como o reportlab
+usado em relatórios, antes da primeira visita à rota.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import Any, List
+
+_MODULOS = {
+    "build_login_view": "login_ui",
+    "build_dashboard_view": "dashboard_ui",
+    "build_pdv_view": "vendas_ui",
+    "build_produtos_view": "produtos_ui",
+    "build_usuarios_view": "usuarios_ui",
+    "build_relatorios_view": "relatorios_ui",
+    "build_caixa_view": "caixa_ui",
+    "build_logs_view": "logs_viewer",
+    "build_config_view": "config_ui",
+    "build_pedidos_view": "pedidos_ui",
+}
+
+
+def __getattr__(nome: str) -> Any:
+    modulo = _MODULOS.get(nome)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    valor = getattr(importlib.import_module(f".{modulo}", __name__), nome)
+    globals()[nome] = valor
+    return valor
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_MODULOS))
+
 
 __all__ = [
     "build_login_view",
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import functools
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, TypeVar
+
+import flet as ft
+
+from APP.core.logger import get_logger
+
+logger = get_logger()
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class LoteAtualizacoes:
+    """Junta as atualizações de tela de uma ação do usuário em um só envio.
+
+    Dentro de `acao()`, `marcar(*controles)` só anota o que mudou; ao sair
+    da ação mais externa tudo vai ao cliente em um único `page.update`.
+    `marcar()` sem controles pede a página inteira (diálogos, snack bar).
+    Fora de uma ação o envio é imediato, como um `page.update` comum.
+
+    O estado da ação é por thread: o resultado de sugestões entregue pela
+    thread do buscador não se mistura com o handler que está rodando.
+    """
+
+    def __init__(self, page: ft.Page) -> None:
+        self._page = page
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.acoes = 0
+        self.envios = 0
+        self.ultima_acao = ""
+        self.envios_ultima_acao = 0
+
+    def _estado(self):
+        estado = self._local
+        if not hasattr(estado, "profundidade"):
+            estado.profundidade = 0
+            estado.pendentes = {}
+            estado.pagina = False
+            estado.envios = 0
+        return estado
+
+    @contextmanager
+    def acao(self, nome: str = "") -> Iterator[None]:
+        estado = self._estado()
+        if estado.profundidade == 0:
+            estado.envios = 0
+        estado.profundidade += 1
+        try:
+            yield
+        finally:
+            estado.profundidade -= 1
+            if estado.profundidade == 0:
+                self._enviar(estado)
+                with self._lock:
+                    self.acoes += 1
+                    self.ultima_acao = nome
+                    self.envios_ultima_acao = estado.envios
+                if estado.envios > 1:
+                    logger.debug("Ação %s enviou %s atualizações", nome, estado.envios)
+
+    def marcar(self, *controles: ft.Control) -> None:
+        estado = self._estado()
+        if controles:
+            for controle in controles:
+                estado.pendentes[id(controle)] = controle
+        else:
+            estado.pagina = True
+        if estado.profundidade == 0:
+            self._enviar(estado)
+
+    def descarregar(self) -> None:
+        """Envia já o que está pendente (ex.: antes de uma operação demorada)."""
+        self._enviar(self._estado())
+
+    def _enviar(self, estado) -> None:
+        if not (estado.pagina or estado.pendentes):
+            return
+        if estado.pagina:
+            self._page.update()
+        else:
+            self._page.update(*estado.pendentes.values())
+        estado.pendentes = {}
+        estado.pagina = False
+        estado.envios += 1
+        with self._lock:
+            self.envios += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "acoes": self.acoes,
+                "envios": self.envios,
+                "ultima_acao": self.ultima_acao,
+                "envios_ultima_acao": self.envios_ultima_acao,
+            }
+
+
+def acao_de_tela(metodo: F) -> F:
+    """Executa o método dentro de `self._tela.acao()` (um envio por ação)."""
+
+    @functools.wraps(metodo)
+    def envolvido(self, *args, **kwargs):
+        with self._tela.acao(metodo.__name__):
+            return metodo(self, *args, **kwargs)
+
+    return envolvido  # type: ignore[return-value]
+
+
+__all__ = ["LoteAtualizacoes", "acao_de_tela"]
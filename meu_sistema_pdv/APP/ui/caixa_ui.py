@@ -6,9 +6,10 @@ import flet as ft
 
 from APP.core.security import can_access
 from APP.core.session import session
-from APP.core.utils import format_currency
+from APP.core.utils import format_currency, intervalo_dias
 from APP.models import caixa_models
 
+from .rotas import ao_revisitar
 from .style import CONTROL_STATE, PRIMARY_COLOR, SURFACE, WARNING_COLOR
 
 PRIMARY_BUTTON_STYLE = ft.ButtonStyle(
@@ -76,10 +77,14 @@ class CaixaView:
     def _intervalo(self):
         inicio = (self.rel_inicio.value or "").strip() or date.today().isoformat()
         fim = (self.rel_fim.value or "").strip() or inicio
-        return f"{inicio} 00:00:00", f"{fim} 23:59:59"
+        return intervalo_dias(inicio, fim)
 
     def carregar_relatorio(self):
-        inicio, fim = self._intervalo()
+        try:
+            inicio, fim = self._intervalo()
+        except ValueError:
+            self._toast("Data inválida. Use o formato AAAA-MM-DD.", WARNING_COLOR)
+            return
         rel = caixa_models.relatorio_caixas(inicio, fim)
         registros = []
         for item in rel:
@@ -169,7 +174,7 @@ class CaixaView:
                 spacing=12,
             ),
         )
-        return ft.View(
+        view = ft.View(
             "/caixa",
             controls=[
                 ft.Column(
@@ -182,6 +187,7 @@ class CaixaView:
                 )
             ],
         )
+        return ao_revisitar(view, self.atualizar_estado)
 
 
 def build_caixa_view(page: ft.Page):
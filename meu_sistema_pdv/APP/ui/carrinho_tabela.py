@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from typing import Callable, Dict, List
+
+import flet as ft
+
+from APP.core.utils import format_currency
+from APP.models.carrinho import Carrinho, ItemCarrinho
+
+from .style import SURFACE, WARNING_COLOR
+
+
+class _LinhaCarrinho:
+    """Controles de uma linha da tabela, guardados para edição no lugar."""
+
+    __slots__ = ("row", "nome", "quantidade", "preco", "total")
+
+    def __init__(
+        self,
+        item: ItemCarrinho,
+        on_ajustar: Callable[[int, float], None],
+        on_remover: Callable[[int], None],
+    ) -> None:
+        produto_id = item.produto_id
+        self.nome = ft.Text(item.nome)
+        self.quantidade = ft.Text(_quantidade(item))
+        self.preco = ft.Text(format_currency(item.preco_unitario))
+        self.total = ft.Text(format_currency(item.total))
+        self.row = ft.DataRow(
+            cells=[
+                ft.DataCell(self.nome),
+                ft.DataCell(
+                    ft.Row(
+                        controls=[
+                            ft.IconButton(
+                                ft.icons.REMOVE,
+                                on_click=lambda e: on_ajustar(produto_id, -1),
+                                icon_size=18,
+                            ),
+                            self.quantidade,
+                            ft.IconButton(
+                                ft.icons.ADD,
+                                on_click=lambda e: on_ajustar(produto_id, 1),
+                                icon_size=18,
+                            ),
+                        ]
+                    )
+                ),
+                ft.DataCell(self.preco),
+                ft.DataCell(self.total),
+                ft.DataCell(
+                    ft.IconButton(
+                        ft.icons.DELETE_FOREVER,
+                        on_click=lambda e: on_remover(produto_id),
+                        icon_color=WARNING_COLOR,
+                    )
+                ),
+            ]
+        )
+
+    def atualizar(self, item: ItemCarrinho) -> List[ft.Control]:
+        """Ajusta só os textos que mudaram e devolve esses controles."""
+        alterados = []
+        for controle, valor in (
+            (self.quantidade, _quantidade(item)),
+            (self.preco, format_currency(item.preco_unitario)),
+            (self.total, format_currency(item.total)),
+        ):
+            if controle.value != valor:
+                controle.value = valor
+                alterados.append(controle)
+        return alterados
+
+
+def _quantidade(item: ItemCarrinho) -> str:
+    return f"{item.quantidade:.2f}"
+
+
+class TabelaCarrinho:
+    """DataTable do carrinho com uma linha por produto, atualizada por chave.
+
+    `sincronizar` compara só a linha do produto alterado: edita os textos
+    dela, ou inclui/remove a `DataRow`, e devolve os controles que precisam
+    ir para o cliente. O custo por leitura não cresce com o carrinho.
+    """
+
+    def __init__(
+        self,
+        *,
+        on_ajustar: Callable[[int, float], None],
+        on_remover: Callable[[int], None],
+    ) -> None:
+        self._on_ajustar = on_ajustar
+        self._on_remover = on_remover
+        self._linhas: Dict[int, _LinhaCarrinho] = {}
+        self.controle = ft.DataTable(
+            bgcolor=SURFACE,
+            border_radius=12,
+            column_spacing=12,
+            columns=[
+                ft.DataColumn(ft.Text("Produto")),
+                ft.DataColumn(ft.Text("Qtd")),
+                ft.DataColumn(ft.Text("Preço")),
+                ft.DataColumn(ft.Text("Total")),
+                ft.DataColumn(ft.Text("Ações")),
+            ],
+            rows=[],
+        )
+
+    def __len__(self) -> int:
+        return len(self._linhas)
+
+    def sincronizar(self, carrinho: Carrinho, produto_id: int) -> List[ft.Control]:
+        item = carrinho.item(produto_id)
+        linha = self._linhas.get(produto_id)
+        if item is None:
+            if linha is None:
+                return []
+            del self._linhas[produto_id]
+            self.controle.rows.remove(linha.row)
+            return [self.controle]
+        if linha is None:
+            linha = self._linhas[produto_id] = self._nova_linha(item)
+            self.controle.rows.append(linha.row)
+            return [self.controle]
+        return linha.atualizar(item)
+
+    def recarregar(self, carrinho: Carrinho) -> List[ft.Control]:
+        """Reconstrói todas as linhas (ex.: carrinho limpo ou venda finalizada)."""
+        self._linhas = {item.produto_id: self._nova_linha(item) for item in carrinho}
+        self.controle.rows = [linha.row for linha in self._linhas.values()]
+        return [self.controle]
+
+    def _nova_linha(self, item: ItemCarrinho) -> _LinhaCarrinho:
+        return _LinhaCarrinho(item, self._on_ajustar, self._on_remover)
+
+
+__all__ = ["TabelaCarrinho"]
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
+from functools import partial
+from typing import List, Tuple
+
 import flet as ft
 
 from APP.core.security import can_access
 from APP.core.session import session
+from APP.core.tarefas import Cancelamento, tarefas
 from APP.core.utils import format_currency, hoje_intervalo, mes_atual_intervalo
-from APP.models import produtos_models, vendas_models
+from APP.models import relatorios_models, vendas_models
+from APP.models.resumos_models import relatorios_cache
 
+from .rotas import ao_revisitar
 from .style import (
     PRIMARY_COLOR,
     SECONDARY_COLOR,
@@ -17,42 +23,49 @@ from .style import (
 )
 
 
-def _coletar_resumos():
+def _total_dia() -> str:
+    return format_currency(vendas_models.total_vendas_periodo(*hoje_intervalo()))
+
+
+def _total_mes() -> str:
+    return format_currency(vendas_models.total_vendas_periodo(*mes_atual_intervalo()))
+
+
+def _alertas() -> Tuple[str, str]:
+    estoque_baixo, validade = relatorios_models.alertas_produtos()
+    return str(len(estoque_baixo)), str(len(validade))
+
+
+def _destaque() -> str:
     dia_inicio, dia_fim = hoje_intervalo()
-    mes_inicio, mes_fim = mes_atual_intervalo()
-    total_dia = vendas_models.total_vendas_periodo(dia_inicio, dia_fim)
-    total_mes = vendas_models.total_vendas_periodo(mes_inicio, mes_fim)
-    qtd_baixo = len(produtos_models.produtos_estoque_baixo())
-    qtd_validade = len(produtos_models.produtos_proximos_validade())
-    mais_vendido = vendas_models.produtos_mais_vendidos(dia_inicio, dia_fim, limite=1)
+    mais_vendido = relatorios_cache.obter(
+        "destaque",
+        dia_inicio,
+        dia_fim,
+        lambda: vendas_models.produtos_mais_vendidos(dia_inicio, dia_fim, limite=1),
+    )
     top = mais_vendido[0]["nome"] if mais_vendido else "Sem vendas hoje"
-    return total_dia, total_mes, qtd_baixo, qtd_validade, top
+    return f"Produto destaque hoje: {top}"
 
 
 def build_dashboard_view(page: ft.Page, on_navigate, on_logout) -> ft.View:
-    total_dia, total_mes, qtd_baixo, qtd_validade, top = _coletar_resumos()
+    destaque = ft.Text("Produto destaque hoje: ...", color="white")
 
     cards = [
-        build_card("Vendas do dia", format_currency(total_dia), ft.icons.CALENDAR_TODAY),
-        build_card(
-            "Vendas do mês",
-            format_currency(total_mes),
-            ft.icons.CALENDAR_MONTH,
-            SECONDARY_COLOR,
-        ),
-        build_card(
-            "Estoque baixo",
-            str(qtd_baixo),
-            ft.icons.WARNING_AMBER,
-            WARNING_COLOR,
-        ),
-        build_card(
-            "Validades próximas",
-            str(qtd_validade),
-            ft.icons.EVENT_AVAILABLE,
-            SUCCESS_COLOR,
-        ),
+        build_card("Vendas do dia", "...", ft.icons.CALENDAR_TODAY),
+        build_card("Vendas do mês", "...", ft.icons.CALENDAR_MONTH, SECONDARY_COLOR),
+        build_card("Estoque baixo", "...", ft.icons.WARNING_AMBER, WARNING_COLOR),
+        build_card("Validades próximas", "...", ft.icons.EVENT_AVAILABLE, SUCCESS_COLOR),
     ]
+    valores = [card.content.controls[1] for card in cards]
+    # Cada consulta preenche os seus textos assim que termina.
+    consultas = (
+        (_total_dia, valores[0:1]),
+        (_total_mes, valores[1:2]),
+        (_alertas, valores[2:4]),
+        (_destaque, [destaque]),
+    )
+    carga: List[Cancelamento] = []
 
     nav_itens = [
         ("Tela de Vendas", ft.icons.POINT_OF_SALE, "/pdv", "pdv"),
@@ -124,18 +137,48 @@ def build_dashboard_view(page: ft.Page, on_navigate, on_logout) -> ft.View:
             ft.Text("Resumo rápido", weight=ft.FontWeight.BOLD),
             ft.Row(cards, wrap=True, spacing=12, run_spacing=12),
             ft.Divider(),
-            ft.Text(f"Produto destaque hoje: {top}", color="white"),
+            destaque,
         ],
         spacing=20,
     )
 
-    return ft.View(
+    def preencher(textos: List[ft.Text], resultado) -> None:
+        resultado = resultado if isinstance(resultado, tuple) else (resultado,)
+        for texto, valor in zip(textos, resultado):
+            texto.value = valor
+        # Antes de a view entrar na página, o valor vai junto com a montagem.
+        if view in page.views:
+            page.update(*textos)
+
+    def falhar(textos: List[ft.Text], _erro: BaseException) -> None:
+        # Sem isso o card ficaria em "..." para sempre.
+        for texto in textos:
+            texto.value = "Falha ao carregar."
+        if view in page.views:
+            page.update(*textos)
+
+    def atualizar_resumos():
+        if carga:
+            carga.pop().cancelar()
+        token = Cancelamento()
+        carga.append(token)
+        for consulta, textos in consultas:
+            tarefas.enviar(
+                consulta,
+                token=token,
+                ao_concluir=partial(preencher, textos),
+                ao_falhar=partial(falhar, textos),
+            )
+
+    view = ft.View(
         "/dashboard",
         controls=[ft.Container(conteudo, expand=True, padding=0)],
         vertical_alignment=ft.MainAxisAlignment.START,
         horizontal_alignment=ft.CrossAxisAlignment.STRETCH,
         scroll=ft.ScrollMode.AUTO,
     )
+    atualizar_resumos()
+    return ao_revisitar(view, atualizar_resumos)
 
 
 __all__ = ["build_dashboard_view"]
@@ -5,8 +5,10 @@ from pathlib import Path
 import flet as ft
 
 from APP.core.config import get_config
+from APP.core.database import dump_query_stats
 from APP.core.security import can_access
 
+from .rotas import ao_revisitar
 from .style import SURFACE
 
 
@@ -28,7 +30,11 @@ def build_logs_view(page: ft.Page) -> ft.View:
         texto.value = ler_logs()
         page.update()
 
-    return ft.View(
+    def despejar_estatisticas(_):
+        dump_query_stats()
+        atualizar(_)
+
+    view = ft.View(
         "/logs",
         controls=[
             ft.Column(
@@ -43,10 +49,20 @@ def build_logs_view(page: ft.Page) -> ft.View:
                                 ft.Row(
                                     controls=[
                                         ft.Text("Últimos registros"),
-                                        ft.IconButton(
-                                            ft.icons.REFRESH,
-                                            tooltip="Atualizar",
-                                            on_click=atualizar,
+                                        ft.Row(
+                                            controls=[
+                                                ft.IconButton(
+                                                    ft.icons.QUERY_STATS,
+                                                    tooltip="Registrar estatísticas de consultas",
+                                                    on_click=despejar_estatisticas,
+                                                ),
+                                                ft.IconButton(
+                                                    ft.icons.REFRESH,
+                                                    tooltip="Atualizar",
+                                                    on_click=atualizar,
+                                                ),
+                                            ],
+                                            spacing=4,
                                         ),
                                     ],
                                     alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
@@ -67,6 +83,7 @@ def build_logs_view(page: ft.Page) -> ft.View:
             )
         ],
     )
+    return ao_revisitar(view, lambda: atualizar(None))
 
 
 __all__ = ["build_logs_view"]
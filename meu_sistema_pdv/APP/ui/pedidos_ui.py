@@ -5,9 +5,10 @@ from datetime import date, datetime
 import flet as ft
 
 from APP.core.security import can_access
-from APP.core.utils import format_currency
+from APP.core.utils import format_currency, intervalo_dias
 from APP.models import vendas_models
 
+from .rotas import ao_revisitar
 from .style import SURFACE
 
 
@@ -28,8 +29,7 @@ def build_pedidos_view(page: ft.Page) -> ft.View:
 
     def carregar(_=None):
         selecionada = data_field.value or date.today().isoformat()
-        inicio = f"{selecionada}T00:00:00"
-        fim = f"{selecionada}T23:59:59"
+        inicio, fim = intervalo_dias(selecionada)
         vendas = vendas_models.vendas_por_periodo(inicio, fim)
         cards = []
         for venda in vendas:
@@ -91,7 +91,7 @@ def build_pedidos_view(page: ft.Page) -> ft.View:
         spacing=10,
     )
 
-    return ft.View(
+    view = ft.View(
         "/pedidos",
         controls=[
             ft.Column(
@@ -105,6 +105,7 @@ def build_pedidos_view(page: ft.Page) -> ft.View:
         ],
         scroll=ft.ScrollMode.AUTO,
     )
+    return ao_revisitar(view, carregar)
 
 
 __all__ = ["build_pedidos_view"]
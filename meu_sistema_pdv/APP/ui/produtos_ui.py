@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import sqlite3
 from typing import Optional
 
 import flet as ft
@@ -9,6 +10,7 @@ from APP.core.session import session
 from APP.core.security import can_access
 from APP.models import produtos_models
 
+from .rotas import ao_revisitar
 from .style import CONTROL_STATE, PRIMARY_COLOR, SURFACE, WARNING_COLOR
 
 PRIMARY_BUTTON_STYLE = ft.ButtonStyle(
@@ -175,12 +177,16 @@ class ProdutosView:
         if not dados["nome"]:
             self._alerta("Informe o nome do produto.", WARNING_COLOR)
             return
-        if self.produto_id:
-            produtos_models.atualizar_produto(self.produto_id, **dados)
-            self._alerta("Produto atualizado!")
-        else:
-            produtos_models.criar_produto(**dados)
-            self._alerta("Produto criado!")
+        try:
+            if self.produto_id:
+                produtos_models.atualizar_produto(self.produto_id, **dados)
+                self._alerta("Produto atualizado!")
+            else:
+                produtos_models.criar_produto(**dados)
+                self._alerta("Produto criado!")
+        except sqlite3.IntegrityError:
+            self._alerta("Já existe um produto com esse código de barras.", WARNING_COLOR)
+            return
         self.limpar_formulario()
         self.carregar_produtos()
 
@@ -254,7 +260,7 @@ class ProdutosView:
                 spacing=12,
             ),
         )
-        return ft.View(
+        view = ft.View(
             "/produtos",
             controls=[
                 ft.Column(
@@ -268,6 +274,7 @@ class ProdutosView:
             ],
             scroll=ft.ScrollMode.AUTO,
         )
+        return ao_revisitar(view, self.carregar_produtos)
 
 
 def build_produtos_view(page: ft.Page):
@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+from APP.core.logger import get_logger
+from APP.core.tarefas import Cancelamento
+from APP.core.utils import format_currency
+from APP.models import relatorios_models, vendas_models
+from APP.models.relatorios_models import ResumoPeriodo
+
+try:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+except Exception:  # pragma: no cover
+    A4 = None
+    canvas = None
+
+logger = get_logger()
+
+# Intervalo, em linhas, entre dois avisos de progresso para a tela.
+AVISO_A_CADA = 200
+
+# O reportlab guarda as páginas de um arquivo até o `save()`: a cada tantas
+# páginas o arquivo é fechado e o relatório continua em `<nome>_parte2.pdf`...
+PAGINAS_POR_ARQUIVO = 500
+
+
+def disponivel() -> bool:
+    return canvas is not None
+
+
+def linha_movimento(movimento, padrao: str) -> str:
+    return (
+        f"{format_currency(abs(movimento['valor']))} - "
+        f"{movimento['descricao'] or padrao} ({movimento['criado_em']})"
+    )
+
+
+def _linha_venda(venda) -> str:
+    return (
+        f"{venda['criado_em']} - {venda['codigo']} - {venda['vendedor'] or '-'} - "
+        f"{venda['cliente'] or 'Consumidor'} - {format_currency(venda['total_liquido'])}"
+    )
+
+
+class DocumentoPDF:
+    """Escreve linhas de texto numa sequência de páginas, com quebra automática.
+
+    Cada página tem o título do relatório e o número no topo. Recebe qualquer
+    objeto com a interface do `canvas.Canvas` do reportlab. Com `proxima_tela`,
+    a cada `paginas_por_arquivo` páginas a tela atual é salva e o documento
+    segue numa tela nova, com a numeração contínua.
+    """
+
+    MARGEM = 50
+    ALTURA_LINHA = 16
+    FONTE = ("Helvetica", 11)
+    FONTE_TITULO = ("Helvetica-Bold", 12)
+
+    def __init__(
+        self,
+        tela: Any,
+        titulo: str,
+        tamanho: Tuple[float, float],
+        *,
+        proxima_tela: Optional[Callable[[], Any]] = None,
+        paginas_por_arquivo: Optional[int] = None,
+    ) -> None:
+        self.tela = tela
+        self.titulo_pagina = titulo
+        self.largura, self.altura = tamanho
+        self.paginas = 0
+        self.y = 0.0
+        self._proxima_tela = proxima_tela
+        self._paginas_por_arquivo = paginas_por_arquivo or PAGINAS_POR_ARQUIVO
+        self._paginas_na_tela = 0
+        self._nova_pagina()
+
+    def _nova_pagina(self) -> None:
+        cheia = self._paginas_na_tela >= self._paginas_por_arquivo
+        if self._proxima_tela is not None and cheia:
+            self.tela.save()
+            self.tela = self._proxima_tela()
+            self._paginas_na_tela = 0
+        elif self.paginas:
+            self.tela.showPage()
+        self.paginas += 1
+        self._paginas_na_tela += 1
+        topo = self.altura - self.MARGEM
+        self.tela.setFont("Helvetica-Bold", 14)
+        self.tela.drawString(self.MARGEM, topo, self.titulo_pagina)
+        self.tela.setFont("Helvetica", 9)
+        self.tela.drawRightString(self.largura - self.MARGEM, topo, f"Página {self.paginas}")
+        self.tela.line(self.MARGEM, topo - 8, self.largura - self.MARGEM, topo - 8)
+        self.tela.setFont(*self.FONTE)
+        self.y = topo - 30
+
+    def _garantir(self, altura: float) -> None:
+        if self.y - altura < self.MARGEM:
+            self._nova_pagina()
+
+    def _cortar(self, texto: str, largura: float, fonte: Tuple[str, int]) -> str:
+        if self.tela.stringWidth(texto, *fonte) <= largura:
+            return texto
+        while texto and self.tela.stringWidth(texto + "...", *fonte) > largura:
+            texto = texto[:-1]
+        return texto + "..."
+
+    def titulo(self, texto: str) -> None:
+        # Título nunca fica sozinho no pé da página.
+        self._garantir(self.ALTURA_LINHA * 2 + 6)
+        self.y -= 6
+        self.tela.setFont(*self.FONTE_TITULO)
+        largura = self.largura - 2 * self.MARGEM
+        self.tela.drawString(
+            self.MARGEM, self.y, self._cortar(texto, largura, self.FONTE_TITULO)
+        )
+        self.tela.setFont(*self.FONTE)
+        self.y -= self.ALTURA_LINHA
+
+    def linha(self, texto: str, recuo: float = 0) -> None:
+        self._garantir(self.ALTURA_LINHA)
+        largura = self.largura - 2 * self.MARGEM - recuo
+        self.tela.drawString(
+            self.MARGEM + recuo, self.y, self._cortar(texto, largura, self.FONTE)
+        )
+        self.y -= self.ALTURA_LINHA
+
+    def salvar(self) -> None:
+        self.tela.save()
+
+
+class _Progresso:
+    def __init__(self, total: int, aviso: Optional[Callable[[float], None]]) -> None:
+        self.total = max(total, 1)
+        self.feitas = 0
+        self.aviso = aviso
+
+    def avancar(self) -> None:
+        self.feitas += 1
+        if self.aviso is not None and self.feitas % AVISO_A_CADA == 0:
+            self.aviso(min(self.feitas / self.total, 1.0))
+
+
+def _escrever_linhas(
+    doc: DocumentoPDF,
+    linhas: Iterable,
+    formatar: Callable[[Any], str],
+    vazio: str,
+    token: Optional[Cancelamento],
+    progresso: _Progresso,
+) -> bool:
+    """Copia as linhas do cursor para o documento; False se a carga foi cancelada."""
+    escritas = 0
+    try:
+        for linha in linhas:
+            if token is not None and token.cancelado:
+                return False
+            doc.linha(formatar(linha), recuo=10)
+            escritas += 1
+            progresso.avancar()
+    finally:
+        # Devolve o leitor ao pool mesmo se parar no meio.
+        close = getattr(linhas, "close", None)
+        if close is not None:
+            close()
+    if not escritas:
+        doc.linha(vazio, recuo=10)
+    return True
+
+
+def escrever_relatorio(
+    doc: DocumentoPDF,
+    resumo: ResumoPeriodo,
+    *,
+    token: Optional[Cancelamento] = None,
+    progresso: Optional[Callable[[float], None]] = None,
+) -> bool:
+    """Preenche `doc` com o `resumo` da tela; False se a carga foi cancelada.
+
+    Totais e mais vendidos vêm do próprio `resumo`, sem nova consulta; só as
+    listas de saídas, perdas e vendas são relidas, linha a linha do cursor,
+    sem montar listas em Python. As páginas prontas ficam na tela do reportlab
+    até o `save()`; `DocumentoPDF` limita quantas são guardadas por arquivo.
+    """
+    inicio, fim = resumo.inicio, resumo.fim
+    vendas = resumo.vendas
+    top = resumo.top_produtos
+    andamento = _Progresso(len(resumo.saidas) + len(resumo.perdas) + vendas.vendas, progresso)
+
+    doc.titulo("Resumo")
+    doc.linha(f"Total: {format_currency(vendas.total_liquido)}", recuo=10)
+    doc.linha(f"Quantidade de vendas: {vendas.vendas}", recuo=10)
+    doc.linha(f"Descontos aplicados: {format_currency(vendas.descontos)}", recuo=10)
+    doc.titulo("Pagamentos")
+    for forma, total in vendas.pagamentos:
+        doc.linha(f"{forma}: {format_currency(total)}", recuo=10)
+    if not vendas.pagamentos:
+        doc.linha("Sem dados.", recuo=10)
+    doc.titulo("Produtos mais vendidos")
+    for prod in top:
+        doc.linha(f"{prod['nome']} - {prod['quantidade']} un.", recuo=10)
+    if not top:
+        doc.linha("Sem vendas.", recuo=10)
+
+    secoes = (
+        (
+            f"Saídas em dinheiro: {format_currency(resumo.saidas_total)}",
+            lambda: relatorios_models.iterar_movimentos("saida_caixa", inicio, fim),
+            lambda m: linha_movimento(m, "Saída em dinheiro"),
+            "Nenhuma saída registrada.",
+        ),
+        (
+            f"Perdas: {format_currency(resumo.perdas_total)}",
+            lambda: relatorios_models.iterar_movimentos("perda", inicio, fim),
+            lambda m: linha_movimento(m, "Perda registrada"),
+            "Nenhuma perda registrada.",
+        ),
+        (
+            f"Vendas do período ({vendas.vendas})",
+            lambda: vendas_models.iterar_vendas_periodo(inicio, fim),
+            _linha_venda,
+            "Nenhuma venda registrada.",
+        ),
+    )
+    for titulo, abrir, formatar, vazio in secoes:
+        if token is not None and token.cancelado:
+            return False
+        doc.titulo(titulo)
+        if not _escrever_linhas(doc, abrir(), formatar, vazio, token, andamento):
+            return False
+    if progresso is not None:
+        progresso(1.0)
+    return True
+
+
+def gerar_relatorio_pdf(
+    destino: Path,
+    resumo: ResumoPeriodo,
+    datas: Tuple[str, str],
+    *,
+    token: Optional[Cancelamento] = None,
+    progresso: Optional[Callable[[float], None]] = None,
+) -> List[Path]:
+    """Gera o PDF de `resumo` em `destino`; pensado para rodar em `tarefas`.
+
+    Devolve os arquivos gravados: `destino` e, em períodos com mais de
+    `PAGINAS_POR_ARQUIVO` páginas, as continuações `<nome>_parte2.pdf`...
+    A memória cresce até esse número de páginas, não com o período todo.
+    Se a carga for cancelada no meio, nada fica gravado e a lista vem vazia.
+    """
+    if canvas is None:
+        raise RuntimeError("Biblioteca reportlab não instalada.")
+    arquivos: List[Path] = [destino]
+
+    def proxima_tela() -> Any:
+        parte = len(arquivos) + 1
+        arquivos.append(destino.with_name(f"{destino.stem}_parte{parte}{destino.suffix}"))
+        return canvas.Canvas(str(arquivos[-1]), pagesize=A4, pageCompression=1)
+
+    tela = canvas.Canvas(str(destino), pagesize=A4, pageCompression=1)
+    doc = DocumentoPDF(
+        tela, f"Relatório de vendas {datas[0]} a {datas[1]}", A4, proxima_tela=proxima_tela
+    )
+    if not escrever_relatorio(doc, resumo, token=token, progresso=progresso):
+        for arquivo in arquivos:
+            arquivo.unlink(missing_ok=True)
+        logger.info("Exportação do relatório cancelada")
+        return []
+    doc.salvar()
+    logger.info(
+        "Relatório exportado para %s (%s páginas em %d arquivo(s))",
+        destino,
+        doc.paginas,
+        len(arquivos),
+    )
+    return arquivos
+
+
+__all__ = [
+    "DocumentoPDF",
+    "disponivel",
+    "escrever_relatorio",
+    "gerar_relatorio_pdf",
+    "linha_movimento",
+]
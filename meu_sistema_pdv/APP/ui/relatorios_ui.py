@@ -1,16 +1,23 @@
 from __future__ import annotations
 
+import threading
 from datetime import date
+from functools import partial
 from pathlib import Path
+from typing import Dict, List, Optional
 
 import flet as ft
 
 from APP.core.config import get_config
-from APP.core.logger import get_logger
 from APP.core.security import can_access
-from APP.core.utils import format_currency
-from APP.models import caixa_models, produtos_models, vendas_models
+from APP.core.tarefas import Cancelamento, tarefas
+from APP.core.utils import format_currency, intervalo_dias
+from APP.models import relatorios_models
+from APP.models.relatorios_models import ResumoPeriodo
 
+from . import relatorio_pdf
+from .relatorio_pdf import linha_movimento
+from .rotas import ao_revisitar
 from .style import CONTROL_STATE, PRIMARY_COLOR, SURFACE, TEXT_MUTED
 
 PRIMARY_BUTTON_STYLE = ft.ButtonStyle(
@@ -18,14 +25,15 @@ PRIMARY_BUTTON_STYLE = ft.ButtonStyle(
     color={CONTROL_STATE.DEFAULT: "white"},
 )
 
-try:
-    from reportlab.lib.pagesizes import A4
-    from reportlab.pdfgen import canvas
-except Exception:  # pragma: no cover
-    A4 = None
-    canvas = None
+DATA_INVALIDA = "Data inválida. Use o formato AAAA-MM-DD."
 
-logger = get_logger()
+
+def _placeholder(controles: List[ft.Control], texto: str, cor: str = TEXT_MUTED) -> None:
+    for controle in controles:
+        if isinstance(controle, ft.Column):
+            controle.controls = [ft.Text(texto, color=cor)]
+        else:
+            controle.value = "..."
 
 
 class RelatoriosView:
@@ -45,123 +53,228 @@ class RelatoriosView:
         self.top_produtos_list = ft.Column()
         self.estoque_baixo = ft.Column()
         self.validade_list = ft.Column()
+        self.resumo: ResumoPeriodo | None = None
+        self.progresso_pdf = ft.ProgressBar(value=0, visible=False)
+        self.cancelar_pdf_btn = ft.TextButton(
+            "Cancelar exportação",
+            on_click=lambda e: self.cancelar_exportacao(),
+            visible=False,
+        )
+        self.exportar_btn: Optional[ft.OutlinedButton] = None
+        self.view: Optional[ft.View] = None
+        self._carga: Optional[Cancelamento] = None
+        self._exportacao: Optional[Cancelamento] = None
+        self._lock = threading.Lock()
+        self._partes = {
+            "vendas": (
+                self._mostrar_vendas,
+                [self.total_text, self.qtd_text, self.descontos_text, self.pagamentos_list],
+            ),
+            "movimentos": (
+                self._mostrar_movimentos,
+                [
+                    self.saidas_total_text,
+                    self.saidas_list,
+                    self.perdas_total_text,
+                    self.perdas_list,
+                ],
+            ),
+            "top_produtos": (self._mostrar_top_produtos, [self.top_produtos_list]),
+            "alertas": (self._mostrar_alertas, [self.estoque_baixo, self.validade_list]),
+        }
         self.carregar()
 
-    def _range(self):
+    def _datas(self):
         inicio_val = (self.inicio.value or "").strip() or date.today().isoformat()
         fim_val = (self.fim.value or "").strip() or inicio_val
-        inicio_iso = f"{inicio_val}T00:00:00"
-        fim_iso = f"{fim_val}T23:59:59"
-        return inicio_iso, fim_iso
+        return inicio_val, fim_val
+
+    def _range(self):
+        return intervalo_dias(*self._datas())
 
     def carregar(self):
-        inicio, fim = self._range()
-        total = vendas_models.total_vendas_periodo(inicio, fim)
-        qtd = vendas_models.quantidade_vendas_periodo(inicio, fim)
-        descontos = vendas_models.total_descontos_periodo(inicio, fim)
-        pagamentos = vendas_models.pagamentos_por_periodo(inicio, fim)
-        saidas_total = caixa_models.total_saidas_periodo(inicio, fim)
-        saidas = caixa_models.saidas_por_periodo(inicio, fim)
-        perdas_total = caixa_models.total_perdas_periodo(inicio, fim)
-        perdas = caixa_models.perdas_por_periodo(inicio, fim)
-        top_produtos = vendas_models.produtos_mais_vendidos(inicio, fim, limite=5)
-        estoque_baixo = produtos_models.produtos_estoque_baixo()
-        validade = produtos_models.produtos_proximos_validade()
-
-        self.total_text.value = format_currency(total)
-        self.qtd_text.value = str(qtd)
-        self.descontos_text.value = format_currency(descontos)
-        self.saidas_total_text.value = format_currency(saidas_total)
-        self.perdas_total_text.value = format_currency(perdas_total)
+        """Mostra os cards vazios e preenche cada um quando a sua parte chega."""
+        try:
+            inicio, fim = self._range()
+        except ValueError:
+            self._avisar(DATA_INVALIDA, "red")
+            return
+        with self._lock:
+            if self._carga is not None:
+                self._carga.cancelar()
+            token = self._carga = Cancelamento()
+            self.resumo = None
+            for _mostrar, controles in self._partes.values():
+                _placeholder(controles, "Carregando...")
+        self.page.update()
+        recebidas: Dict[str, Dict] = {}
+        for nome in relatorios_models.PARTES:
+            tarefas.enviar(
+                partial(relatorios_models.parte_periodo, nome, inicio, fim),
+                token=token,
+                ao_concluir=partial(self._receber_parte, token, nome, recebidas, (inicio, fim)),
+                ao_falhar=partial(self._falha_parte, token, nome),
+            )
+
+    def _receber_parte(
+        self, token: Cancelamento, nome: str, recebidas: Dict[str, Dict], periodo, dados: Dict
+    ) -> None:
+        mostrar, controles = self._partes[nome]
+        with self._lock:
+            if token.cancelado:
+                return
+            mostrar(dados)
+            recebidas[nome] = dados
+            if len(recebidas) == len(relatorios_models.PARTES):
+                self.resumo = relatorios_models.montar_resumo(*periodo, recebidas)
+        self._enviar(controles)
+
+    def _falha_parte(self, token: Cancelamento, nome: str, _erro: BaseException) -> None:
+        _mostrar, controles = self._partes[nome]
+        with self._lock:
+            if token.cancelado:
+                return
+            _placeholder(controles, "Falha ao carregar.", cor="red")
+        self._enviar(controles)
+
+    def _enviar(self, controles: List[ft.Control]) -> None:
+        # Antes de a view entrar na página, os valores vão junto com a montagem.
+        if self.view is not None and self.view in self.page.views:
+            self.page.update(*controles)
+
+    def _mostrar_vendas(self, dados: Dict) -> None:
+        vendas = dados["vendas"]
+        self.total_text.value = format_currency(vendas.total_liquido)
+        self.qtd_text.value = str(vendas.vendas)
+        self.descontos_text.value = format_currency(vendas.descontos)
         self.pagamentos_list.controls = [
-            ft.Text(f"{p['forma_pagamento']}: {format_currency(p['total'])}")
-            for p in pagamentos
+            ft.Text(f"{forma}: {format_currency(total)}")
+            for forma, total in vendas.pagamentos
         ] or [ft.Text("Sem dados.", color=TEXT_MUTED)]
+
+    def _mostrar_movimentos(self, dados: Dict) -> None:
+        self.saidas_total_text.value = format_currency(dados["saidas_total"])
+        self.perdas_total_text.value = format_currency(dados["perdas_total"])
         self.saidas_list.controls = [
-            ft.Text(
-                f"{format_currency(abs(p['valor']))} - {p['descricao'] or 'Saída em dinheiro'} ({p['criado_em']})"
-            )
-            for p in saidas
+            ft.Text(linha_movimento(p, "Saída em dinheiro")) for p in dados["saidas"]
         ] or [ft.Text("Nenhuma saída registrada.", color=TEXT_MUTED)]
         self.perdas_list.controls = [
-            ft.Text(
-                f"{format_currency(abs(p['valor']))} - {p['descricao'] or 'Perda registrada'} ({p['criado_em']})"
-            )
-            for p in perdas
+            ft.Text(linha_movimento(p, "Perda registrada")) for p in dados["perdas"]
         ] or [ft.Text("Nenhuma perda registrada.", color=TEXT_MUTED)]
+
+    def _mostrar_top_produtos(self, dados: Dict) -> None:
         self.top_produtos_list.controls = [
             ft.Text(f"{p['nome']} - {p['quantidade']} un.")
-            for p in top_produtos
+            for p in dados["top_produtos"]
         ] or [ft.Text("Sem vendas.", color=TEXT_MUTED)]
+
+    def _mostrar_alertas(self, dados: Dict) -> None:
         self.estoque_baixo.controls = [
             ft.Text(f"{p['nome']} ({p['estoque']} un.)", color="orange")
-            for p in estoque_baixo
+            for p in dados["estoque_baixo"]
         ] or [ft.Text("Nenhum produto crítico.", color=TEXT_MUTED)]
         self.validade_list.controls = [
             ft.Text(f"{p['nome']} - {p['data_validade']}", color="orange")
-            for p in validade
+            for p in dados["validade"]
         ] or [ft.Text("Sem vencimentos próximos.", color=TEXT_MUTED)]
+
+    def _avisar(self, texto: str, cor: str) -> None:
+        self.page.snack_bar = ft.SnackBar(ft.Text(texto), bgcolor=cor)
+        self.page.snack_bar.open = True
         self.page.update()
 
     def exportar_pdf(self):
-        if not canvas:
-            self.page.snack_bar = ft.SnackBar(
-                ft.Text("Biblioteca reportlab não instalada."), bgcolor="red"
-            )
-            self.page.snack_bar.open = True
-            self.page.update()
+        """Gera o PDF numa tarefa de segundo plano, com a barra de progresso na tela.
+
+        O PDF sai do mesmo `ResumoPeriodo` que preencheu os cards; se a tela
+        ainda não terminou de carregar o período, a tarefa monta o resumo.
+        """
+        if not relatorio_pdf.disponivel():
+            self._avisar("Biblioteca reportlab não instalada.", "red")
+            return
+        if self._exportacao is not None:
             return
         cfg = get_config()
         destino = Path(cfg.backup_dir) / f"relatorio_{date.today().isoformat()}.pdf"
-        inicio, fim = self._range()
-        pagamentos = vendas_models.pagamentos_por_periodo(inicio, fim)
-        saidas_total = caixa_models.total_saidas_periodo(inicio, fim)
-        saidas = caixa_models.saidas_por_periodo(inicio, fim)
-        perdas_total = caixa_models.total_perdas_periodo(inicio, fim)
-        perdas = caixa_models.perdas_por_periodo(inicio, fim)
-        top_produtos = vendas_models.produtos_mais_vendidos(inicio, fim, limite=5)
-        c = canvas.Canvas(str(destino), pagesize=A4)
-        c.setFont("Helvetica-Bold", 16)
-        c.drawString(50, 800, f"Relatório de vendas {inicio} a {fim}")
-        c.setFont("Helvetica", 12)
-        c.drawString(50, 770, f"Total: {self.total_text.value}")
-        c.drawString(50, 750, f"Quantidade de vendas: {self.qtd_text.value}")
-        c.drawString(50, 720, "Pagamentos:")
-        y = 700
-        for pag in pagamentos:
-            c.drawString(60, y, f"{pag['forma_pagamento']}: {format_currency(pag['total'])}")
-            y -= 18
-        c.drawString(50, y, f"Saídas em dinheiro: {format_currency(saidas_total)}")
-        y -= 20
-        for saida in saidas:
-            c.drawString(
-                60,
-                y,
-                f"{format_currency(abs(saida['valor']))} - {saida['descricao'] or 'Saída em dinheiro'} ({saida['criado_em']})",
-            )
-            y -= 18
-        c.drawString(50, y, f"Perdas: {format_currency(perdas_total)}")
-        y -= 20
-        for perda in perdas:
-            c.drawString(
-                60,
-                y,
-                f"{format_currency(abs(perda['valor']))} - {perda['descricao'] or 'Perda registrada'} ({perda['criado_em']})",
-            )
-            y -= 18
-        y -= 10
-        c.drawString(50, y, "Top produtos:")
-        y -= 20
-        for prod in top_produtos:
-            c.drawString(60, y, f"{prod['nome']} - {prod['quantidade']} un.")
-            y -= 18
-        c.save()
-        logger.info("Relatório exportado para %s", destino)
-        self.page.snack_bar = ft.SnackBar(
-            ft.Text(f"Relatório salvo em {destino}"), bgcolor=PRIMARY_COLOR
-        )
-        self.page.snack_bar.open = True
+        try:
+            inicio, fim = self._range()
+        except ValueError:
+            self._avisar(DATA_INVALIDA, "red")
+            return
+        with self._lock:
+            resumo = self.resumo
+        if resumo is not None and (resumo.inicio, resumo.fim) != (inicio, fim):
+            resumo = None
+        token = self._exportacao = Cancelamento()
+        self.progresso_pdf.value = 0
+        self.progresso_pdf.visible = True
+        self.cancelar_pdf_btn.visible = True
+        if self.exportar_btn is not None:
+            self.exportar_btn.disabled = True
         self.page.update()
+        tarefas.enviar(
+            partial(self._gerar_pdf, destino, resumo, (inicio, fim), self._datas(), token),
+            token=token,
+            ao_concluir=partial(self._pdf_pronto, token),
+            ao_falhar=partial(self._pdf_falhou, token),
+        )
+
+    def _gerar_pdf(
+        self,
+        destino: Path,
+        resumo: Optional[ResumoPeriodo],
+        periodo,
+        datas,
+        token: Cancelamento,
+    ) -> List[Path]:
+        if resumo is None:
+            resumo = relatorios_models.resumo_periodo(*periodo)
+        return relatorio_pdf.gerar_relatorio_pdf(
+            destino, resumo, datas, token=token, progresso=self._progresso_pdf
+        )
+
+    def cancelar_exportacao(self) -> None:
+        """Interrompe a exportação em andamento; nada é gravado."""
+        token = self._exportacao
+        if token is None:
+            return
+        token.cancelar()
+        if self._fim_exportacao(token):
+            self._avisar("Exportação cancelada.", PRIMARY_COLOR)
+
+    def _progresso_pdf(self, fracao: float) -> None:
+        self.progresso_pdf.value = fracao
+        self._enviar([self.progresso_pdf])
+
+    def _fim_exportacao(self, token: Cancelamento) -> bool:
+        """Volta a tela ao estado sem exportação; False se `token` já encerrou."""
+        with self._lock:
+            if self._exportacao is not token:
+                return False
+            self._exportacao = None
+        self.progresso_pdf.visible = False
+        self.cancelar_pdf_btn.visible = False
+        if self.exportar_btn is not None:
+            self.exportar_btn.disabled = False
+        return True
+
+    def _pdf_pronto(self, token: Cancelamento, arquivos: List[Path]) -> None:
+        if not self._fim_exportacao(token):
+            return
+        if len(arquivos) > 1:
+            self._avisar(
+                f"Relatório salvo em {arquivos[0]} e mais {len(arquivos) - 1} arquivo(s)",
+                PRIMARY_COLOR,
+            )
+        elif arquivos:
+            self._avisar(f"Relatório salvo em {arquivos[0]}", PRIMARY_COLOR)
+        else:
+            self.page.update()
+
+    def _pdf_falhou(self, token: Cancelamento, _erro: BaseException) -> None:
+        if not self._fim_exportacao(token):
+            return
+        self._avisar("Falha ao exportar o relatório.", "red")
 
     def build_view(self) -> ft.View:
         if not can_access("relatorios"):
@@ -169,6 +282,12 @@ class RelatoriosView:
                 "/relatorios",
                 controls=[ft.Text("Usuário sem permissão para relatórios.", color="red")],
             )
+        self.exportar_btn = ft.OutlinedButton(
+            "Exportar PDF",
+            icon=ft.icons.PICTURE_AS_PDF,
+            on_click=lambda e: self.exportar_pdf(),
+            disabled=self._exportacao is not None,
+        )
         filtros = ft.ResponsiveRow(
             controls=[
                 ft.Container(self.inicio, col={"sm": 12, "md": 4}),
@@ -182,14 +301,7 @@ class RelatoriosView:
                     ),
                     col={"sm": 6, "md": 2},
                 ),
-                ft.Container(
-                    ft.OutlinedButton(
-                        "Exportar PDF",
-                        icon=ft.icons.PICTURE_AS_PDF,
-                        on_click=lambda e: self.exportar_pdf(),
-                    ),
-                    col={"sm": 6, "md": 2},
-                ),
+                ft.Container(self.exportar_btn, col={"sm": 6, "md": 2}),
             ],
             spacing=10,
             run_spacing=10,
@@ -276,13 +388,19 @@ class RelatoriosView:
             spacing=12,
             run_spacing=12,
         )
-        return ft.View(
+        view = self.view = ft.View(
             "/relatorios",
             controls=[
                 ft.Column(
                     controls=[
                         ft.Text("Relatórios e Indicadores", size=24, weight=ft.FontWeight.BOLD),
                         filtros,
+                        ft.Row(
+                            [
+                                ft.Container(self.progresso_pdf, expand=True),
+                                self.cancelar_pdf_btn,
+                            ]
+                        ),
                         cards,
                     ],
                     spacing=16,
@@ -290,6 +408,7 @@ class RelatoriosView:
             ],
             scroll=ft.ScrollMode.AUTO,
         )
+        return ao_revisitar(view, self.carregar)
 
 
 def build_relatorios_view(page: ft.Page):
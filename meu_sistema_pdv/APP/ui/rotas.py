@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import importlib
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Mapping, Optional
+
+import flet as ft
+
+from APP.core.logger import get_logger
+from APP.core.amostras import Amostras
+from APP.core.session import session
+
+logger = get_logger()
+
+
+@dataclass(frozen=True, slots=True)
+class Rota:
+    construtor: str
+    cache: bool = True
+
+
+ROTAS: Dict[str, Rota] = {
+    "/": Rota("build_login_view", cache=False),
+    "/dashboard": Rota("build_dashboard_view"),
+    "/pdv": Rota("build_pdv_view"),
+    "/produtos": Rota("build_produtos_view"),
+    "/usuarios": Rota("build_usuarios_view"),
+    "/relatorios": Rota("build_relatorios_view"),
+    "/caixa": Rota("build_caixa_view"),
+    "/logs": Rota("build_logs_view"),
+    "/config": Rota("build_config_view"),
+    "/pedidos": Rota("build_pedidos_view"),
+}
+
+
+def ao_revisitar(view: ft.View, atualizar: Callable[[], None]) -> ft.View:
+    """Guarda em `view.data` o que recarregar quando a tela sair do cache."""
+    view.data = atualizar
+    return view
+
+
+def _pagina_nao_encontrada(rota: str) -> ft.View:
+    return ft.View(
+        route=rota,
+        controls=[ft.Text("Página não encontrada.", color="red")],
+    )
+
+
+class RegistroTelas:
+    """Monta cada tela na primeira visita e a reaproveita durante a sessão.
+
+    O módulo da tela só é importado quando a rota é aberta (os construtores
+    vêm de `APP.ui`, que os resolve sob demanda). Ao voltar para uma tela já
+    montada, apenas o gancho registrado com `ao_revisitar` roda, em vez de
+    refazer controles e consultas. O cache é descartado quando o usuário da
+    sessão muda ou em `limpar()`.
+    """
+
+    def __init__(
+        self,
+        page: ft.Page,
+        argumentos: Optional[Mapping[str, Mapping[str, Any]]] = None,
+        rotas: Mapping[str, Rota] = ROTAS,
+    ) -> None:
+        self._page = page
+        self._argumentos = argumentos or {}
+        self._rotas = rotas
+        self._views: Dict[str, ft.View] = {}
+        self._dono: Optional[int] = None
+        self.montagens = Amostras("montagem de tela")
+        self.revisitas = Amostras("revisita de tela")
+
+    def limpar(self) -> None:
+        self._views.clear()
+        self._dono = None
+
+    def tela(self, rota: str) -> ft.View:
+        definicao = self._rotas.get(rota)
+        if definicao is None:
+            return _pagina_nao_encontrada(rota)
+
+        dono = session.user.id if session.user else None
+        if dono != self._dono:
+            self._views.clear()
+            self._dono = dono
+
+        inicio = time.perf_counter()
+        view = self._views.get(rota)
+        if view is not None:
+            if callable(view.data):
+                view.data()
+            decorrido = (time.perf_counter() - inicio) * 1000
+            self.revisitas.registrar(decorrido)
+            logger.debug("Tela %s reaproveitada em %.1f ms", rota, decorrido)
+            return view
+
+        view = self._construtor(definicao)(self._page, **self._argumentos.get(rota, {}))
+        if definicao.cache:
+            self._views[rota] = view
+        decorrido = (time.perf_counter() - inicio) * 1000
+        self.montagens.registrar(decorrido)
+        logger.debug("Tela %s montada em %.1f ms", rota, decorrido)
+        return view
+
+    @staticmethod
+    def _construtor(definicao: Rota) -> Callable[..., ft.View]:
+        return getattr(importlib.import_module("APP.ui"), definicao.construtor)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            "montagens": self.montagens.resumo(),
+            "revisitas": self.revisitas.resumo(),
+        }
+
+
+__all__ = ["ROTAS", "RegistroTelas", "Rota", "ao_revisitar"]
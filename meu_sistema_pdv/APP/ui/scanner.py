@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import time
+from typing import Callable
+
+
+class DetectorLeitor:
+    """Reconhece a digitação de um leitor de código de barras no campo de busca.
+
+    Leitores USB "digitam" o código inteiro em poucos milissegundos e mandam
+    Enter em seguida; uma pessoa leva bem mais de `intervalo_max_ms` entre
+    teclas. Enquanto todas as mudanças do campo forem só dígitos chegando em
+    rajada, `registrar` responde True e a tela pode pular as sugestões;
+    no Enter, `eh_leitura` confirma se o texto inteiro veio do leitor.
+    """
+
+    def __init__(
+        self,
+        *,
+        intervalo_max_ms: float = 50,
+        min_caracteres: int = 8,
+        relogio: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self._intervalo_max = intervalo_max_ms / 1000
+        self._min_caracteres = min_caracteres
+        self._relogio = relogio
+        self.reiniciar()
+
+    def reiniciar(self) -> None:
+        self._texto = ""
+        self._ultimo = 0.0
+        self._rajada = False
+
+    def registrar(self, texto: str) -> bool:
+        """Anota uma mudança do campo; True enquanto parecer leitura do leitor."""
+        agora = self._relogio()
+        rapido = agora - self._ultimo <= self._intervalo_max
+        if not texto.isdigit():
+            self.reiniciar()
+            return False
+        if self._texto and texto.startswith(self._texto) and len(texto) > len(self._texto):
+            # Mais dígitos no fim: a rajada continua se a tecla veio rápido.
+            self._rajada = self._rajada and rapido
+        else:
+            # Recomeço (campo vazio, apagou, colou): vários dígitos de uma
+            # vez já contam como rajada; um dígito só ainda não diz nada.
+            self._rajada = True
+        self._texto = texto
+        self._ultimo = agora
+        return self._rajada and len(texto) >= 2
+
+    def eh_leitura(self, texto: str) -> bool:
+        """No Enter: o texto atual chegou todo em rajada e tem cara de código?"""
+        return (
+            self._rajada
+            and texto == self._texto
+            and len(texto) >= self._min_caracteres
+            and self._relogio() - self._ultimo <= self._intervalo_max
+        )
+
+
+__all__ = ["DetectorLeitor"]
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from APP.core.amostras import Amostras
+from APP.core.logger import get_logger
+
+logger = get_logger()
+
+
+@dataclass(slots=True)
+class PedidoSugestao:
+    seq: int
+    texto: str
+    digitado_em: float = field(default_factory=time.perf_counter)
+
+
+class BuscadorSugestoes:
+    """Busca sugestões numa thread própria, com janela de debounce.
+
+    Cada tecla só registra o texto mais recente; a thread espera o usuário
+    parar de digitar por `debounce_ms`, faz uma única consulta e entrega o
+    resultado apenas se nenhum texto mais novo tiver chegado nesse meio tempo.
+    A thread termina sozinha depois de um período ocioso e é recriada sob
+    demanda, então telas descartadas não deixam threads presas.
+
+    A conferência "ainda é o pedido vigente?" e a entrega acontecem sob
+    `_entrega`, que `solicitar` e `cancelar` também tomam: depois que
+    `cancelar()` retorna, nenhum resultado antigo chega mais à tela.
+    """
+
+    def __init__(
+        self,
+        buscar: Callable[[str], List[Any]],
+        entregar: Callable[[PedidoSugestao, List[Any]], None],
+        *,
+        debounce_ms: float = 120,
+        ocioso_s: float = 30.0,
+    ) -> None:
+        self._buscar = buscar
+        self._entregar = entregar
+        self._debounce_s = debounce_ms / 1000
+        self._ocioso_s = ocioso_s
+        self._cond = threading.Condition()
+        self._entrega = threading.RLock()
+        self._seq = 0
+        self._pendente: Optional[PedidoSugestao] = None
+        self._thread: Optional[threading.Thread] = None
+        self.latencia = Amostras("sugestoes: tecla -> render")
+
+    def solicitar(self, texto: str) -> PedidoSugestao:
+        with self._entrega, self._cond:
+            self._seq += 1
+            pedido = PedidoSugestao(self._seq, texto)
+            self._pendente = pedido
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._executar, name="sugestoes", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+        return pedido
+
+    def cancelar(self) -> None:
+        """Descarta o pedido pendente e qualquer resultado ainda em voo.
+
+        Se uma entrega estiver em andamento, espera ela terminar.
+        """
+        with self._entrega, self._cond:
+            self._seq += 1
+            self._pendente = None
+
+    def vigente(self, pedido: PedidoSugestao) -> bool:
+        return pedido.seq == self._seq
+
+    def registrar_render(self, pedido: PedidoSugestao) -> float:
+        """Anota a latência entre a tecla e a exibição das sugestões."""
+        duracao_ms = (time.perf_counter() - pedido.digitado_em) * 1000
+        self.latencia.registrar(duracao_ms)
+        return duracao_ms
+
+    def resumo_latencia(self) -> Dict[str, Any]:
+        return self.latencia.resumo()
+
+    def _proximo_pedido(self) -> Optional[PedidoSugestao]:
+        with self._cond:
+            while True:
+                pedido = self._pendente
+                if pedido is None:
+                    if not self._cond.wait(self._ocioso_s) and self._pendente is None:
+                        self._thread = None
+                        return None
+                    continue
+                # Debounce: cada tecla nova substitui o pedido e adia a busca.
+                restante = pedido.digitado_em + self._debounce_s - time.perf_counter()
+                if restante <= 0:
+                    self._pendente = None
+                    return pedido
+                self._cond.wait(restante)
+
+    def _executar(self) -> None:
+        while True:
+            pedido = self._proximo_pedido()
+            if pedido is None:
+                return
+            try:
+                resultados = self._buscar(pedido.texto)
+            except Exception:
+                logger.exception("Falha ao buscar sugestões para %r", pedido.texto)
+                continue
+            with self._entrega:
+                if self.vigente(pedido):
+                    self._entregar(pedido, resultados)
+
+
+__all__ = ["BuscadorSugestoes", "PedidoSugestao"]
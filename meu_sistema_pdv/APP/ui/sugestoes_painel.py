@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from typing import Callable, List, Sequence
+
+import flet as ft
+
+from APP.core.utils import format_currency
+
+COR_DESTAQUE = "#1f2937"
+
+
+class _LinhaSugestao:
+    """Controles reaproveitados de uma posição da lista de sugestões."""
+
+    __slots__ = ("container", "nome", "detalhe")
+
+    def __init__(self, indice: int, on_escolher: Callable[[int], None]) -> None:
+        self.nome = ft.Text("", weight=ft.FontWeight.BOLD)
+        self.detalhe = ft.Text("", size=12, color="white70")
+        self.container = ft.Container(
+            border_radius=6,
+            padding=8,
+            visible=False,
+            on_click=lambda e: on_escolher(indice),
+            content=ft.Column(controls=[self.nome, self.detalhe], spacing=2),
+        )
+
+    def preencher(self, produto: dict) -> None:
+        self.nome.value = produto["nome"]
+        self.detalhe.value = (
+            f"Cód: {produto['codigo_barras'] or '-'} • {format_currency(produto['preco_venda'])}"
+        )
+        self.container.visible = True
+
+    def destacar(self, ativo: bool) -> None:
+        self.container.bgcolor = COR_DESTAQUE if ativo else None
+
+
+class PainelSugestoes:
+    """Lista de sugestões montada uma vez, com `tamanho` linhas fixas.
+
+    Novos resultados só trocam textos e visibilidade das linhas existentes;
+    mover o destaque altera a cor de duas linhas e devolve apenas elas para
+    envio, então o custo das setas não depende do tamanho da lista.
+    """
+
+    def __init__(self, tamanho: int, on_escolher: Callable[[int], None]) -> None:
+        self._linhas = [_LinhaSugestao(i, on_escolher) for i in range(tamanho)]
+        self._destaque = -1
+        self.controle = ft.Column(
+            controls=[linha.container for linha in self._linhas], spacing=0
+        )
+
+    @property
+    def tamanho(self) -> int:
+        return len(self._linhas)
+
+    def mostrar(self, produtos: Sequence[dict], destaque: int = 0) -> List[ft.Control]:
+        for indice, linha in enumerate(self._linhas):
+            if indice < len(produtos):
+                linha.preencher(produtos[indice])
+            else:
+                linha.container.visible = False
+            linha.destacar(indice == destaque)
+        self._destaque = destaque
+        return [self.controle]
+
+    def destacar(self, indice: int) -> List[ft.Control]:
+        if indice == self._destaque:
+            return []
+        alterados = []
+        for posicao, ativo in ((self._destaque, False), (indice, True)):
+            if 0 <= posicao < len(self._linhas):
+                self._linhas[posicao].destacar(ativo)
+                alterados.append(self._linhas[posicao].container)
+        self._destaque = indice
+        return alterados
+
+
+__all__ = ["PainelSugestoes"]
@@ -7,6 +7,7 @@ import flet as ft
 from APP.core.security import can_access
 from APP.models import usuarios_models
 
+from .rotas import ao_revisitar
 from .style import CONTROL_STATE, PRIMARY_COLOR, SURFACE, WARNING_COLOR
 
 PRIMARY_BUTTON_STYLE = ft.ButtonStyle(
@@ -168,7 +169,7 @@ class UsuariosView:
                 spacing=12,
             ),
         )
-        return ft.View(
+        view = ft.View(
             "/usuarios",
             controls=[
                 ft.Column(
@@ -190,6 +191,7 @@ class UsuariosView:
             ],
             scroll=ft.ScrollMode.AUTO,
         )
+        return ao_revisitar(view, self.carregar)
 
 
 def build_usuarios_view(page: ft.Page):
@@ -11,6 +11,7 @@ from APP.core.session import session
 from APP.core.utils import format_currency
 from APP.models import (
     caixa_models,
+    carrinho,
     clientes_models,
     produtos_models,
     vendas_models,
@@ -24,6 +25,14 @@ from .style import (
     SUCCESS_COLOR,
     WARNING_COLOR,
 )
+from .atualizacoes import LoteAtualizacoes, acao_de_tela
+from .carrinho_tabela import TabelaCarrinho
+from .rotas import ao_revisitar
+from .scanner import DetectorLeitor
+from .sugestoes import BuscadorSugestoes, PedidoSugestao
+from .sugestoes_painel import PainelSugestoes
+
+LIMITE_SUGESTOES = 6
 
 PRIMARY_BUTTON_STYLE = ft.ButtonStyle(
     bgcolor={CONTROL_STATE.DEFAULT: PRIMARY_COLOR},
@@ -40,8 +49,9 @@ logger = get_logger()
 class PDVController:
     def __init__(self, page: ft.Page, on_back) -> None:
         self.page = page
+        self._tela = LoteAtualizacoes(page)
         self.on_back = on_back
-        self.carrinho: List[dict] = []
+        self.carrinho = carrinho.Carrinho()
         self.ultima_venda: Optional[dict] = None
         self.busca_field = ft.TextField(
             label="Código de barras ou nome",
@@ -50,9 +60,9 @@ class PDVController:
             on_submit=lambda _: self._confirmar_entrada(),
             on_change=lambda e: self.atualizar_sugestoes(),
         )
-        self.sugestoes_lista = ft.Column(spacing=0)
+        self.painel_sugestoes = PainelSugestoes(LIMITE_SUGESTOES, self._escolher_sugestao)
         self.sugestoes_container = ft.Container(
-            content=self.sugestoes_lista,
+            content=self.painel_sugestoes.controle,
             bgcolor=SURFACE,
             border_radius=8,
             visible=False,
@@ -61,12 +71,11 @@ class PDVController:
         self.sugestoes_dados: List[dict] = []
         self.sugestoes_index: int = -1
         self._ultimo_texto_busca: str = ""
-        self.carrinho_list = ft.ListView(
-            spacing=4,
-            padding=0,
-            expand=True,
-            auto_scroll=False,
+        self._buscador = BuscadorSugestoes(
+            lambda texto: produtos_models.buscar_sugestoes(texto, limite=LIMITE_SUGESTOES),
+            self._receber_sugestoes,
         )
+        self._leitor = DetectorLeitor()
         self.quantidade_field = ft.TextField(
             label="Qtd",
             width=120,
@@ -121,24 +130,14 @@ class PDVController:
         )
         self._carregar_clientes()
 
-        self.tabela = ft.DataTable(
-            bgcolor=SURFACE,
-            border_radius=12,
-            column_spacing=12,
-            columns=[
-                ft.DataColumn(ft.Text("Produto")),
-                ft.DataColumn(ft.Text("Qtd")),
-                ft.DataColumn(ft.Text("Preço")),
-                ft.DataColumn(ft.Text("Total")),
-                ft.DataColumn(ft.Text("Ações")),
-            ],
-            rows=[],
+        self.tabela_carrinho = TabelaCarrinho(
+            on_ajustar=self.ajustar_quantidade, on_remover=self.remover_item
         )
+        self.tabela = self.tabela_carrinho.controle
         self.subtotal_text = ft.Text("R$ 0,00", size=20, weight=ft.FontWeight.BOLD)
         self.desconto_text = ft.Text("R$ 0,00", color=WARNING_COLOR)
         self.total_text = ft.Text("R$ 0,00", size=24, weight=ft.FontWeight.BOLD)
         self.ultima_text = ft.Text("Nenhuma venda ainda.", color="white70")
-        self.atualizar_lista_carrinho()
 
     def _limpar_zero_on_focus(self, e: ft.ControlEvent):
         """Remove o zero padrão ao focar um campo monetário."""
@@ -160,86 +159,90 @@ class PDVController:
     def _mostrar_alerta(self, mensagem: str, color: str = WARNING_COLOR):
         self.page.snack_bar = ft.SnackBar(ft.Text(mensagem), bgcolor=color)
         self.page.snack_bar.open = True
-        self.page.update()
+        self._tela.marcar()
 
-    def _produto_por_busca(self, texto: str):
+    def _ler_busca(self, texto: str) -> Optional[produtos_models.LeituraCodigo]:
         texto = texto.strip()
         if not texto:
             return None
-        produto = produtos_models.buscar_por_codigo(texto)
-        if produto:
-            return produto
-        return produtos_models.buscar_por_nome(texto)
+        leitura = produtos_models.ler_codigo(texto)
+        if leitura:
+            return leitura
+        produto = produtos_models.buscar_por_nome(texto)
+        return produtos_models.LeituraCodigo(produto) if produto else None
 
+    @acao_de_tela
     def atualizar_sugestoes(self):
         texto = (self.busca_field.value or "").strip()
         if texto == self._ultimo_texto_busca:
             return
         self._ultimo_texto_busca = texto
+        if self._leitor.registrar(texto):
+            # Rajada do leitor de código de barras: o Enter vem logo em
+            # seguida, então nem vale a pena buscar sugestões.
+            self._buscador.cancelar()
+            if self.sugestoes_container.visible:
+                self.ocultar_sugestoes()
+                self._ultimo_texto_busca = texto
+            return
         if len(texto) < 2:
             self.ocultar_sugestoes()
             return
-        resultados = produtos_models.buscar_sugestoes(texto, limite=6)
+        # A consulta roda na thread do buscador; o resultado chega em
+        # _receber_sugestoes só se o texto ainda for o mais recente.
+        self._buscador.solicitar(texto)
+
+    @acao_de_tela
+    def _receber_sugestoes(self, pedido: PedidoSugestao, resultados: List[dict]):
+        if pedido.texto != self._ultimo_texto_busca:
+            return
         if not resultados:
             self.ocultar_sugestoes()
             return
 
-        self.sugestoes_dados = resultados
+        self.sugestoes_dados = resultados[: self.painel_sugestoes.tamanho]
         self.sugestoes_index = 0
-        self._renderizar_sugestoes()
+        self.painel_sugestoes.mostrar(self.sugestoes_dados, self.sugestoes_index)
         self.sugestoes_container.visible = True
-        self.page.update()
+        self._tela.marcar(self.sugestoes_container)
+        self._tela.descarregar()  # a latência medida inclui o envio ao cliente
+        latencia_ms = self._buscador.registrar_render(pedido)
+        logger.debug("Sugestões para %r exibidas em %.1f ms", pedido.texto, latencia_ms)
 
+    @acao_de_tela
     def selecionar_sugestao(self, produto):
         self.busca_field.value = produto["codigo_barras"] or produto["nome"]
         self.ocultar_sugestoes()
         self.adicionar_item()
 
     def ocultar_sugestoes(self):
+        self._buscador.cancelar()
         self.sugestoes_dados = []
         self.sugestoes_index = -1
         self._ultimo_texto_busca = ""
         if self.sugestoes_container.visible:
             self.sugestoes_container.visible = False
-            self.page.update()
+            self._tela.marcar(self.sugestoes_container)
 
-    def _renderizar_sugestoes(self):
-        controles = []
-        for idx, produto in enumerate(self.sugestoes_dados):
-            selecionado = idx == self.sugestoes_index
-            controles.append(
-                ft.Container(
-                    bgcolor="#1f2937" if selecionado else None,
-                    border_radius=6,
-                    padding=8,
-                    on_click=lambda e, p=produto: self.selecionar_sugestao(p),
-                    content=ft.Column(
-                        controls=[
-                            ft.Text(produto["nome"], weight=ft.FontWeight.BOLD),
-                            ft.Text(
-                                f"Cód: {produto['codigo_barras'] or '-'} • {format_currency(produto['preco_venda'])}",
-                                size=12,
-                                color="white70",
-                            ),
-                        ],
-                        spacing=2,
-                    ),
-                )
-            )
-        self.sugestoes_lista.controls = controles
+    def _escolher_sugestao(self, indice: int):
+        if indice < len(self.sugestoes_dados):
+            self.selecionar_sugestao(self.sugestoes_dados[indice])
 
+    @acao_de_tela
     def mover_sugestao(self, delta: int):
         if not self.sugestoes_dados:
             return
         self.sugestoes_index = (self.sugestoes_index + delta) % len(self.sugestoes_dados)
-        self._renderizar_sugestoes()
-        self.page.update()
+        alterados = self.painel_sugestoes.destacar(self.sugestoes_index)
+        if alterados:
+            self._tela.marcar(*alterados)
 
     def aplicar_sugestao_atual(self):
         if not self.sugestoes_dados or self.sugestoes_index < 0:
             return
         self.selecionar_sugestao(self.sugestoes_dados[self.sugestoes_index])
 
+    @acao_de_tela
     def _atalho_busca(self, e: ft.KeyboardEvent):
         """Permite navegar nas sugestões e confirmar pelo teclado.
 
@@ -258,163 +261,110 @@ class PDVController:
         elif key in ("ESCAPE", "ESC"):
             self.ocultar_sugestoes()
 
-    def atualizar_lista_carrinho(self):
-        if not self.carrinho:
-            self.carrinho_list.controls = [
-                ft.Text("Nenhum produto no carrinho.", color="white70")
-            ]
-        else:
-            itens = []
-            for item in self.carrinho:
-                itens.append(
-                    ft.ListTile(
-                        title=ft.Text(item["nome"]),
-                        subtitle=ft.Text(
-                            f"Qtd: {item['quantidade']:.2f} x {format_currency(item['preco_unitario'])}"
-                        ),
-                        trailing=ft.Text(
-                            format_currency(item["quantidade"] * item["preco_unitario"])
-                        ),
-                        dense=True,
-                    )
-                )
-            self.carrinho_list.controls = itens
-
+    @acao_de_tela
     def adicionar_item(self):
-        produto = self._produto_por_busca(self.busca_field.value or "")
-        if not produto:
+        leitura = self._ler_busca(self.busca_field.value or "")
+        if not leitura:
             self._mostrar_alerta("Produto não encontrado.", color=WARNING_COLOR)
             return
-        try:
-            quantidade = float(self.quantidade_field.value or "1")
-        except ValueError:
-            quantidade = 1
-        existente = next(
-            (item for item in self.carrinho if item["produto_id"] == produto["id"]),
-            None,
+        self._adicionar_ao_carrinho(leitura.produto, leitura.quantidade)
+
+    def _registrar_leitura(self, codigo: str) -> bool:
+        """Caminho do leitor: busca exata no catálogo e uma única atualização."""
+        leitura = produtos_models.ler_codigo(codigo)
+        if not leitura:
+            return False
+        self._adicionar_ao_carrinho(leitura.produto, leitura.quantidade)
+        return True
+
+    def _adicionar_ao_carrinho(self, produto, quantidade: Optional[float] = None):
+        if quantidade is None:
+            # Etiquetas de balança já trazem a quantidade; nos demais
+            # códigos vale o campo Qtd.
+            try:
+                quantidade = float(self.quantidade_field.value or "1")
+            except ValueError:
+                quantidade = 1
+        self.carrinho.adicionar(
+            produto["id"], produto["nome"], produto["preco_venda"], quantidade
         )
-        if existente:
-            existente["quantidade"] += quantidade
-        else:
-            self.carrinho.append(
-                {
-                    "produto_id": produto["id"],
-                    "nome": produto["nome"],
-                    "preco_unitario": produto["preco_venda"],
-                    "quantidade": quantidade,
-                }
-            )
         self.busca_field.value = ""
         self.quantidade_field.value = "1"
+        self._leitor.reiniciar()
         self.ocultar_sugestoes()
-        self.atualizar_tabela()
+        self._tela.marcar(self.busca_field, self.quantidade_field)
+        self.atualizar_tabela(produto["id"])
         self.atualizar_resumo()
 
-    def atualizar_tabela(self):
-        linhas = []
-        for idx, item in enumerate(self.carrinho):
-            linhas.append(
-                ft.DataRow(
-                    cells=[
-                        ft.DataCell(ft.Text(item["nome"])),
-                        ft.DataCell(
-                            ft.Row(
-                                controls=[
-                                    ft.IconButton(
-                                        ft.icons.REMOVE,
-                                        on_click=lambda e, i=idx: self.ajustar_quantidade(
-                                            i, -1
-                                        ),
-                                        icon_size=18,
-                                    ),
-                                    ft.Text(f"{item['quantidade']:.2f}"),
-                                    ft.IconButton(
-                                        ft.icons.ADD,
-                                        on_click=lambda e, i=idx: self.ajustar_quantidade(
-                                            i, 1
-                                        ),
-                                        icon_size=18,
-                                    ),
-                                ]
-                            )
-                        ),
-                        ft.DataCell(ft.Text(format_currency(item["preco_unitario"]))),
-                        ft.DataCell(
-                            ft.Text(
-                                format_currency(
-                                    item["quantidade"] * item["preco_unitario"]
-                                )
-                            )
-                        ),
-                        ft.DataCell(
-                            ft.IconButton(
-                                ft.icons.DELETE_FOREVER,
-                                on_click=lambda e, i=idx: self.remover_item(i),
-                                icon_color=WARNING_COLOR,
-                            )
-                        ),
-                    ]
-                )
-            )
-        self.tabela.rows = linhas
-        self.atualizar_lista_carrinho()
-        self.page.update()
+    def atualizar_tabela(self, produto_id: Optional[int] = None):
+        """Reflete o carrinho na tabela.
 
-    def ajustar_quantidade(self, index: int, delta: float):
-        if index >= len(self.carrinho):
+        Com `produto_id`, só a linha desse produto é comparada e apenas os
+        controles alterados vão para o cliente; sem ele, a tabela é refeita.
+        """
+        if produto_id is None:
+            alterados = self.tabela_carrinho.recarregar(self.carrinho)
+        else:
+            alterados = self.tabela_carrinho.sincronizar(self.carrinho, produto_id)
+        if alterados:
+            self._tela.marcar(*alterados)
+
+    @acao_de_tela
+    def ajustar_quantidade(self, produto_id: int, delta: float):
+        if self.carrinho.ajustar_quantidade(produto_id, delta) is None:
             return
-        self.carrinho[index]["quantidade"] = max(
-            0.01, self.carrinho[index]["quantidade"] + delta
-        )
-        self.atualizar_tabela()
+        self.atualizar_tabela(produto_id)
         self.atualizar_resumo()
 
-    def remover_item(self, index: int):
-        if index < len(self.carrinho):
-            self.carrinho.pop(index)
-            self.atualizar_tabela()
+    @acao_de_tela
+    def remover_item(self, produto_id: int):
+        if self.carrinho.remover(produto_id) is not None:
+            self.atualizar_tabela(produto_id)
             self.atualizar_resumo()
 
-    def atualizar_resumo(self):
-        subtotal = sum(item["quantidade"] * item["preco_unitario"] for item in self.carrinho)
+    def _ler_desconto(self) -> float:
         try:
-            desconto_valor = float((self.desconto_field.value or "0").replace(",", "."))
+            return float((self.desconto_field.value or "0").replace(",", "."))
         except ValueError:
-            desconto_valor = 0
-        desconto_valor = max(0, min(desconto_valor, subtotal))
-        total = subtotal - desconto_valor
-        self.subtotal_text.value = format_currency(subtotal)
-        self.desconto_text.value = format_currency(desconto_valor)
-        self.total_text.value = format_currency(max(total, 0))
-        self.page.update()
+            return 0
+
+    @acao_de_tela
+    def atualizar_resumo(self):
+        self.carrinho.desconto = self._ler_desconto()
+        self.subtotal_text.value = format_currency(self.carrinho.subtotal)
+        self.desconto_text.value = format_currency(self.carrinho.desconto)
+        self.total_text.value = format_currency(self.carrinho.total)
+        self._tela.marcar(self.subtotal_text, self.desconto_text, self.total_text)
 
+    @acao_de_tela
     def alterar_preco_ultimo(self):
         if not self.carrinho:
             return
-        ultimo = self.carrinho[-1]
+        ultimo = self.carrinho.ultimo()
         dialog = ft.AlertDialog(modal=True)
 
         novo_preco = ft.TextField(
             label="Novo preço",
-            value=str(ultimo["preco_unitario"]),
+            value=str(ultimo.preco_unitario),
             autofocus=True,
         )
 
         def salvar(_):
-            try:
-                ultimo["preco_unitario"] = float(novo_preco.value)
-            except ValueError:
-                pass
-            dialog.open = False
-            self.page.update()
-            self.atualizar_tabela()
-            self.atualizar_resumo()
+            with self._tela.acao("alterar_preco"):
+                try:
+                    self.carrinho.alterar_preco(ultimo.produto_id, float(novo_preco.value))
+                except ValueError:
+                    pass
+                dialog.open = False
+                self._tela.marcar()
+                self.atualizar_tabela(ultimo.produto_id)
+                self.atualizar_resumo()
 
         def fechar(e=None):
             dialog.open = False
-            self.page.update()
+            self._tela.marcar()
 
-        dialog.title = ft.Text(f"Ajustar preço de {ultimo['nome']}")
+        dialog.title = ft.Text(f"Ajustar preço de {ultimo.nome}")
         dialog.content = novo_preco
         dialog.actions = [
             ft.TextButton("Cancelar", on_click=fechar),
@@ -423,8 +373,9 @@ class PDVController:
 
         self.page.dialog = dialog
         dialog.open = True
-        self.page.update()
+        self._tela.marcar()
 
+    @acao_de_tela
     def finalizar_venda(self):
         if not self.carrinho:
             self._mostrar_alerta("Carrinho vazio.", color=WARNING_COLOR)
@@ -433,39 +384,24 @@ class PDVController:
         cliente_id = (
             int(self.cliente_dropdown.value) if self.cliente_dropdown.value else None
         )
-        try:
-            desconto_valor = float((self.desconto_field.value or "0").replace(",", "."))
-        except ValueError:
-            desconto_valor = 0
-        subtotal = sum(item["quantidade"] * item["preco_unitario"] for item in self.carrinho)
-        desconto_valor = max(0, min(desconto_valor, subtotal))
+        self.carrinho.desconto = self._ler_desconto()
         pagamentos = [
             {
                 "forma": self.pagamento_dropdown.value or "Dinheiro",
-                "valor": subtotal - desconto_valor,
+                "valor": self.carrinho.total,
             }
         ]
 
-        resultado = vendas_models.registrar_venda(
-            self.carrinho,
+        resultado = vendas_models.finalizar_venda(
+            self.carrinho.itens_venda(),
             usuario_id=session.user.id,
             cliente_id=cliente_id,
-            desconto_valor=desconto_valor,
+            desconto_valor=self.carrinho.desconto,
             pagamentos=pagamentos,
             forma_principal=self.pagamento_dropdown.value,
         )
-        caixa = caixa_models.caixa_aberto(session.user.id)
-        if caixa:
-            caixa_models.registrar_movimento(
-                caixa["id"],
-                tipo="venda",
-                valor=resultado["total"],
-                forma_pagamento=pagamentos[0]["forma"],
-                venda_id=resultado["id"],
-                descricao=f"Venda {resultado['codigo']}",
-            )
         self.ultima_venda = resultado
-        self.carrinho = []
+        self.carrinho.limpar()
         self.atualizar_tabela()
         self.atualizar_resumo()
         self.atualizar_ultima_venda_texto()
@@ -494,13 +430,15 @@ class PDVController:
                 f"Total: {format_currency(self.ultima_venda['total'])}\n"
                 f"Hora: {hora}\nItens:\n{itens_detalhe}"
             )
-        self.page.update()
+        self._tela.marcar(self.ultima_text)
 
+    @acao_de_tela
     def limpar_carrinho(self):
-        self.carrinho = []
+        self.carrinho.limpar()
         self.atualizar_tabela()
         self.atualizar_resumo()
 
+    @acao_de_tela
     def registrar_pagamento_caixa(self, _=None):
         caixa = caixa_models.caixa_aberto(session.user.id)
         if not caixa:
@@ -537,11 +475,12 @@ class PDVController:
         )
         self.saida_valor_field.value = "0"
         self.saida_descricao_field.value = ""
-        self.page.update()
+        self._tela.marcar(self.saida_valor_field, self.saida_descricao_field)
         self._mostrar_alerta(
             "Pagamento em dinheiro do caixa registrado.", color=SUCCESS_COLOR
         )
 
+    @acao_de_tela
     def registrar_perda(self, _=None):
         caixa = caixa_models.caixa_aberto(session.user.id)
         if not caixa:
@@ -579,9 +518,10 @@ class PDVController:
         )
         self.perda_valor_field.value = "0"
         self.perda_descricao_field.value = ""
-        self.page.update()
+        self._tela.marcar(self.perda_valor_field, self.perda_descricao_field)
         self._mostrar_alerta("Perda registrada no caixa.", color=SUCCESS_COLOR)
 
+    @acao_de_tela
     def atalhos(self, e: ft.KeyboardEvent):
         key = (e.key or "").replace(" ", "").upper()
         if key == "F2":
@@ -593,7 +533,9 @@ class PDVController:
         elif key == "F5":
             self.alterar_preco_ultimo()
         elif key == "F6":
-            self.remover_item(len(self.carrinho) - 1)
+            ultimo = self.carrinho.ultimo()
+            if ultimo is not None:
+                self.remover_item(ultimo.produto_id)
         elif key == "F7":
             self.cliente_dropdown.focus()
         elif key == "F8":
@@ -841,7 +783,16 @@ class PDVController:
             scroll=ft.ScrollMode.ADAPTIVE,
         )
 
+    def retomar(self):
+        """Volta à tela já montada: carrinho preservado, atalhos e clientes renovados."""
+        self.page.on_keyboard_event = self.atalhos
+        self._carregar_clientes()
+
+    @acao_de_tela
     def _confirmar_entrada(self):
+        texto = (self.busca_field.value or "").strip()
+        if self._leitor.eh_leitura(texto) and self._registrar_leitura(texto):
+            return
         if self.sugestoes_dados:
             self.aplicar_sugestao_atual()
         else:
@@ -855,7 +806,7 @@ def build_pdv_view(page: ft.Page, on_back):
             controls=[ft.Text("Você não tem permissão para o PDV.", color="red")],
         )
     controller = PDVController(page, on_back)
-    return controller.build_view()
+    return ao_revisitar(controller.build_view(), controller.retomar)
 
 
 __all__ = ["build_pdv_view"]
@@ -1,32 +1,57 @@
 from __future__ import annotations
 
-import flet as ft
-
-from APP.core.config import get_config
-from APP.core.database import initialize_database
-from APP.core.logger import get_logger
-from APP.core.session import session
-from APP.ui import (
-    build_caixa_view,
-    build_config_view,
-    build_dashboard_view,
-    build_login_view,
-    build_pedidos_view,
-    build_pdv_view,
-    build_produtos_view,
-    build_relatorios_view,
-    build_usuarios_view,
-    build_logs_view,
-)
-from APP.ui.style import apply_theme
+import sys
 
+from APP.core import tracing
 
-def main(page: ft.Page):
+if tracing.FLAG in sys.argv:
+    tracing.ativar()
+
+with tracing.span("import"):
+    with tracing.span("flet"):
+        import flet as ft
+
+    from APP.core.config import get_config
+    from APP.core.database import initialize_database
+    from APP.core.logger import get_logger
+    from APP.core.session import session
+    from APP.ui.rotas import RegistroTelas
+    from APP.ui.style import apply_theme
+
+
+def preparar():
+    """Etapas da partida que não dependem da tela (config, log e banco)."""
     cfg = get_config()
-    apply_theme(page)
     initialize_database()
+    get_logger().info("Aplicação iniciada.")
+    return cfg
+
+
+def concluir_rastreamento() -> None:
+    """Grava o relatório do rastreamento, se ativo, e confere o orçamento."""
+    cfg = get_config()
+    raiz = tracing.rastreador.concluir(cfg.startup_report_path)
+    if raiz is None:
+        return
     logger = get_logger()
-    logger.info("Aplicação iniciada.")
+    logger.info(
+        "Inicialização rastreada (%s):\n%s",
+        cfg.startup_report_path,
+        tracing.rastreador.formatar(),
+    )
+    if raiz.duracao_ms > cfg.startup["budget_ms"]:
+        logger.warning(
+            "Inicialização levou %.0f ms (orçamento: %s ms).",
+            raiz.duracao_ms,
+            cfg.startup["budget_ms"],
+        )
+
+
+def main(page: ft.Page):
+    with tracing.span("main"):
+        cfg = preparar()
+        with tracing.span("tema"):
+            apply_theme(page)
     page.title = cfg.app_name
     page.window.width = 1200
     page.window.height = 780
@@ -40,53 +65,29 @@ def main(page: ft.Page):
 
     def fazer_logout():
         session.logout()
+        telas.limpar()
         page.go("/")
 
+    telas = RegistroTelas(
+        page,
+        {
+            "/": {"on_success": lambda: page.go("/dashboard")},
+            "/dashboard": {"on_navigate": navegar, "on_logout": fazer_logout},
+            "/pdv": {"on_back": navegar},
+        },
+    )
+
     def route_change(e: ft.RouteChangeEvent):
         page.views.clear()
         page.on_keyboard_event = None
-        if page.route == "/":
-            page.views.append(
-                build_login_view(
-                    page,
-                    on_success=lambda: page.go("/dashboard"),
-                )
-            )
-        elif not session.is_authenticated():
+        if page.route != "/" and not session.is_authenticated():
             page.go("/")
             return
-        elif page.route == "/dashboard":
-            page.views.append(
-                build_dashboard_view(
-                    page,
-                    on_navigate=navegar,
-                    on_logout=fazer_logout,
-                )
-            )
-        elif page.route == "/pdv":
-            page.views.append(build_pdv_view(page, on_back=navegar))
-        elif page.route == "/produtos":
-            page.views.append(build_produtos_view(page))
-        elif page.route == "/usuarios":
-            page.views.append(build_usuarios_view(page))
-        elif page.route == "/relatorios":
-            page.views.append(build_relatorios_view(page))
-        elif page.route == "/caixa":
-            page.views.append(build_caixa_view(page))
-        elif page.route == "/logs":
-            page.views.append(build_logs_view(page))
-        elif page.route == "/config":
-            page.views.append(build_config_view(page))
-        elif page.route == "/pedidos":
-            page.views.append(build_pedidos_view(page))
-        else:
-            page.views.append(
-                ft.View(
-                    page.route,
-                    controls=[ft.Text("Página não encontrada.", color="red")],
-                )
-            )
-        page.update()
+        with tracing.span(f"tela {page.route}"):
+            page.views.append(telas.tela(page.route))
+            page.update()
+        # A primeira tela desenhada encerra a partida.
+        concluir_rastreamento()
 
     def view_pop(e: ft.ViewPopEvent):
         page.views.pop()
@@ -1 +1,15 @@
 """Permite que `python -m unittest` descubra os testes do pacote tests."""
+
+import os
+import sys
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+PROJECT_DIR = os.path.join(ROOT_DIR, "meu_sistema_pdv")
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from APP.core import logger  # noqa: E402
+
+# Os testes não gravam no DATA/system.log real; os que usam banco temporário
+# apontam o log para o diretório deles (tests.db_helpers).
+logger.redirecionar_arquivo(None)
@@ -0,0 +1,45 @@
+"""Utilitários para testes que precisam de um banco SQLite isolado."""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+PROJECT_DIR = os.path.join(ROOT_DIR, "meu_sistema_pdv")
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from APP.core import config, database, logger
+from APP.models import produtos_models
+
+
+class BancoTemporarioTestCase(unittest.TestCase):
+    """Aponta a configuração para um banco novo em diretório temporário."""
+
+    extra_config: dict = {}
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        tmp = Path(self._tmp.name)
+        dados = {
+            "database_path": str(tmp / "test.db"),
+            "log_path": str(tmp / "test.log"),
+            "backup_dir": str(tmp / "backup"),
+            **self.extra_config,
+        }
+        cfg_path = tmp / "config.json"
+        cfg_path.write_text(json.dumps(dados), encoding="utf-8")
+        database.close_connection()
+        config.load_config(cfg_path)
+        logger.redirecionar_arquivo(config.get_config().log_path)
+        database.initialize_database()
+        produtos_models.invalidar_caches()
+
+    def tearDown(self):
+        database.close_connection()
+        logger.redirecionar_arquivo(None)
+        config.load_config(config.CONFIG_FILE)
+        self._tmp.cleanup()
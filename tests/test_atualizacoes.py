@@ -0,0 +1,122 @@
+import os
+import sys
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+PROJECT_DIR = os.path.join(ROOT_DIR, "meu_sistema_pdv")
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from APP.models import produtos_models
+from APP.models.carrinho import Carrinho
+from APP.ui import carrinho_tabela
+from APP.ui.atualizacoes import LoteAtualizacoes
+from APP.ui.carrinho_tabela import TabelaCarrinho
+from APP.ui.scanner import DetectorLeitor
+from APP.ui.vendas_ui import PDVController
+
+
+class LoteAtualizacoesTests(unittest.TestCase):
+    def setUp(self):
+        self.page = MagicMock()
+        self.tela = LoteAtualizacoes(self.page)
+
+    def test_fora_de_acao_envia_na_hora(self):
+        controle = object()
+        self.tela.marcar(controle)
+        self.page.update.assert_called_once_with(controle)
+
+    def test_acao_aninhada_envia_uma_vez_sem_repetir_controles(self):
+        a, b = object(), object()
+        with self.tela.acao("externa"):
+            self.tela.marcar(a)
+            with self.tela.acao("interna"):
+                self.tela.marcar(b, a)
+            self.page.update.assert_not_called()
+
+        self.page.update.assert_called_once_with(a, b)
+        self.assertEqual(
+            self.tela.stats(),
+            {"acoes": 1, "envios": 1, "ultima_acao": "externa", "envios_ultima_acao": 1},
+        )
+
+    def test_pagina_inteira_substitui_envio_por_controle(self):
+        with self.tela.acao():
+            self.tela.marcar(object())
+            self.tela.marcar()
+        self.page.update.assert_called_once_with()
+
+    def test_acao_sem_mudancas_nao_envia(self):
+        with self.tela.acao("nada"):
+            pass
+        self.page.update.assert_not_called()
+        self.assertEqual(self.tela.stats()["envios_ultima_acao"], 0)
+
+    def test_outra_thread_nao_entra_no_lote(self):
+        de_fora = object()
+        with self.tela.acao():
+            thread = threading.Thread(target=self.tela.marcar, args=(de_fora,))
+            thread.start()
+            thread.join()
+            self.page.update.assert_called_once_with(de_fora)
+
+
+class PDVUmEnvioPorAcaoTests(unittest.TestCase):
+    def setUp(self):
+        icones = SimpleNamespace(REMOVE="remove", ADD="add", DELETE_FOREVER="delete")
+        patcher = patch.object(carrinho_tabela.ft, "icons", icones, create=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        ctrl = object.__new__(PDVController)
+        ctrl.page = MagicMock()
+        ctrl._tela = LoteAtualizacoes(ctrl.page)
+        ctrl.carrinho = Carrinho()
+        ctrl.tabela_carrinho = TabelaCarrinho(
+            on_ajustar=ctrl.ajustar_quantidade, on_remover=ctrl.remover_item
+        )
+        ctrl._buscador = MagicMock()
+        ctrl._leitor = DetectorLeitor(intervalo_max_ms=10_000)
+        ctrl.sugestoes_container = SimpleNamespace(visible=True)
+        ctrl.sugestoes_dados = [{"nome": "Café"}]
+        ctrl.sugestoes_index = 0
+        ctrl._ultimo_texto_busca = ""
+        for nome in ("busca_field", "quantidade_field", "desconto_field"):
+            setattr(ctrl, nome, SimpleNamespace(value=""))
+        for nome in ("subtotal_text", "desconto_text", "total_text"):
+            setattr(ctrl, nome, SimpleNamespace(value=""))
+        self.ctrl = ctrl
+
+    def test_leitura_com_sugestoes_abertas_envia_uma_vez(self):
+        produto = {"id": 1, "nome": "Café", "preco_venda": 9.5}
+        self.ctrl.busca_field.value = "7891000100103"
+        self.ctrl._leitor.registrar("7891000100103")
+
+        with patch(
+            "APP.ui.vendas_ui.produtos_models.ler_codigo",
+            return_value=produtos_models.LeituraCodigo(produto),
+        ):
+            self.ctrl._confirmar_entrada()
+
+        self.ctrl.page.update.assert_called_once()
+        self.assertIn(self.ctrl.sugestoes_container, self.ctrl.page.update.call_args.args)
+        self.assertIn(self.ctrl.total_text, self.ctrl.page.update.call_args.args)
+        self.assertEqual(self.ctrl.total_text.value, "R$ 9,50")
+        self.assertEqual(self.ctrl._tela.stats()["envios_ultima_acao"], 1)
+
+    def test_produto_nao_encontrado_envia_uma_vez(self):
+        self.ctrl.sugestoes_dados = []
+        self.ctrl.busca_field.value = "inexistente"
+
+        with patch(
+            "APP.ui.vendas_ui.produtos_models.ler_codigo", return_value=None
+        ), patch("APP.ui.vendas_ui.produtos_models.buscar_por_nome", return_value=None):
+            self.ctrl._confirmar_entrada()
+
+        self.ctrl.page.update.assert_called_once_with()
+
+
+if __name__ == "__main__":
+    unittest.main()
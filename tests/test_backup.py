@@ -0,0 +1,27 @@
+import sqlite3
+import unittest
+
+from tests.db_helpers import BancoTemporarioTestCase
+
+from APP.core import backup
+from APP.models import produtos_models
+
+
+class BackupTests(BancoTemporarioTestCase):
+    def test_backup_inclui_commit_ainda_no_wal(self):
+        produtos_models.criar_produto("Café", 12.0, 10, 1)
+
+        destino = backup.criar_backup_manual()
+
+        copia = sqlite3.connect(destino)
+        try:
+            row = copia.execute("SELECT nome FROM produtos WHERE nome = 'Café'").fetchone()
+            integridade = copia.execute("PRAGMA integrity_check").fetchone()[0]
+        finally:
+            copia.close()
+        self.assertEqual(row[0], "Café")
+        self.assertEqual(integridade, "ok")
+
+
+if __name__ == "__main__":
+    unittest.main()
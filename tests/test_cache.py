@@ -0,0 +1,120 @@
+import os
+import sys
+import unittest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+PROJECT_DIR = os.path.join(ROOT_DIR, "meu_sistema_pdv")
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from APP.core.cache import CachePeriodos, LRUCache
+from APP.core.utils import hoje_intervalo, intervalo_dias
+
+
+class LRUCacheTests(unittest.TestCase):
+    def test_descarta_o_menos_usado(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertNotIn("b", cache)
+        self.assertEqual((cache.get("a"), cache.get("c")), (1, 3))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_limite_por_peso(self):
+        cache = LRUCache(10, max_peso=5, peso=len)
+        cache.put("x", [1, 2, 3])
+        cache.put("y", [1, 2])
+        cache.put("z", [1])
+        self.assertNotIn("x", cache)
+        self.assertEqual(cache.stats()["peso"], 3)
+
+    def test_peek_nao_altera_ordem_nem_contadores(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.peek("a"), 1)
+        cache.put("c", 3)
+        self.assertNotIn("a", cache)
+        self.assertEqual((cache.hits, cache.misses), (0, 0))
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.misses, 1)
+
+    def test_pop_where(self):
+        cache = LRUCache(5, max_peso=10, peso=len)
+        for chave in ("aa", "b", "cc"):
+            cache.put(chave, chave)
+        self.assertEqual(cache.pop_where(lambda chave, _valor: len(chave) == 2), 2)
+        self.assertEqual((len(cache), cache.stats()["peso"]), (1, 1))
+
+
+class CachePeriodosTests(unittest.TestCase):
+    def setUp(self):
+        self.cache = CachePeriodos(max_itens=4)
+        self.calculos = 0
+
+    def _obter(self, inicio, fim):
+        def calcular():
+            self.calculos += 1
+            return self.calculos
+
+        return self.cache.obter("vendas", inicio, fim, calcular)
+
+    def test_periodo_com_hoje_vale_ate_a_proxima_escrita(self):
+        hoje = hoje_intervalo()
+        self.assertEqual(self._obter(*hoje), 1)
+        self.assertEqual(self._obter(*hoje), 1)
+        self.cache.registrar_escrita()
+        self.assertEqual(self._obter(*hoje), 2)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+
+    def test_periodo_fechado_so_cai_com_escrita_retroativa(self):
+        ontem = intervalo_dias("2024-03-05")
+        outro = intervalo_dias("2024-03-06")
+        self._obter(*ontem)
+        self._obter(*outro)
+        self.cache.registrar_escrita()
+        self.cache.registrar_escrita(outro[0] + 60)
+        self.assertEqual(self._obter(*ontem), 1)
+        self.assertEqual(self._obter(*outro), 3)
+
+    def test_escrita_retroativa_durante_o_calculo_nao_e_guardada(self):
+        periodo = intervalo_dias("2024-03-05")
+
+        def calcular():
+            self.cache.registrar_escrita(periodo[0])
+            return "antigo"
+
+        self.cache.obter("vendas", *periodo, calcular)
+        self.assertEqual(self._obter(*periodo), 1)
+
+    def test_versao_do_banco_separa_escritas_de_outros_processos(self):
+        banco = {"versao": 0}
+        self.cache = CachePeriodos(max_itens=4, versao=lambda: banco["versao"])
+        periodo = intervalo_dias("2024-03-05")
+        self.assertEqual(self._obter(*periodo), 1)
+
+        # Escrita deste processo de hoje: a versão acompanha e o passado fica.
+        banco["versao"] = 2
+        self.cache.registrar_escrita(versoes=(0, 2))
+        self.assertEqual(self._obter(*periodo), 1)
+
+        # Outro processo gravou: a versão andou sozinha e tudo é recalculado.
+        banco["versao"] = 3
+        self.assertEqual(self._obter(*periodo), 2)
+
+        # Escrita deste processo depois de uma de outro ainda não vista.
+        self.cache.registrar_escrita(versoes=(4, 5))
+        banco["versao"] = 5
+        self.assertEqual(self._obter(*periodo), 3)
+
+    def test_limite_de_itens(self):
+        for dia in range(1, 7):
+            self._obter(*intervalo_dias(f"2024-03-{dia:02d}"))
+        self.assertEqual(self.cache.stats()["itens"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
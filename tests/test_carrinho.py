@@ -0,0 +1,82 @@
+import os
+import sys
+import unittest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+PROJECT_DIR = os.path.join(ROOT_DIR, "meu_sistema_pdv")
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from APP.models.carrinho import Carrinho, ItemCarrinho
+
+
+class CarrinhoTests(unittest.TestCase):
+    def setUp(self):
+        self.carrinho = Carrinho()
+        self.carrinho.adicionar(1, "Arroz", 25.0, 2)
+        self.carrinho.adicionar(2, "Feijão", 8.5, 1)
+
+    def _subtotal_recalculado(self):
+        return sum(item.quantidade * item.preco_unitario for item in self.carrinho)
+
+    def test_mesmo_produto_soma_na_linha_existente(self):
+        item = self.carrinho.adicionar(1, "Arroz", 25.0, 1)
+        self.assertEqual(len(self.carrinho), 2)
+        self.assertEqual(item.quantidade, 3)
+        self.assertEqual(self.carrinho.subtotal, 83.5)
+
+    def test_totais_incrementais_batem_com_recalculo(self):
+        self.carrinho.ajustar_quantidade(2, 2)
+        self.carrinho.alterar_preco(1, 23.9)
+        self.carrinho.adicionar(3, "Óleo", 7.99, 0.5)
+        self.carrinho.remover(2)
+        self.assertAlmostEqual(self.carrinho.subtotal, self._subtotal_recalculado())
+        self.carrinho.remover(1)
+        self.carrinho.remover(3)
+        self.assertEqual(self.carrinho.subtotal, 0.0)
+
+    def test_quantidade_nao_fica_abaixo_do_minimo(self):
+        self.carrinho.ajustar_quantidade(2, -5)
+        self.assertEqual(self.carrinho.item(2).quantidade, Carrinho.QUANTIDADE_MINIMA)
+        self.assertAlmostEqual(self.carrinho.subtotal, self._subtotal_recalculado())
+
+    def test_desconto_limitado_ao_subtotal(self):
+        self.carrinho.desconto = 10
+        self.assertEqual(self.carrinho.total, 48.5)
+        self.carrinho.desconto = 100
+        self.assertEqual((self.carrinho.desconto, self.carrinho.total), (58.5, 0))
+        self.carrinho.desconto = -3
+        self.assertEqual(self.carrinho.desconto, 0)
+
+    def test_ordem_de_inclusao_e_ultimo(self):
+        self.carrinho.adicionar(3, "Óleo", 7.99, 1)
+        self.carrinho.adicionar(1, "Arroz", 25.0, 1)
+        self.assertEqual([i.produto_id for i in self.carrinho], [1, 2, 3])
+        self.assertEqual(self.carrinho.ultimo().produto_id, 3)
+        self.carrinho.remover(3)
+        self.assertEqual(self.carrinho.ultimo().produto_id, 2)
+
+    def test_itens_venda_e_limpar(self):
+        self.assertEqual(
+            self.carrinho.itens_venda()[0],
+            {"produto_id": 1, "nome": "Arroz", "preco_unitario": 25.0, "quantidade": 2},
+        )
+        self.carrinho.desconto = 5
+        self.carrinho.limpar()
+        self.assertFalse(self.carrinho)
+        self.assertIsNone(self.carrinho.ultimo())
+        self.assertEqual((self.carrinho.subtotal, self.carrinho.total), (0.0, 0.0))
+
+    def test_operacoes_em_produto_ausente(self):
+        self.assertIsNone(self.carrinho.ajustar_quantidade(99, 1))
+        self.assertIsNone(self.carrinho.alterar_preco(99, 1))
+        self.assertIsNone(self.carrinho.remover(99))
+
+    def test_item_usa_slots(self):
+        item = ItemCarrinho(1, "Arroz", 25.0, 2)
+        with self.assertRaises(AttributeError):
+            item.desconto = 1
+
+
+if __name__ == "__main__":
+    unittest.main()
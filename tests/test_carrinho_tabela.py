@@ -0,0 +1,129 @@
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+PROJECT_DIR = os.path.join(ROOT_DIR, "meu_sistema_pdv")
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from APP.models.carrinho import Carrinho
+from APP.ui import carrinho_tabela
+from APP.ui.atualizacoes import LoteAtualizacoes
+from APP.ui.carrinho_tabela import TabelaCarrinho
+from APP.ui.vendas_ui import PDVController
+
+ICONES = SimpleNamespace(REMOVE="remove", ADD="add", DELETE_FOREVER="delete_forever")
+
+
+class TabelaCarrinhoTests(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(carrinho_tabela.ft, "icons", ICONES, create=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.ajustar = MagicMock()
+        self.remover = MagicMock()
+        self.tabela = TabelaCarrinho(on_ajustar=self.ajustar, on_remover=self.remover)
+        self.carrinho = Carrinho()
+
+    def _adicionar(self, produto_id, quantidade=1, preco=10.0):
+        self.carrinho.adicionar(produto_id, f"Produto {produto_id}", preco, quantidade)
+        return self.tabela.sincronizar(self.carrinho, produto_id)
+
+    def test_novo_produto_inclui_linha(self):
+        alterados = self._adicionar(1)
+        self._adicionar(2)
+
+        self.assertEqual(alterados, [self.tabela.controle])
+        self.assertEqual(len(self.tabela.controle.rows), 2)
+
+    def test_somar_quantidade_altera_so_os_textos_da_linha(self):
+        self._adicionar(1)
+        self._adicionar(2)
+        linhas = list(self.tabela.controle.rows)
+
+        alterados = self._adicionar(1, quantidade=2)
+
+        linha = self.tabela._linhas[1]
+        self.assertEqual(alterados, [linha.quantidade, linha.total])
+        self.assertEqual(linha.quantidade.value, "3.00")
+        self.assertEqual(self.tabela.controle.rows, linhas)
+        self.assertIs(self.tabela.controle.rows[0], linhas[0])
+
+    def test_sem_mudanca_nao_gera_atualizacao(self):
+        self._adicionar(1)
+        self.assertEqual(self.tabela.sincronizar(self.carrinho, 1), [])
+        self.assertEqual(self.tabela.sincronizar(self.carrinho, 99), [])
+
+    def test_remover_tira_apenas_a_linha(self):
+        self._adicionar(1)
+        self._adicionar(2)
+        self._adicionar(3)
+        restantes = [self.tabela.controle.rows[0], self.tabela.controle.rows[2]]
+
+        self.carrinho.remover(2)
+        alterados = self.tabela.sincronizar(self.carrinho, 2)
+
+        self.assertEqual(alterados, [self.tabela.controle])
+        self.assertEqual(self.tabela.controle.rows, restantes)
+        self.assertEqual(len(self.tabela), 2)
+
+    def test_recarregar_acompanha_carrinho_limpo(self):
+        self._adicionar(1)
+        self.carrinho.limpar()
+
+        self.tabela.recarregar(self.carrinho)
+
+        self.assertEqual(self.tabela.controle.rows, [])
+        self.assertEqual(len(self.tabela), 0)
+
+    def test_botoes_usam_o_produto_da_linha(self):
+        self._adicionar(5)
+        celulas = self.tabela.controle.rows[0].cells
+        menos, _, mais = celulas[1].content.controls
+
+        menos.on_click(None)
+        mais.on_click(None)
+        celulas[4].content.on_click(None)
+
+        self.ajustar.assert_any_call(5, -1)
+        self.ajustar.assert_any_call(5, 1)
+        self.remover.assert_called_once_with(5)
+
+
+class PDVTabelaIncrementalTests(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(carrinho_tabela.ft, "icons", ICONES, create=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        ctrl = object.__new__(PDVController)
+        ctrl.page = MagicMock()
+        ctrl._tela = LoteAtualizacoes(ctrl.page)
+        ctrl.carrinho = Carrinho()
+        ctrl.tabela_carrinho = TabelaCarrinho(
+            on_ajustar=ctrl.ajustar_quantidade, on_remover=ctrl.remover_item
+        )
+        ctrl.atualizar_resumo = MagicMock()
+        for produto_id in range(1, 51):
+            ctrl.carrinho.adicionar(produto_id, f"Produto {produto_id}", 2.0, 1)
+        ctrl.atualizar_tabela()
+        ctrl.page.update.reset_mock()
+        self.ctrl = ctrl
+
+    def test_ajuste_envia_so_os_textos_da_linha(self):
+        self.ctrl.ajustar_quantidade(25, 1)
+
+        linha = self.ctrl.tabela_carrinho._linhas[25]
+        self.ctrl.page.update.assert_called_once_with(linha.quantidade, linha.total)
+
+    def test_remocao_envia_a_tabela(self):
+        self.ctrl.remover_item(10)
+
+        self.ctrl.page.update.assert_called_once_with(self.ctrl.tabela_carrinho.controle)
+        self.assertEqual(len(self.ctrl.tabela_carrinho.controle.rows), 49)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+import flet as ft
+
+from tests.db_helpers import BancoTemporarioTestCase
+
+from APP.core.session import session
+from APP.core.tarefas import tarefas
+from APP.models import vendas_models
+from APP.ui import dashboard_ui
+
+
+@unittest.skipUnless(
+    hasattr(ft.icons, "CALENDAR_TODAY"), "versão do flet sem os ícones em ft.icons"
+)
+class ResumosDashboardTests(BancoTemporarioTestCase):
+    def setUp(self):
+        super().setUp()
+        session.login({"id": 1, "username": "admin", "nome": "Teste", "role": "admin"})
+        self.addCleanup(session.logout)
+
+    def tearDown(self):
+        tarefas.encerrar()
+        super().tearDown()
+
+    def test_consulta_com_erro_mostra_falha_no_card(self):
+        page = MagicMock()
+        with patch.object(
+            vendas_models, "total_vendas_periodo", side_effect=RuntimeError("banco fora")
+        ):
+            view = dashboard_ui.build_dashboard_view(page, MagicMock(), MagicMock())
+            tarefas.encerrar()
+
+        cards = view.controls[0].content.controls[5].controls
+        textos = [card.content.controls[1].value for card in cards]
+        self.assertEqual(textos[:2], ["Falha ao carregar.", "Falha ao carregar."])
+        self.assertEqual(textos[2:], ["0", "0"])
+
+
+if __name__ == "__main__":
+    unittest.main()
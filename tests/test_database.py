@@ -0,0 +1,146 @@
+import threading
+import unittest
+from unittest.mock import PropertyMock, patch
+
+from tests.db_helpers import BancoTemporarioTestCase
+
+from APP.core import database
+from APP.core.query_stats import fingerprint, stats
+
+
+class ConnectionManagerTests(BancoTemporarioTestCase):
+    def test_writer_usa_wal(self):
+        row = database.execute("PRAGMA journal_mode", fetchone=True)
+        self.assertEqual(row[0].lower(), "wal")
+
+    def test_leitores_sao_somente_leitura(self):
+        with self.assertRaises(Exception):
+            database.execute("INSERT INTO clientes (nome) VALUES ('x')")
+
+    def test_leitura_enxerga_commit_do_escritor(self):
+        cliente_id = database.execute(
+            "INSERT INTO clientes (nome) VALUES (?)", ("Maria",), commit=True
+        )
+        row = database.execute(
+            "SELECT nome FROM clientes WHERE id = ?", (cliente_id,), fetchone=True
+        )
+        self.assertEqual(row["nome"], "Maria")
+
+    def test_leitura_aberta_nao_bloqueia_escrita(self):
+        leitura_aberta = threading.Event()
+        liberar = threading.Event()
+
+        def leitor():
+            with database.db_cursor() as cursor:
+                cursor.execute("SELECT * FROM clientes")
+                cursor.fetchone()
+                leitura_aberta.set()
+                liberar.wait(5)
+
+        thread = threading.Thread(target=leitor)
+        thread.start()
+        leitura_aberta.wait(5)
+        try:
+            with database.transaction() as conn:
+                conn.execute("INSERT INTO clientes (nome) VALUES ('Durante leitura')")
+        finally:
+            liberar.set()
+            thread.join()
+        row = database.execute(
+            "SELECT COUNT(*) AS qtd FROM clientes WHERE nome = 'Durante leitura'",
+            fetchone=True,
+        )
+        self.assertEqual(row["qtd"], 1)
+
+    def test_pool_de_leitores_e_limitado(self):
+        manager = database.get_manager()
+        conexoes = [manager.acquire_reader() for _ in range(4)]
+        self.assertEqual(len({id(c) for c in conexoes}), 4)
+        manager.release_reader(conexoes[0])
+        self.assertIs(manager.acquire_reader(), conexoes[0])
+        for conn in conexoes:
+            manager.release_reader(conn)
+
+    def test_iterate_le_em_lotes_e_devolve_o_leitor(self):
+        with database.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO clientes (nome) VALUES (?)", [(f"C{i}",) for i in range(25)]
+            )
+        manager = database.get_manager()
+        livres = manager._readers.qsize()
+
+        linhas = database.iterate(
+            "SELECT nome FROM clientes WHERE nome GLOB 'C[0-9]*' ORDER BY id", lote=10
+        )
+        primeira = next(linhas)
+        self.assertEqual(primeira["nome"], "C0")
+        self.assertEqual(sum(1 for _ in linhas), 24)
+        self.assertEqual(manager._readers.qsize(), max(livres, 1))
+
+        interrompida = database.iterate("SELECT nome FROM clientes", lote=10)
+        next(interrompida)
+        interrompida.close()
+        self.assertEqual(manager._readers.qsize(), max(livres, 1))
+
+    def test_transacao_desfaz_em_erro(self):
+        with self.assertRaises(RuntimeError):
+            with database.transaction() as conn:
+                conn.execute("INSERT INTO clientes (nome) VALUES ('Rollback')")
+                raise RuntimeError("falha")
+        row = database.execute(
+            "SELECT COUNT(*) AS qtd FROM clientes WHERE nome = 'Rollback'",
+            fetchone=True,
+        )
+        self.assertEqual(row["qtd"], 0)
+
+
+class QueryStatsTests(BancoTemporarioTestCase):
+    def setUp(self):
+        super().setUp()
+        stats.reset()
+
+    def test_fingerprint_ignora_literais_e_espacos(self):
+        self.assertEqual(
+            fingerprint("SELECT *  FROM t\n WHERE id = 10 AND nome = 'x'"),
+            fingerprint("select * from t where id = 25 and nome = 'outro'"),
+        )
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (?, ?, ?)"),
+            fingerprint("SELECT * FROM t WHERE id IN (?,?)"),
+        )
+
+    def test_execute_registra_contagem_e_percentis(self):
+        for nome in ("a", "b", "c"):
+            database.execute("SELECT * FROM clientes WHERE nome = ?", (nome,), fetchall=True)
+        resumo = next(
+            r for r in stats.snapshot() if r["fingerprint"].startswith("select * from clientes")
+        )
+        self.assertEqual(resumo["count"], 3)
+        self.assertLessEqual(resumo["p50_ms"], resumo["p99_ms"])
+        self.assertLessEqual(resumo["p99_ms"], resumo["max_ms"])
+
+    def test_transacao_registra_os_comandos(self):
+        with database.transaction() as conn:
+            conn.execute("INSERT INTO clientes (nome) VALUES (?)", ("a",))
+            cursor = conn.cursor()
+            cursor.executemany("INSERT INTO clientes (nome) VALUES (?)", [("b",), ("c",)])
+            self.assertEqual(cursor.rowcount, 2)
+            ids = [row["id"] for row in conn.execute("SELECT id FROM clientes WHERE nome = 'a'")]
+        contagem = {r["fingerprint"]: r["count"] for r in stats.snapshot()}
+        self.assertEqual(contagem["insert into clientes (nome) values (?)"], 2)
+        self.assertIn("select id from clientes where nome = ?", contagem)
+        self.assertEqual(len(ids), 1)
+
+    def test_consulta_lenta_vai_para_o_log_com_plano(self):
+        with patch.object(type(stats), "slow_query_ms", new_callable=PropertyMock) as limite:
+            limite.return_value = 0
+            with self.assertLogs("sistema_logger", level="WARNING") as logs:
+                database.execute(
+                    "SELECT * FROM clientes WHERE nome = ?", ("x",), fetchall=True
+                )
+        self.assertIn("Consulta lenta", logs.output[0])
+        self.assertIn("clientes", logs.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,204 @@
+"""Garante que as consultas dos caminhos quentes usam índice em bancos grandes."""
+
+import random
+import unittest
+from contextlib import contextmanager
+from datetime import datetime
+from unittest.mock import patch
+
+from tests.db_helpers import BancoTemporarioTestCase
+
+from APP.core import database
+from APP.core.utils import intervalo_dias, normalizar_busca
+from APP.models import caixa_models, produtos_models, resumos_models, vendas_models
+
+PRODUTOS = 3000
+VENDAS = 6000
+CAIXAS = 200
+BASE_TS = int(datetime(2024, 1, 1).timestamp())
+DIA = intervalo_dias("2024-01-10")
+
+
+def _popular(conn):
+    rnd = random.Random(42)
+    conn.executemany(
+        "INSERT INTO produtos (nome, busca, preco_venda, estoque, estoque_minimo, codigo_barras) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (f"Produto {i}", normalizar_busca(f"Produto {i}"), rnd.uniform(1, 50), 100, 5, f"789{i:010d}")
+            for i in range(PRODUTOS)
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO caixas (codigo, usuario_id, aberto_em, aberto_ts, status) "
+        "VALUES (?, 1, ?, ?, ?)",
+        [
+            (f"CX-{i}", f"2024-01-{1 + i % 28:02d}T08:00:00", BASE_TS + i * 3600, "fechado")
+            for i in range(CAIXAS)
+        ],
+    )
+    vendas, itens, pagamentos, movimentos = [], [], [], []
+    for venda_id in range(1, VENDAS + 1):
+        ts = BASE_TS + venda_id * 400
+        criado = datetime.fromtimestamp(ts).isoformat()
+        vendas.append((venda_id, f"V-{venda_id}", criado, ts))
+        for _ in range(3):
+            itens.append((venda_id, rnd.randint(1, PRODUTOS), 1, 10, 10))
+        pagamentos.append((venda_id, "Dinheiro", 30, criado, ts))
+        movimentos.append((1 + venda_id % CAIXAS, "venda", 30, venda_id, criado, ts))
+        movimentos.append((1 + venda_id % CAIXAS, "saida_caixa", -5, None, criado, ts))
+    conn.executemany(
+        "INSERT INTO vendas (id, codigo, usuario_id, total_liquido, criado_em, criado_ts) "
+        "VALUES (?, ?, 1, 30, ?, ?)",
+        vendas,
+    )
+    conn.executemany(
+        "INSERT INTO venda_itens (venda_id, produto_id, quantidade, preco_unitario, total_item) "
+        "VALUES (?, ?, ?, ?, ?)",
+        itens,
+    )
+    conn.executemany(
+        "INSERT INTO pagamentos (venda_id, forma_pagamento, valor, criado_em, criado_ts) "
+        "VALUES (?, ?, ?, ?, ?)",
+        pagamentos,
+    )
+    conn.executemany(
+        "INSERT INTO caixa_movimentos "
+        "(caixa_id, tipo, valor, referencia_venda_id, criado_em, criado_ts) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        movimentos,
+    )
+    conn.execute("ANALYZE")
+
+
+class IndicesCaminhosQuentesTests(BancoTemporarioTestCase):
+    def setUp(self):
+        super().setUp()
+        with database.transaction() as conn:
+            _popular(conn)
+
+    @contextmanager
+    def _capturar(self, *modulos):
+        capturadas = []
+        real = database.execute
+
+        def gravar(query, params=None, **kwargs):
+            capturadas.append((query, params or ()))
+            return real(query, params, **kwargs)
+
+        patches = [patch.object(m, "execute", side_effect=gravar) for m in modulos]
+        for p in patches:
+            p.start()
+        try:
+            yield capturadas
+        finally:
+            for p in patches:
+                p.stop()
+
+    def _assert_usa_indice(self, chamada, tabelas):
+        resumos_models.relatorios_cache.limpar()
+        with self._capturar(caixa_models, produtos_models, resumos_models, vendas_models) as capturadas:
+            chamada()
+        self.assertTrue(capturadas)
+        conn = database.get_connection()
+        for query, params in capturadas:
+            plano = [
+                row[3]
+                for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+            ]
+            for linha in plano:
+                partes = linha.split()
+                if partes[:1] == ["SCAN"] and partes[1] in tabelas:
+                    self.fail(f"Varredura completa em {partes[1]}: {plano}\n{query}")
+            self.assertTrue(
+                any("INDEX" in linha or "PRIMARY KEY" in linha for linha in plano),
+                f"Nenhum índice usado: {plano}\n{query}",
+            )
+
+    def test_saidas_e_perdas_por_periodo(self):
+        inicio, fim = DIA
+        for chamada in (
+            lambda: caixa_models.total_saidas_periodo(inicio, fim),
+            lambda: caixa_models.saidas_por_periodo(inicio, fim),
+            lambda: caixa_models.total_perdas_periodo(inicio, fim),
+            lambda: caixa_models.perdas_por_periodo(inicio, fim),
+        ):
+            self._assert_usa_indice(chamada, {"caixa_movimentos", "m"})
+
+    def test_total_por_forma(self):
+        self._assert_usa_indice(
+            lambda: caixa_models.total_por_forma(7), {"caixa_movimentos"}
+        )
+
+    def test_itens_e_pagamentos_da_venda(self):
+        self._assert_usa_indice(
+            lambda: vendas_models.itens_da_venda(1234), {"venda_itens", "vi", "p"}
+        )
+        self._assert_usa_indice(
+            lambda: vendas_models.pagamentos_por_periodo(*DIA),
+            {"pagamentos", "p", "vendas", "v", "resumo_vendas_dia", "resumo_vendas_hora"},
+        )
+
+    def test_busca_por_codigo_no_banco(self):
+        # buscar_por_codigo responde pelo catálogo em memória; o índice atende
+        # a carga inicial por código e a restrição de unicidade.
+        plano = [
+            row[3]
+            for row in database.get_connection().execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM produtos WHERE codigo_barras = ?",
+                ("7890000001234",),
+            )
+        ]
+        self.assertIn("idx_produtos_codigo", " ".join(plano))
+
+    def test_sugestoes_sem_fts_usam_chave_de_busca(self):
+        produtos_models.catalogo.versao()  # carga do catálogo fora da medição
+        with patch.object(produtos_models, "fts_disponivel", return_value=False):
+            self._assert_usa_indice(
+                lambda: produtos_models.buscar_sugestoes("PRODUTÓ 1"), {"produtos"}
+            )
+
+    def test_caixa_aberto(self):
+        self._assert_usa_indice(lambda: caixa_models.caixa_aberto(1), {"caixas"})
+
+    def test_consultas_por_periodo_de_vendas_e_caixas(self):
+        for chamada in (
+            lambda: vendas_models.total_vendas_periodo(*DIA),
+            lambda: vendas_models.quantidade_vendas_periodo(*DIA),
+            lambda: vendas_models.total_descontos_periodo(*DIA),
+            lambda: vendas_models.vendas_por_periodo(*DIA),
+        ):
+            self._assert_usa_indice(
+                chamada, {"vendas", "v", "resumo_vendas_dia", "resumo_vendas_hora"}
+            )
+        self._assert_usa_indice(
+            lambda: vendas_models.produtos_mais_vendidos(*DIA), {"vendas", "v", "d"}
+        )
+        self._assert_usa_indice(
+            lambda: caixa_models.relatorio_caixas(*DIA), {"caixas", "c", "m"}
+        )
+
+    def test_mais_vendidos_do_dia_le_o_ranking_pelo_indice(self):
+        resumos_models.reconstruir()
+        conn = database.get_connection()
+        plano = " / ".join(
+            row[3]
+            for row in conn.execute(
+                f"EXPLAIN QUERY PLAN {vendas_models._SQL_TOP_DIA}", (DIA[0], 5)
+            )
+        )
+        self.assertIn("idx_produto_vendas_dia_ranking", plano)
+        self.assertNotIn("TEMP B-TREE", plano)
+        mais_vendidos = vendas_models.produtos_mais_vendidos(*DIA)
+        self.assertEqual(len(mais_vendidos), 5)
+
+    def test_codigo_de_barras_e_unico(self):
+        produtos_models.criar_produto("Único", 1, 1, 0, codigo_barras="ABC-1")
+        with self.assertRaises(database.sqlite3.IntegrityError):
+            produtos_models.criar_produto("Repetido", 1, 1, 0, codigo_barras="ABC-1")
+        produtos_models.criar_produto("Sem código 1", 1, 1, 0, codigo_barras="")
+        produtos_models.criar_produto("Sem código 2", 1, 1, 0, codigo_barras=None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import sqlite3
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from tests.db_helpers import BancoTemporarioTestCase
+
+from APP.core import database, migrations
+from APP.core.utils import intervalo_dias, para_epoch, peso_popularidade
+from APP.models import vendas_models
+
+
+class MigrationsTests(BancoTemporarioTestCase):
+    def test_banco_novo_fica_na_ultima_versao(self):
+        conn = database.get_connection()
+        self.assertEqual(migrations.current_version(conn), migrations.LATEST_VERSION)
+
+    def test_banco_atual_nao_executa_migracoes(self):
+        conn = database.get_connection()
+        aplicadas = []
+        falsas = [
+            (numero, descricao, lambda c, n=numero: aplicadas.append(n))
+            for numero, descricao, _ in migrations.MIGRATIONS
+        ]
+        with patch.object(migrations, "MIGRATIONS", falsas):
+            migrations.migrate(conn)
+        self.assertEqual(aplicadas, [])
+
+    def test_migracoes_sao_idempotentes_em_banco_legado(self):
+        conn = database.get_connection()
+        conn.execute("PRAGMA user_version = 0")
+        migrations.migrate(conn)
+        row = database.execute(
+            "SELECT COUNT(*) AS qtd FROM usuarios WHERE username = 'admin'",
+            fetchone=True,
+        )
+        self.assertEqual(row["qtd"], 1)
+        self.assertEqual(migrations.current_version(conn), migrations.LATEST_VERSION)
+
+    def test_falha_desfaz_todas_as_migracoes(self):
+        conn = database.get_connection()
+        conn.execute("PRAGMA user_version = 0")
+
+        def quebrar(c: sqlite3.Connection) -> None:
+            c.execute("CREATE TABLE tabela_parcial (id INTEGER)")
+            raise RuntimeError("falha")
+
+        with patch.object(
+            migrations, "MIGRATIONS", migrations.MIGRATIONS + [(999, "quebrada", quebrar)]
+        ), patch.object(migrations, "LATEST_VERSION", 999):
+            with self.assertRaises(RuntimeError):
+                migrations.migrate(conn)
+
+        self.assertEqual(migrations.current_version(conn), 0)
+        existe = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'tabela_parcial'"
+        ).fetchone()
+        self.assertIsNone(existe)
+
+
+class EpochBackfillTests(BancoTemporarioTestCase):
+    def test_backfill_converte_texto_local_e_utc(self):
+        conn = database.get_connection()
+        conn.execute(
+            "INSERT INTO caixas (codigo, usuario_id, aberto_em) VALUES ('CX', 1, ?)",
+            ("2024-03-05 12:00:00",),
+        )
+        caixa_id = conn.execute("SELECT id FROM caixas").fetchone()[0]
+        conn.execute(
+            "INSERT INTO caixa_movimentos (caixa_id, tipo, valor, criado_em) "
+            "VALUES (?, 'venda', 10, ?)",
+            (caixa_id, "2024-03-05T09:30:00.123456"),
+        )
+        conn.execute("PRAGMA user_version = 3")
+        conn.commit()
+        migrations.migrate(conn)
+
+        aberto_ts = conn.execute("SELECT aberto_ts FROM caixas").fetchone()[0]
+        criado_ts = conn.execute("SELECT criado_ts FROM caixa_movimentos").fetchone()[0]
+        utc = datetime(2024, 3, 5, 12, 0, tzinfo=timezone.utc)
+        self.assertEqual(aberto_ts, int(utc.timestamp()))
+        self.assertEqual(criado_ts, para_epoch("2024-03-05T09:30:00"))
+
+    def test_periodo_semiaberto_respeita_virada_do_dia(self):
+        conn = database.get_connection()
+        inicio, fim = intervalo_dias("2024-03-05")
+        for codigo, ts in (("A", inicio - 1), ("B", inicio), ("C", fim - 1), ("D", fim)):
+            conn.execute(
+                "INSERT INTO vendas (codigo, usuario_id, total_liquido, criado_ts) "
+                "VALUES (?, 1, 1, ?)",
+                (codigo, ts),
+            )
+        conn.commit()
+        self.assertEqual(vendas_models.quantidade_vendas_periodo(inicio, fim), 2)
+        self.assertEqual(vendas_models.total_vendas_periodo(inicio, fim), 2.0)
+
+
+class ContadoresBackfillTests(BancoTemporarioTestCase):
+    def test_backfill_a_partir_de_venda_itens(self):
+        conn = database.get_connection()
+        produto_id = conn.execute(
+            "INSERT INTO produtos (nome, preco_venda) VALUES ('Sal', 2)"
+        ).lastrowid
+        dia1, _ = intervalo_dias("2024-03-05")
+        dia2, _ = intervalo_dias("2024-03-06")
+        for venda_id, ts, quantidade in ((1, dia1 + 60, 2), (2, dia1 + 120, 1), (3, dia2 + 60, 4)):
+            conn.execute(
+                "INSERT INTO vendas (id, codigo, usuario_id, total_liquido, criado_ts) "
+                "VALUES (?, ?, 1, 0, ?)",
+                (venda_id, f"V{venda_id}", ts),
+            )
+            conn.execute(
+                "INSERT INTO venda_itens (venda_id, produto_id, quantidade, preco_unitario, total_item) "
+                "VALUES (?, ?, ?, 2, 0)",
+                (venda_id, produto_id, quantidade),
+            )
+        conn.execute("PRAGMA user_version = 7")
+        conn.commit()
+        migrations.migrate(conn)
+
+        dias = conn.execute(
+            "SELECT dia, quantidade, vendas FROM produto_vendas_dia ORDER BY dia"
+        ).fetchall()
+        self.assertEqual([tuple(r) for r in dias], [(dia1, 3, 2), (dia2, 4, 1)])
+        popularidade = conn.execute("SELECT * FROM produto_popularidade").fetchone()
+        self.assertEqual((popularidade["quantidade"], popularidade["vendas"]), (7, 3))
+        self.assertEqual(popularidade["ultima_venda_ts"], dia2 + 60)
+        esperado = sum(
+            q * peso_popularidade(ts) for ts, q in ((dia1 + 60, 2), (dia1 + 120, 1), (dia2 + 60, 4))
+        )
+        self.assertAlmostEqual(popularidade["score"], esperado)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,6 +9,10 @@ PROJECT_DIR = os.path.join(ROOT_DIR, "meu_sistema_pdv")
 if PROJECT_DIR not in sys.path:
     sys.path.insert(0, PROJECT_DIR)
 
+from APP.models import produtos_models
+from APP.ui.atualizacoes import LoteAtualizacoes
+from APP.ui.scanner import DetectorLeitor
+from APP.ui.sugestoes import PedidoSugestao
 from APP.ui.vendas_ui import PDVController
 
 
@@ -20,6 +24,8 @@ class DummyEvent:
 class PDVAtalhoBuscaTests(unittest.TestCase):
     def _build_controller(self):
         ctrl = object.__new__(PDVController)
+        ctrl.page = MagicMock()
+        ctrl._tela = LoteAtualizacoes(ctrl.page)
         ctrl.mover_sugestao = MagicMock()
         ctrl._confirmar_entrada = MagicMock()
         ctrl.ocultar_sugestoes = MagicMock()
@@ -28,7 +34,6 @@ class PDVAtalhoBuscaTests(unittest.TestCase):
     def test_on_change_skip_when_text_unchanged(self):
         ctrl = self._build_controller()
         ctrl.sugestoes_container = SimpleNamespace(visible=False)
-        ctrl.page = MagicMock()
         ctrl.busca_field = SimpleNamespace(value="cafe")
         ctrl._ultimo_texto_busca = "cafe"
 
@@ -37,6 +42,31 @@ class PDVAtalhoBuscaTests(unittest.TestCase):
 
         buscar.assert_not_called()
 
+    def test_on_change_delegates_lookup_to_worker(self):
+        ctrl = self._build_controller()
+        ctrl.busca_field = SimpleNamespace(value=" arroz ")
+        ctrl._ultimo_texto_busca = "arro"
+        ctrl._buscador = MagicMock()
+        ctrl._leitor = DetectorLeitor()
+
+        with patch("APP.ui.vendas_ui.produtos_models.buscar_sugestoes") as buscar:
+            ctrl.atualizar_sugestoes()
+
+        buscar.assert_not_called()
+        ctrl._buscador.solicitar.assert_called_once_with("arroz")
+        self.assertEqual(ctrl._ultimo_texto_busca, "arroz")
+
+    def test_stale_suggestions_are_not_rendered(self):
+        ctrl = self._build_controller()
+        ctrl._buscador = MagicMock()
+        ctrl.painel_sugestoes = MagicMock()
+        ctrl._ultimo_texto_busca = "arroz"
+
+        ctrl._receber_sugestoes(PedidoSugestao(1, "arr"), [{"nome": "Arroz"}])
+
+        ctrl.painel_sugestoes.mostrar.assert_not_called()
+        ctrl.page.update.assert_not_called()
+
     def test_arrow_down_moves_to_next_suggestion(self):
         ctrl = self._build_controller()
 
@@ -83,9 +113,73 @@ class PDVAtalhoBuscaTests(unittest.TestCase):
         ctrl.ocultar_sugestoes.assert_not_called()
 
 
+class PDVLeitorCodigoBarrasTests(unittest.TestCase):
+    def _build_controller(self):
+        ctrl = object.__new__(PDVController)
+        ctrl.page = MagicMock()
+        ctrl._tela = LoteAtualizacoes(ctrl.page)
+        ctrl.sugestoes_container = SimpleNamespace(visible=False)
+        ctrl.sugestoes_dados = []
+        ctrl._ultimo_texto_busca = ""
+        ctrl._buscador = MagicMock()
+        ctrl._leitor = DetectorLeitor(intervalo_max_ms=10_000)
+        ctrl._adicionar_ao_carrinho = MagicMock()
+        ctrl.adicionar_item = MagicMock()
+        return ctrl
+
+    def _escanear(self, ctrl, codigo):
+        for fim in range(1, len(codigo) + 1):
+            ctrl.busca_field = SimpleNamespace(value=codigo[:fim])
+            ctrl.atualizar_sugestoes()
+
+    def test_scan_skips_suggestions_and_adds_by_exact_code(self):
+        ctrl = self._build_controller()
+        produto = {"id": 1, "nome": "Café", "codigo_barras": "7891000100103"}
+
+        with patch(
+            "APP.ui.vendas_ui.produtos_models.ler_codigo",
+            return_value=produtos_models.LeituraCodigo(produto),
+        ) as por_codigo, patch(
+            "APP.ui.vendas_ui.produtos_models.buscar_por_nome"
+        ) as por_nome:
+            self._escanear(ctrl, "7891000100103")
+            ctrl._confirmar_entrada()
+
+        ctrl._buscador.solicitar.assert_not_called()
+        ctrl.page.update.assert_not_called()
+        por_codigo.assert_called_once_with("7891000100103")
+        por_nome.assert_not_called()
+        ctrl._adicionar_ao_carrinho.assert_called_once_with(produto, None)
+        ctrl.adicionar_item.assert_not_called()
+
+    def test_scale_label_feeds_quantity_into_cart(self):
+        ctrl = self._build_controller()
+        produto = {"id": 7, "nome": "Picanha kg", "codigo_barras": "1234"}
+        leitura = produtos_models.LeituraCodigo(produto, 0.512)
+
+        with patch("APP.ui.vendas_ui.produtos_models.ler_codigo", return_value=leitura):
+            self._escanear(ctrl, "2012340020437")
+            ctrl._confirmar_entrada()
+
+        ctrl._adicionar_ao_carrinho.assert_called_once_with(produto, 0.512)
+
+    def test_unknown_scanned_code_falls_back_to_normal_entry(self):
+        ctrl = self._build_controller()
+
+        with patch(
+            "APP.ui.vendas_ui.produtos_models.ler_codigo", return_value=None
+        ):
+            self._escanear(ctrl, "7891000100103")
+            ctrl._confirmar_entrada()
+
+        ctrl._adicionar_ao_carrinho.assert_not_called()
+        ctrl.adicionar_item.assert_called_once_with()
+
+
 class PDVSugestaoSelecionadaTests(unittest.TestCase):
     def test_selecionar_sugestao_adiciona_item(self):
         ctrl = object.__new__(PDVController)
+        ctrl._tela = LoteAtualizacoes(MagicMock())
         ctrl.busca_field = SimpleNamespace(value="")
         ctrl.ocultar_sugestoes = MagicMock()
         ctrl.adicionar_item = MagicMock()
@@ -0,0 +1,334 @@
+import sqlite3
+import unittest
+from unittest.mock import patch
+
+from tests.db_helpers import BancoTemporarioTestCase
+
+from APP.core import config
+from APP.models import clientes_models, produtos_models, vendas_models
+
+
+class CatalogoCacheTests(BancoTemporarioTestCase):
+    def setUp(self):
+        super().setUp()
+        self.arroz = produtos_models.criar_produto(
+            "Arroz", 20.0, 10, 1, codigo_barras="789001"
+        )
+        produtos_models.buscar_por_codigo("aquecer")
+
+    def test_busca_por_codigo_nao_vai_ao_banco(self):
+        with patch.object(produtos_models, "execute") as execute:
+            produto = produtos_models.buscar_por_codigo("789001")
+        execute.assert_not_called()
+        self.assertEqual(produto["id"], self.arroz)
+
+    def test_escritas_do_processo_atualizam_o_cache(self):
+        feijao = produtos_models.criar_produto("Feijão", 8.0, 5, 1, codigo_barras="789002")
+        self.assertEqual(produtos_models.buscar_por_codigo("789002")["id"], feijao)
+
+        produtos_models.atualizar_produto(
+            feijao,
+            nome="Feijão Preto",
+            preco_venda=9.0,
+            estoque=5,
+            estoque_minimo=1,
+            codigo_barras="789003",
+            categoria=None,
+            data_validade=None,
+            lote=None,
+        )
+        self.assertIsNone(produtos_models.buscar_por_codigo("789002"))
+        self.assertEqual(produtos_models.buscar_por_codigo("789003")["nome"], "Feijão Preto")
+
+        produtos_models.excluir_produto(feijao)
+        self.assertIsNone(produtos_models.buscar_por_codigo("789003"))
+
+    def test_leitura_devolve_copia_do_cache(self):
+        produto = produtos_models.buscar_por_codigo("789001")
+        produto["preco_venda"] = 0.0
+        self.assertEqual(produtos_models.catalogo.por_id(self.arroz)["preco_venda"], 20.0)
+
+    def test_transacao_desfeita_nao_chega_ao_cache(self):
+        ler = produtos_models.catalogo.ler_escrita
+
+        def ler_e_falhar(*args):
+            ler(*args)
+            raise sqlite3.OperationalError("disk I/O error")
+
+        with patch.object(produtos_models.catalogo, "ler_escrita", side_effect=ler_e_falhar):
+            with self.assertRaises(sqlite3.OperationalError):
+                produtos_models.criar_produto("Fantasma", 1.0, 1, 1, codigo_barras="789999")
+        self.assertIsNone(produtos_models.buscar_por_codigo("789999"))
+        self.assertIsNone(produtos_models.obter_produto(self.arroz + 1))
+
+    def test_baixa_de_estoque_reflete_no_cache(self):
+        produtos_models.atualizar_estoque(self.arroz, 5)
+        vendas_models.registrar_venda(
+            [{"produto_id": self.arroz, "quantidade": 3, "preco_unitario": 20.0}],
+            usuario_id=1,
+            cliente_id=None,
+            desconto_valor=0,
+        )
+        self.assertEqual(produtos_models.buscar_por_codigo("789001")["estoque"], 12)
+
+    def test_alteracao_de_outro_processo_e_detectada(self):
+        externo = sqlite3.connect(config.get_config().database_path)
+        with externo:
+            externo.execute(
+                "UPDATE produtos SET preco_venda = 22.5 WHERE id = ?", (self.arroz,)
+            )
+        externo.close()
+
+        self.assertEqual(produtos_models.buscar_por_codigo("789001")["preco_venda"], 20.0)
+        produtos_models.catalogo._verificado_em = 0.0
+        self.assertEqual(produtos_models.buscar_por_codigo("789001")["preco_venda"], 22.5)
+
+
+class BuscaTextualTests(BancoTemporarioTestCase):
+    def setUp(self):
+        super().setUp()
+        for nome, codigo, categoria in (
+            ("Café Torrado 500g", "7891000000001", "Mercearia"),
+            ("Bolo de Café", None, "Padaria"),
+            ("Coca Cola 600ml", "7894900011517", "Bebida"),
+            ("Coxinha de Frango", None, "Padaria"),
+        ):
+            produtos_models.criar_produto(
+                nome, 5.0, 10, 1, codigo_barras=codigo, categoria=categoria
+            )
+
+    def _nomes(self, produtos):
+        return [p["nome"] for p in produtos]
+
+    def test_fts_criado_pela_migracao(self):
+        self.assertTrue(produtos_models.fts_disponivel())
+
+    def test_prefixo_de_varios_termos(self):
+        self.assertEqual(
+            self._nomes(produtos_models.buscar_sugestoes("cox fra")), ["Coxinha de Frango"]
+        )
+
+    def test_prefixo_do_codigo_de_barras(self):
+        self.assertEqual(
+            self._nomes(produtos_models.buscar_sugestoes("789490")), ["Coca Cola 600ml"]
+        )
+
+    def test_relevancia_prioriza_o_nome(self):
+        produtos_models.criar_produto("Pão Francês", 1.0, 10, 1, categoria="Padaria")
+        resultado = self._nomes(produtos_models.buscar_sugestoes("pada"))
+        self.assertEqual(set(resultado), {"Bolo de Café", "Coxinha de Frango", "Pão Francês"})
+        produtos_models.criar_produto("Padaria Mista", 1.0, 10, 1)
+        self.assertEqual(
+            produtos_models.buscar_sugestoes("pada")[0]["nome"], "Padaria Mista"
+        )
+
+    def test_triggers_mantem_indice_sincronizado(self):
+        coxinha = produtos_models.buscar_por_nome("coxinha")
+        produtos_models.atualizar_produto(
+            coxinha["id"],
+            nome="Empada de Frango",
+            preco_venda=5.0,
+            estoque=10,
+            estoque_minimo=1,
+            codigo_barras=None,
+            categoria="Padaria",
+            data_validade=None,
+            lote=None,
+        )
+        self.assertIsNone(produtos_models.buscar_por_nome("coxinha"))
+        self.assertEqual(produtos_models.buscar_por_nome("empada")["id"], coxinha["id"])
+        produtos_models.excluir_produto(coxinha["id"])
+        self.assertEqual(produtos_models.listar_produtos("empada"), [])
+
+    def test_sem_fts_usa_like(self):
+        with patch.object(produtos_models, "fts_disponivel", return_value=False):
+            self.assertEqual(
+                self._nomes(produtos_models.listar_produtos("cola")), ["Coca Cola 600ml"]
+            )
+
+
+class BuscaSemAcentosTests(BancoTemporarioTestCase):
+    def setUp(self):
+        super().setUp()
+        for nome in ("CAFÉ PILÃO 250G", "Pão de Açúcar", "Pao Frances", "Bolo de Café"):
+            produtos_models.criar_produto(nome, 5.0, 10, 1)
+
+    def _nomes(self, produtos):
+        return sorted(p["nome"] for p in produtos)
+
+    def test_chave_gravada_no_cadastro(self):
+        produto_id = produtos_models.buscar_por_nome("pilao")["id"]
+        self.assertEqual(produtos_models.obter_produto(produto_id)["busca"], "cafe pilao 250g")
+
+    def test_termo_normalizado_com_e_sem_fts(self):
+        for fts in (True, False):
+            with self.subTest(fts=fts), patch.object(
+                produtos_models, "fts_disponivel", return_value=fts
+            ):
+                self.assertEqual(
+                    self._nomes(produtos_models.listar_produtos("cafe")),
+                    ["Bolo de Café", "CAFÉ PILÃO 250G"],
+                )
+                self.assertEqual(
+                    self._nomes(produtos_models.buscar_sugestoes("PAO")),
+                    ["Pao Frances", "Pão de Açúcar"],
+                )
+                self.assertEqual(
+                    produtos_models.buscar_por_nome("acucar")["nome"], "Pão de Açúcar"
+                )
+
+    def test_sugestoes_sem_fts_priorizam_prefixo(self):
+        with patch.object(produtos_models, "fts_disponivel", return_value=False):
+            nomes = [p["nome"] for p in produtos_models.buscar_sugestoes("café")]
+        self.assertEqual(nomes, ["CAFÉ PILÃO 250G", "Bolo de Café"])
+
+    def test_clientes(self):
+        clientes_models.criar_cliente("José Conceição", "123.456.789-00", None, None, None)
+        self.assertEqual(len(clientes_models.listar_clientes("JOSE conceicao")), 1)
+        self.assertEqual(len(clientes_models.listar_clientes("456.789")), 1)
+
+
+class SugestoesCacheTests(BancoTemporarioTestCase):
+    def setUp(self):
+        super().setUp()
+        for nome in ("Arroz Tipo 1", "Arroz Integral", "Arruda", "Farofa de Arroz"):
+            produtos_models.criar_produto(nome, 5.0, 10, 1)
+        produtos_models.catalogo.versao()
+        produtos_models.fts_disponivel()
+
+    def _digitar(self, *termos):
+        consultas = []
+        real = produtos_models.execute
+
+        def contar(query, *args, **kwargs):
+            consultas.append(query)
+            return real(query, *args, **kwargs)
+
+        with patch.object(produtos_models, "execute", side_effect=contar):
+            resultados = [produtos_models.buscar_sugestoes(t) for t in termos]
+        return resultados, consultas
+
+    def test_termos_que_estendem_o_anterior_nao_consultam(self):
+        for fts in (True, False):
+            with self.subTest(fts=fts), patch.object(
+                produtos_models, "fts_disponivel", return_value=fts
+            ):
+                resultados, consultas = self._digitar("ar", "arr", "arro", "arroz")
+                self.assertEqual(len(consultas), 1 if fts else 2)
+                nomes = {p["nome"] for p in resultados[-1]}
+                self.assertEqual(
+                    nomes, {"Arroz Tipo 1", "Arroz Integral", "Farofa de Arroz"}
+                )
+                produtos_models.sugestoes_cache.limpar()
+                esperado = produtos_models.buscar_sugestoes("arroz")
+                self.assertEqual(
+                    [p["id"] for p in resultados[-1]], [p["id"] for p in esperado]
+                )
+
+    def test_escrita_de_produto_invalida(self):
+        self._digitar("arr")
+        produtos_models.criar_produto("Arroz Parboilizado", 5.0, 10, 1)
+        resultados, consultas = self._digitar("arroz")
+        self.assertTrue(consultas)
+        self.assertIn("Arroz Parboilizado", {p["nome"] for p in resultados[0]})
+
+    def test_lista_truncada_volta_ao_banco(self):
+        produtos_models.sugestoes_cache.candidatos = 2
+        try:
+            _, consultas = self._digitar("arr", "arroz")
+        finally:
+            produtos_models.sugestoes_cache.candidatos = 200
+        self.assertEqual(len(consultas), 2)
+
+    def test_mesmo_formato_com_e_sem_cache(self):
+        for fts in (True, False):
+            with self.subTest(fts=fts), patch.object(
+                produtos_models, "fts_disponivel", return_value=fts
+            ):
+                produtos_models.sugestoes_cache.limpar()
+                (do_banco, do_cache), consultas = self._digitar("arr", "arroz")
+                self.assertEqual(len(consultas), 1 if fts else 2)
+                self.assertEqual(set(do_cache[0]), set(do_banco[0]))
+                self.assertIn("popularidade", do_cache[0])
+
+                do_cache[0]["nome"] = "Alterado"
+                produto = produtos_models.catalogo.por_id(do_cache[0]["id"])
+                self.assertNotEqual(produto["nome"], "Alterado")
+
+    def test_estoque_vem_do_catalogo(self):
+        ((antes,),), _ = self._digitar("arruda")
+        produtos_models.atualizar_estoque(antes["id"], -3)
+        (depois,), consultas = self._digitar("arruda")
+        self.assertEqual(depois[0]["estoque"], 7)
+        self.assertFalse([q for q in consultas if "produtos_fts" in q])
+
+
+def _etiqueta(corpo):
+    return corpo + str(produtos_models.digito_verificador_ean(corpo))
+
+
+class EtiquetaBalancaTests(BancoTemporarioTestCase):
+    extra_config = {
+        "balanca": {
+            "layouts": [
+                {"padrao": "21PPPPPVVVVVC", "tipo": "peso", "decimais": 3},
+                {"padrao": "2PPPPXVVVVVVC", "tipo": "preco", "decimais": 2},
+            ]
+        }
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.picanha = produtos_models.criar_produto(
+            "Picanha kg", 80.0, 50, 1, codigo_barras="1234"
+        )
+        self.pao = produtos_models.criar_produto(
+            "Pão Francês kg", 15.0, 50, 1, codigo_barras="00055"
+        )
+
+    def test_digito_verificador(self):
+        self.assertEqual(produtos_models.digito_verificador_ean("789100010010"), 3)
+
+    def test_etiqueta_de_preco_vira_quantidade(self):
+        leitura = produtos_models.ler_codigo(_etiqueta("212340" + "004000"))
+        self.assertEqual(leitura.produto["id"], self.picanha)
+        self.assertAlmostEqual(leitura.quantidade, 0.5)
+        self.assertAlmostEqual(leitura.quantidade * leitura.produto["preco_venda"], 40.0)
+
+    def test_etiqueta_de_peso(self):
+        leitura = produtos_models.ler_codigo(_etiqueta("2100055" + "01250"))
+        self.assertEqual(leitura.produto["id"], self.pao)
+        self.assertAlmostEqual(leitura.quantidade, 1.25)
+        self.assertEqual(leitura.etiqueta.tipo, "peso")
+
+    def test_digito_verificador_errado_ou_plu_desconhecido(self):
+        codigo = _etiqueta("212340" + "004000")
+        errado = codigo[:-1] + str((int(codigo[-1]) + 1) % 10)
+        self.assertIsNone(produtos_models.ler_codigo(errado))
+        self.assertIsNone(produtos_models.ler_codigo(_etiqueta("299990" + "004000")))
+
+    def test_codigo_exato_tem_prioridade(self):
+        codigo = _etiqueta("212340" + "004000")
+        produto_id = produtos_models.criar_produto("Kit Churrasco", 40.0, 5, 1, codigo_barras=codigo)
+        leitura = produtos_models.ler_codigo(codigo)
+        self.assertEqual(leitura.produto["id"], produto_id)
+        self.assertIsNone(leitura.quantidade)
+
+    def test_indice_plu_acompanha_cadastro(self):
+        produtos_models.atualizar_produto(
+            self.picanha,
+            nome="Picanha kg",
+            preco_venda=80.0,
+            estoque=50,
+            estoque_minimo=1,
+            codigo_barras="4321",
+            categoria=None,
+            data_validade=None,
+            lote=None,
+        )
+        self.assertIsNone(produtos_models.catalogo.por_plu(1234))
+        self.assertEqual(produtos_models.catalogo.por_plu(4321)["id"], self.picanha)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+import re
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from tests.db_helpers import BancoTemporarioTestCase
+
+from APP.core import database
+from APP.core.tarefas import Cancelamento
+from APP.core.utils import hoje_intervalo
+from APP.models import caixa_models, relatorios_models
+from APP.ui import relatorio_pdf
+from APP.ui.relatorio_pdf import DocumentoPDF
+
+A4 = (595.0, 842.0)
+PAGINA_PDF = re.compile(rb"/Type\s*/Page\b")
+
+
+def _tela_falsa():
+    tela = MagicMock()
+    tela.stringWidth.side_effect = lambda texto, fonte, tamanho: len(texto) * 5
+    return tela
+
+
+def _textos(tela):
+    return [c.args[2] for c in tela.drawString.call_args_list]
+
+
+class DocumentoPDFTests(unittest.TestCase):
+    def test_quebra_pagina_com_cabecalho_numerado(self):
+        tela = _tela_falsa()
+        doc = DocumentoPDF(tela, "Relatório", A4)
+        for i in range(100):
+            doc.linha(f"linha {i}")
+
+        self.assertGreater(doc.paginas, 1)
+        self.assertEqual(tela.showPage.call_count, doc.paginas - 1)
+        self.assertTrue(all(c.args[1] >= DocumentoPDF.MARGEM for c in tela.drawString.call_args_list))
+        numeros = [c.args[2] for c in tela.drawRightString.call_args_list]
+        self.assertEqual(numeros, [f"Página {n}" for n in range(1, doc.paginas + 1)])
+        self.assertEqual(_textos(tela).count("Relatório"), doc.paginas)
+
+    def test_divide_em_arquivos_a_cada_limite_de_paginas(self):
+        telas = [_tela_falsa(), _tela_falsa()]
+        doc = DocumentoPDF(
+            telas[0], "Relatório", A4, proxima_tela=lambda: telas.pop(), paginas_por_arquivo=2
+        )
+        primeira = doc.tela
+        for i in range(100):
+            doc.linha(f"linha {i}")
+
+        self.assertEqual(doc.paginas, 3)
+        primeira.save.assert_called_once()
+        self.assertEqual(primeira.showPage.call_count, 1)
+        numeros = [c.args[2] for c in doc.tela.drawRightString.call_args_list]
+        self.assertEqual(numeros, ["Página 3"])
+
+    def test_linha_longa_e_cortada_na_margem(self):
+        tela = _tela_falsa()
+        doc = DocumentoPDF(tela, "Relatório", A4)
+        doc.linha("x" * 500, recuo=10)
+
+        texto = _textos(tela)[-1]
+        self.assertTrue(texto.endswith("..."))
+        self.assertLessEqual(len(texto) * 5, A4[0] - 2 * DocumentoPDF.MARGEM - 10)
+
+
+class EscreverRelatorioTests(BancoTemporarioTestCase):
+    def setUp(self):
+        super().setUp()
+        caixa_id = caixa_models.abrir_caixa(1, 100)
+        for i in range(120):
+            caixa_models.registrar_movimento(
+                caixa_id, tipo="perda", valor=-1.0, forma_pagamento="Dinheiro", descricao=f"P{i}"
+            )
+        self.resumo = relatorios_models.resumo_periodo(*hoje_intervalo())
+        self.livres = database.get_manager()._readers.qsize()
+
+    def test_movimentos_vem_do_cursor_em_varias_paginas(self):
+        tela = _tela_falsa()
+        doc = DocumentoPDF(tela, "Relatório", A4)
+        avisos = []
+        with patch.object(relatorio_pdf, "AVISO_A_CADA", 50):
+            ok = relatorio_pdf.escrever_relatorio(doc, self.resumo, progresso=avisos.append)
+
+        self.assertTrue(ok)
+        textos = _textos(tela)
+        self.assertIn("Perdas: R$ 120,00", textos)
+        self.assertEqual(sum(1 for t in textos if t.startswith("R$ 1,00 - P")), 120)
+        self.assertGreater(doc.paginas, 2)
+        self.assertEqual(avisos[-1], 1.0)
+        self.assertEqual(avisos[:2], [50 / 120, 100 / 120])
+        self.assertEqual(database.get_manager()._readers.qsize(), max(self.livres, 1))
+
+    def test_cancelamento_para_no_meio_e_devolve_o_leitor(self):
+        tela = _tela_falsa()
+        doc = DocumentoPDF(tela, "Relatório", A4)
+        token = Cancelamento()
+        with patch.object(relatorio_pdf, "AVISO_A_CADA", 10):
+            ok = relatorio_pdf.escrever_relatorio(
+                doc, self.resumo, token=token, progresso=lambda _f: token.cancelar()
+            )
+
+        self.assertFalse(ok)
+        self.assertEqual(sum(1 for t in _textos(tela) if t.startswith("R$ 1,00 - P")), 10)
+        self.assertEqual(database.get_manager()._readers.qsize(), max(self.livres, 1))
+        tela.save.assert_not_called()
+
+
+    def test_reportlab_grava_pdf_real_com_varias_paginas(self):
+        pytest.importorskip("reportlab")
+        destino = Path(self._tmp.name) / "relatorio.pdf"
+        datas = ("2024-01-01", "2024-01-01")
+
+        arquivos = relatorio_pdf.gerar_relatorio_pdf(destino, self.resumo, datas)
+        self.assertEqual(arquivos, [destino])
+        paginas = len(PAGINA_PDF.findall(destino.read_bytes()))
+        self.assertGreater(paginas, 2)
+
+        with patch.object(relatorio_pdf, "PAGINAS_POR_ARQUIVO", 2):
+            partes = relatorio_pdf.gerar_relatorio_pdf(destino, self.resumo, datas)
+        por_arquivo = [len(PAGINA_PDF.findall(p.read_bytes())) for p in partes]
+        self.assertEqual(partes[1], destino.with_name("relatorio_parte2.pdf"))
+        self.assertEqual(sum(por_arquivo), paginas)
+        self.assertTrue(all(0 < n <= 2 for n in por_arquivo))
+
+    def test_reportlab_cancelado_nao_deixa_arquivos(self):
+        pytest.importorskip("reportlab")
+        destino = Path(self._tmp.name) / "relatorio.pdf"
+        token = Cancelamento()
+        with patch.object(relatorio_pdf, "PAGINAS_POR_ARQUIVO", 1), patch.object(
+            relatorio_pdf, "AVISO_A_CADA", 100
+        ):
+            arquivos = relatorio_pdf.gerar_relatorio_pdf(
+                destino,
+                self.resumo,
+                ("a", "b"),
+                token=token,
+                progresso=lambda _f: token.cancelar(),
+            )
+
+        self.assertEqual(arquivos, [])
+        self.assertEqual(list(Path(self._tmp.name).glob("relatorio*.pdf")), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+import sqlite3
+import unittest
+from unittest.mock import patch
+
+from tests.db_helpers import BancoTemporarioTestCase
+
+from APP.core import config, database
+from APP.core.utils import agora_carimbo, hoje_intervalo, intervalo_dias
+from APP.models import (
+    caixa_models,
+    produtos_models,
+    relatorios_models,
+    resumos_models,
+    vendas_models,
+)
+
+
+class ResumoPeriodoTests(BancoTemporarioTestCase):
+    def setUp(self):
+        super().setUp()
+        self.arroz = produtos_models.criar_produto("Arroz", 20.0, 3, 5)
+        self.feijao = produtos_models.criar_produto("Feijão", 8.0, 100, 1)
+        caixa_id = caixa_models.abrir_caixa(1, 200)
+        for produto_id, nome, preco, quantidade, forma in (
+            (self.arroz, "Arroz", 20.0, 1, "PIX"),
+            (self.feijao, "Feijão", 8.0, 4, "Dinheiro"),
+        ):
+            vendas_models.finalizar_venda(
+                [
+                    {
+                        "produto_id": produto_id,
+                        "nome": nome,
+                        "quantidade": quantidade,
+                        "preco_unitario": preco,
+                    }
+                ],
+                usuario_id=1,
+                cliente_id=None,
+                desconto_valor=2,
+                pagamentos=[{"forma": forma, "valor": preco * quantidade - 2}],
+            )
+        for tipo, valor, descricao in (
+            ("saida_caixa", -15.0, "Troco"),
+            ("perda", -4.0, None),
+            ("perda", -6.0, "Quebra"),
+        ):
+            caixa_models.registrar_movimento(
+                caixa_id, tipo=tipo, valor=valor, forma_pagamento="Dinheiro", descricao=descricao
+            )
+
+    def test_resumo_confere_com_as_consultas_avulsas(self):
+        inicio, fim = hoje_intervalo()
+        resumo = relatorios_models.resumo_periodo(inicio, fim)
+
+        self.assertEqual(resumo.vendas.vendas, vendas_models.quantidade_vendas_periodo(inicio, fim))
+        self.assertAlmostEqual(resumo.vendas.total_liquido, 48.0)
+        self.assertAlmostEqual(resumo.vendas.descontos, 4.0)
+        self.assertEqual(resumo.vendas.pagamentos, (("Dinheiro", 30.0), ("PIX", 18.0)))
+        self.assertEqual(resumo.saidas_total, caixa_models.total_saidas_periodo(inicio, fim))
+        self.assertEqual(resumo.perdas_total, caixa_models.total_perdas_periodo(inicio, fim))
+        self.assertEqual(
+            list(resumo.perdas), [dict(r) for r in caixa_models.perdas_por_periodo(inicio, fim)]
+        )
+        self.assertEqual(
+            list(resumo.top_produtos),
+            [dict(r) for r in vendas_models.produtos_mais_vendidos(inicio, fim)],
+        )
+        self.assertEqual(
+            [p["nome"] for p in resumo.estoque_baixo],
+            [p["nome"] for p in produtos_models.produtos_estoque_baixo()],
+        )
+        self.assertEqual(resumo.estoque_baixo[0]["nome"], "Arroz")
+
+    def test_uma_leitura_por_assunto(self):
+        consultas = []
+        real = database.execute
+
+        def contar(query, params=None, **kwargs):
+            consultas.append(query)
+            return real(query, params, **kwargs)
+
+        inicio, fim = hoje_intervalo()
+        with patch.object(relatorios_models, "execute", side_effect=contar), patch.object(
+            vendas_models, "execute", side_effect=contar
+        ), patch.object(resumos_models, "execute", side_effect=contar):
+            relatorios_models.resumo_periodo(inicio, fim)
+
+        # Movimentos, produtos, mais vendidos (a sondagem de vendas não
+        # resumidas e o ranking do dia), o dia no resumo diário e as
+        # vendas/pagamentos ainda não resumidos (pelo índice parcial).
+        self.assertEqual(sum("caixa_movimentos" in q for q in consultas), 1)
+        self.assertEqual(sum("FROM produtos" in q for q in consultas), 1)
+        self.assertEqual(len(consultas), 7)
+
+    def test_repeticao_vem_do_cache_ate_a_proxima_venda(self):
+        inicio, fim = hoje_intervalo()
+        primeiro = relatorios_models.resumo_periodo(inicio, fim)
+        with patch.object(relatorios_models, "execute") as execute:
+            segundo = relatorios_models.resumo_periodo(inicio, fim)
+        execute.assert_not_called()
+        self.assertEqual(segundo, primeiro)
+
+        vendas_models.finalizar_venda(
+            [
+                {
+                    "produto_id": self.feijao,
+                    "nome": "Feijão",
+                    "quantidade": 1,
+                    "preco_unitario": 8.0,
+                }
+            ],
+            usuario_id=1,
+            cliente_id=None,
+            desconto_valor=0,
+        )
+        terceiro = relatorios_models.resumo_periodo(inicio, fim)
+        self.assertEqual(terceiro.vendas.vendas, primeiro.vendas.vendas + 1)
+        self.assertGreaterEqual(resumos_models.relatorios_cache.stats()["hits"], 1)
+
+    def test_periodo_passado_sobrevive_a_venda_de_hoje(self):
+        passado = intervalo_dias("2024-03-05")
+        relatorios_models.resumo_periodo(*passado)
+        caixa_models.registrar_movimento(
+            caixa_models.caixa_aberto()["id"], tipo="perda", valor=-1.0, forma_pagamento="Dinheiro"
+        )
+        with patch.object(relatorios_models, "execute", side_effect=database.execute) as execute:
+            relatorios_models.resumo_periodo(*passado)
+        # Só os alertas de produto, que valem até a próxima escrita, são relidos.
+        self.assertEqual(execute.call_count, 1)
+        self.assertIn("FROM produtos", execute.call_args[0][0])
+
+    def test_escrita_de_outro_terminal_invalida_o_cache(self):
+        inicio, fim = hoje_intervalo()
+        antes = relatorios_models.resumo_periodo(inicio, fim)
+        caixa_id = caixa_models.caixa_aberto()["id"]
+        agora_ts, agora = agora_carimbo()
+        # Outro processo: conexão própria, sem passar pelos models deste.
+        outro = sqlite3.connect(config.get_config().database_path)
+        with outro:
+            outro.execute(
+                "INSERT INTO caixa_movimentos (caixa_id, tipo, valor, forma_pagamento, "
+                "descricao, criado_em, criado_ts) VALUES (?, 'perda', -3.0, 'Dinheiro', "
+                "'Quebra', ?, ?)",
+                (caixa_id, agora, agora_ts),
+            )
+        outro.close()
+
+        with patch.dict(config.get_config().database, {"catalog_revalidate_s": 0}):
+            depois = relatorios_models.resumo_periodo(inicio, fim)
+        self.assertEqual(depois.perdas_total, antes.perdas_total + 3.0)
+
+    def test_estoque_ajustado_por_outro_terminal_derruba_os_alertas(self):
+        estoque_baixo, _validade = relatorios_models.alertas_produtos()
+        self.assertEqual([p["nome"] for p in estoque_baixo], ["Arroz"])
+        outro = sqlite3.connect(config.get_config().database_path)
+        with outro:
+            outro.execute("UPDATE produtos SET estoque = 50 WHERE id = ?", (self.arroz,))
+        outro.close()
+
+        with patch.dict(config.get_config().database, {"catalog_revalidate_s": 0}):
+            estoque_baixo, _validade = relatorios_models.alertas_produtos()
+        self.assertEqual(estoque_baixo, ())
+
+    def test_resultado_imutavel(self):
+        resumo = relatorios_models.resumo_periodo(*hoje_intervalo())
+        with self.assertRaises(AttributeError):
+            resumo.saidas_total = 0
+        with self.assertRaises(TypeError):
+            resumo.top_produtos[0]["nome"] = "Outro"
+        with self.assertRaises(TypeError):
+            resumo.perdas[0]["valor"] = 0
+        with self.assertRaises(TypeError):
+            resumo.estoque_baixo[0]["estoque"] = 99
+
+
+if __name__ == "__main__":
+    unittest.main()
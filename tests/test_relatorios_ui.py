@@ -0,0 +1,146 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import flet as ft
+
+from tests.db_helpers import BancoTemporarioTestCase
+
+from APP.core.tarefas import tarefas
+from APP.models import produtos_models, relatorios_models, vendas_models
+from APP.ui import relatorios_ui
+
+
+class CargaProgressivaTests(BancoTemporarioTestCase):
+    def setUp(self):
+        super().setUp()
+        produto_id = produtos_models.criar_produto("Leite", 5.0, 50, 1)
+        vendas_models.finalizar_venda(
+            [
+                {
+                    "produto_id": produto_id,
+                    "nome": "Leite",
+                    "quantidade": 2,
+                    "preco_unitario": 5.0,
+                }
+            ],
+            usuario_id=1,
+            cliente_id=None,
+            desconto_valor=0,
+        )
+        self.page = MagicMock()
+
+    def tearDown(self):
+        # Nada pode rodar depois que a configuração volta para o banco real.
+        tarefas.encerrar()
+        super().tearDown()
+
+    def test_cards_preenchem_e_resumo_fica_pronto_para_o_pdf(self):
+        tela = relatorios_ui.RelatoriosView(self.page)
+        tarefas.encerrar()
+
+        self.assertEqual(tela.qtd_text.value, "1")
+        self.assertEqual(tela.resumo.vendas.total_liquido, 10.0)
+        self.assertEqual(tela.resumo.top_produtos[0]["nome"], "Leite")
+
+    def test_troca_de_datas_descarta_a_carga_anterior(self):
+        liberar = threading.Event()
+        real = relatorios_models.parte_periodo
+
+        def lenta(parte, inicio, fim, **kwargs):
+            if tela.inicio.value == "2024-01-01":
+                liberar.wait(5)
+            return real(parte, inicio, fim, **kwargs)
+
+        with patch.object(relatorios_models, "parte_periodo", side_effect=lenta):
+            tela = relatorios_ui.RelatoriosView(self.page)
+            tarefas.encerrar()
+            tela.inicio.value = "2024-01-01"
+            tela.fim.value = "2024-01-01"
+            tela.carregar()
+            tela.inicio.value = tela.fim.value = ""
+            tela.carregar()
+            liberar.set()
+            tarefas.encerrar()
+
+        # A carga de 2024-01-01 (sem vendas) chegou depois, mas foi descartada.
+        self.assertEqual(tela.qtd_text.value, "1")
+        self.assertEqual(tela.resumo.vendas.vendas, 1)
+
+    def test_data_invalida_avisa_e_mantem_os_cards(self):
+        tela = relatorios_ui.RelatoriosView(self.page)
+        tarefas.encerrar()
+        for digitada in ("17/10/2026", "2026-10"):
+            tela.inicio.value = digitada
+            tela.carregar()
+            self.assertIn("Data inválida", self.page.snack_bar.content.value)
+            self.assertEqual(tela.qtd_text.value, "1")
+
+    def test_exportacao_roda_em_segundo_plano_com_progresso(self):
+        liberar = threading.Event()
+        enviados = []
+        recebidos = []
+
+        def gerar(destino, resumo, datas, *, token, progresso):
+            recebidos.append(resumo)
+            liberar.wait(5)
+            progresso(0.5)
+            return [destino]
+
+        tela = relatorios_ui.RelatoriosView(self.page)
+        tarefas.encerrar()
+        tela.view = MagicMock()
+        tela.exportar_btn = ft.OutlinedButton("Exportar PDF")
+        self.page.views = [tela.view]
+        self.page.update.side_effect = lambda *c: enviados.append(tela.progresso_pdf.value)
+        with patch.object(relatorios_ui.relatorio_pdf, "disponivel", return_value=True), patch.object(
+            relatorios_ui.relatorio_pdf, "gerar_relatorio_pdf", side_effect=gerar
+        ):
+            tela.exportar_pdf()
+            self.assertTrue(tela.progresso_pdf.visible)
+            self.assertTrue(tela.exportar_btn.disabled)
+            liberar.set()
+            tarefas.encerrar()
+
+        # O PDF sai do mesmo resumo que preencheu os cards, sem nova consulta.
+        self.assertIs(recebidos[0], tela.resumo)
+        self.assertIn(0.5, enviados)
+        self.assertFalse(tela.progresso_pdf.visible)
+        self.assertFalse(tela.exportar_btn.disabled)
+        self.assertIn("Relatório salvo", self.page.snack_bar.content.value)
+
+
+    def test_cancelar_exportacao_para_o_pdf_e_libera_a_tela(self):
+        comecou = threading.Event()
+        viu_cancelamento = threading.Event()
+
+        def gerar(destino, resumo, datas, *, token, progresso):
+            comecou.set()
+            limite = time.monotonic() + 5
+            while not token.cancelado and time.monotonic() < limite:
+                time.sleep(0.01)
+            if token.cancelado:
+                viu_cancelamento.set()
+            return []
+
+        tela = relatorios_ui.RelatoriosView(self.page)
+        tela.exportar_btn = ft.OutlinedButton("Exportar PDF")
+        with patch.object(relatorios_ui.relatorio_pdf, "disponivel", return_value=True), patch.object(
+            relatorios_ui.relatorio_pdf, "gerar_relatorio_pdf", side_effect=gerar
+        ):
+            tela.exportar_pdf()
+            self.assertTrue(tela.cancelar_pdf_btn.visible)
+            comecou.wait(5)
+            tela.cancelar_exportacao()
+            tarefas.encerrar()
+
+        self.assertTrue(viu_cancelamento.is_set())
+        self.assertFalse(tela.progresso_pdf.visible)
+        self.assertFalse(tela.cancelar_pdf_btn.visible)
+        self.assertFalse(tela.exportar_btn.disabled)
+        self.assertIn("cancelada", self.page.snack_bar.content.value)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from tests.db_helpers import BancoTemporarioTestCase
+
+from APP.core import database, migrations
+from APP.core.utils import intervalo_dias, para_epoch
+from APP.models import produtos_models, resumos_models, usuarios_models, vendas_models
+
+DIA1, FIM_DIA1 = intervalo_dias("2024-03-05")
+DIA2, _ = intervalo_dias("2024-03-06")
+
+
+def _bruto(inicio, fim):
+    """Mesmos totais calculados direto das vendas, para comparação."""
+    conn = database.get_connection()
+    vendas = conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM(total_bruto), 0), COALESCE(SUM(desconto_percentual), 0), "
+        "COALESCE(SUM(total_liquido), 0) FROM vendas WHERE criado_ts >= ? AND criado_ts < ?",
+        (inicio, fim),
+    ).fetchone()
+    pagamentos = conn.execute(
+        "SELECT p.forma_pagamento, SUM(p.valor) FROM pagamentos p JOIN vendas v ON v.id = p.venda_id "
+        "WHERE v.criado_ts >= ? AND v.criado_ts < ? GROUP BY 1",
+        (inicio, fim),
+    ).fetchall()
+    return tuple(vendas), {forma: total for forma, total in pagamentos}
+
+
+class ResumosDeVendasTests(BancoTemporarioTestCase):
+    def setUp(self):
+        super().setUp()
+        self.produto_id = produtos_models.criar_produto("Café", 10.0, 1000, 1)
+        self.operador_id = usuarios_models.criar_usuario(
+            "Operador", "operador", "senha123", "vendedor"
+        )
+
+    def _vender(self, ts, quantidade=1, desconto=0, pagamentos=None, usuario_id=1):
+        carimbo = (ts, datetime.fromtimestamp(ts).isoformat())
+        with patch.object(vendas_models, "agora_carimbo", return_value=carimbo):
+            vendas_models.finalizar_venda(
+                [
+                    {
+                        "produto_id": self.produto_id,
+                        "nome": "Café",
+                        "quantidade": quantidade,
+                        "preco_unitario": 10.0,
+                    }
+                ],
+                usuario_id=usuario_id,
+                cliente_id=None,
+                desconto_valor=desconto,
+                pagamentos=pagamentos,
+            )
+
+    def _popular(self):
+        self._vender(DIA1 + 60)
+        self._vender(DIA1 + 9 * 3600 + 1500, quantidade=3, desconto=2)
+        self._vender(
+            DIA1 + 9 * 3600 + 2700,
+            quantidade=5,
+            pagamentos=[{"forma": "PIX", "valor": 30.0}, {"forma": "Dinheiro", "valor": 20.0}],
+        )
+        self._vender(
+            FIM_DIA1 - 1,
+            usuario_id=self.operador_id,
+            pagamentos=[{"forma": "Cartão Débito", "valor": 10.0}],
+        )
+        self._vender(DIA2 + 13 * 3600, quantidade=2)
+
+    def _conferir(self, inicio, fim):
+        resumo = resumos_models.resumo_periodo(inicio, fim)
+        (vendas, bruto, descontos, liquido), pagamentos = _bruto(inicio, fim)
+        self.assertEqual(resumo.vendas, vendas)
+        self.assertAlmostEqual(resumo.total_bruto, bruto)
+        self.assertAlmostEqual(resumo.descontos, descontos)
+        self.assertAlmostEqual(resumo.total_liquido, liquido)
+        self.assertEqual(dict(resumo.pagamentos), pagamentos)
+        return resumo
+
+    def test_resumo_confere_com_as_vendas_em_qualquer_recorte(self):
+        self._popular()
+        for inicio, fim in (
+            (DIA1, FIM_DIA1),
+            (DIA1, DIA2 + 86400),
+            (DIA1 + 9 * 3600, DIA1 + 10 * 3600),
+            (DIA1 + 9 * 3600 + 1800, DIA2 + 13 * 3600 + 1),
+            (DIA1 + 30, DIA1 + 90),
+            (DIA1 + 61, FIM_DIA1 - 1),
+        ):
+            with self.subTest(inicio=inicio, fim=fim):
+                self._conferir(inicio, fim)
+
+    def test_pagamentos_e_operadores_ordenados(self):
+        self._popular()
+        resumo = self._conferir(DIA1, FIM_DIA1)
+        self.assertEqual(resumo.pagamentos[0], ("Dinheiro", 58.0))
+        self.assertEqual(resumo.por_operador, ((1, 88.0), (self.operador_id, 10.0)))
+        self.assertEqual(
+            vendas_models.pagamentos_por_periodo(DIA1, FIM_DIA1)[0],
+            {"forma_pagamento": "Dinheiro", "total": 58.0},
+        )
+
+    def test_vendas_gravadas_fora_do_checkout_entram_no_resumo(self):
+        self._popular()
+        conn = database.get_connection()
+        conn.execute(
+            "INSERT INTO vendas (codigo, usuario_id, total_bruto, total_liquido, criado_ts) "
+            "VALUES ('IMPORTADA', 1, 7, 7, ?)",
+            (DIA1 + 12 * 3600,),
+        )
+        conn.commit()
+        self.assertEqual(self._conferir(DIA1, FIM_DIA1).vendas, 5)
+
+    def test_reconstruir_reproduz_os_resumos_do_checkout(self):
+        self._popular()
+        conn = database.get_connection()
+        antes = [
+            conn.execute(f"SELECT * FROM {tabela} ORDER BY 1, 2, 3").fetchall()
+            for tabela in ("resumo_vendas_dia", "resumo_vendas_hora")
+        ]
+        self.assertEqual(resumos_models.reconstruir(), 5)
+        depois = [
+            conn.execute(f"SELECT * FROM {tabela} ORDER BY 1, 2, 3").fetchall()
+            for tabela in ("resumo_vendas_dia", "resumo_vendas_hora")
+        ]
+        self.assertEqual(
+            [[tuple(r) for r in t] for t in depois], [[tuple(r) for r in t] for t in antes]
+        )
+
+
+class ResumosBackfillTests(BancoTemporarioTestCase):
+    def test_migracao_resume_as_vendas_existentes(self):
+        conn = database.get_connection()
+        ts = para_epoch("2024-03-05T10:15:00")
+        conn.execute("DROP TABLE resumo_vendas_dia")
+        conn.execute("DROP TABLE resumo_vendas_hora")
+        conn.execute(
+            "INSERT INTO vendas (id, codigo, usuario_id, total_bruto, total_liquido, "
+            "forma_pagamento, criado_ts) VALUES (1, 'V1', 1, 12, 12, 'PIX', ?)",
+            (ts,),
+        )
+        conn.execute(
+            "INSERT INTO pagamentos (venda_id, forma_pagamento, valor, criado_ts) "
+            "VALUES (1, 'PIX', 12, ?)",
+            (ts,),
+        )
+        conn.execute("PRAGMA user_version = 8")
+        conn.commit()
+        migrations.migrate(conn)
+
+        self.assertEqual(conn.execute("SELECT resumida FROM vendas").fetchone()[0], 1)
+        horas = conn.execute("SELECT hora, vendas, pagamentos FROM resumo_vendas_hora").fetchall()
+        self.assertEqual([tuple(r) for r in horas], [(para_epoch("2024-03-05T10:00:00"), 1, 12)])
+        resumo = resumos_models.resumo_periodo(*intervalo_dias("2024-03-05"))
+        self.assertEqual((resumo.vendas, resumo.pagamentos), (1, (("PIX", 12.0),)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+PROJECT_DIR = os.path.join(ROOT_DIR, "meu_sistema_pdv")
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+import flet as ft
+
+import APP.ui
+from APP.core.session import session
+from APP.ui.rotas import RegistroTelas, Rota, ao_revisitar
+
+
+def _usuario(user_id):
+    return {"id": user_id, "username": f"u{user_id}", "nome": "Teste", "role": "admin"}
+
+
+class RegistroTelasTests(unittest.TestCase):
+    def setUp(self):
+        session.login(_usuario(1))
+        self.addCleanup(session.logout)
+        self.revisitar = MagicMock()
+        self.construtor = MagicMock(
+            side_effect=lambda page, **kw: ao_revisitar(ft.View(route="/teste"), self.revisitar)
+        )
+        patcher = patch.object(APP.ui, "build_teste_view", self.construtor, create=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.page = MagicMock()
+        self.telas = RegistroTelas(
+            self.page,
+            {"/teste": {"extra": 1}},
+            rotas={
+                "/teste": Rota("build_teste_view"),
+                "/login": Rota("build_teste_view", cache=False),
+            },
+        )
+
+    def test_revisita_reaproveita_view_e_so_atualiza_dados(self):
+        primeira = self.telas.tela("/teste")
+        segunda = self.telas.tela("/teste")
+
+        self.assertIs(primeira, segunda)
+        self.construtor.assert_called_once_with(self.page, extra=1)
+        self.revisitar.assert_called_once_with()
+        stats = self.telas.stats()
+        self.assertEqual(stats["montagens"]["count"], 1)
+        self.assertEqual(stats["revisitas"]["count"], 1)
+
+    def test_rota_sem_cache_e_sempre_montada(self):
+        self.telas.tela("/login")
+        self.telas.tela("/login")
+        self.assertEqual(self.construtor.call_count, 2)
+        self.revisitar.assert_not_called()
+
+    def test_troca_de_usuario_descarta_as_telas(self):
+        primeira = self.telas.tela("/teste")
+        session.login(_usuario(2))
+
+        self.assertIsNot(self.telas.tela("/teste"), primeira)
+
+    def test_limpar_descarta_as_telas(self):
+        primeira = self.telas.tela("/teste")
+        self.telas.limpar()
+        self.assertIsNot(self.telas.tela("/teste"), primeira)
+
+    def test_rota_desconhecida(self):
+        view = self.telas.tela("/nao-existe")
+        self.assertEqual(view.route, "/nao-existe")
+        self.construtor.assert_not_called()
+
+
+class ImportacaoSobDemandaTests(unittest.TestCase):
+    def test_main_nao_carrega_as_telas(self):
+        codigo = (
+            "import sys\n"
+            "from pathlib import Path\n"
+            "from APP.core import config\n"
+            "config.load_config(Path(sys.argv[1]))\n"
+            "import main\n"
+            "carregados = [m for m in ('APP.ui.vendas_ui', 'APP.ui.relatorios_ui', 'reportlab')"
+            " if m in sys.modules]\n"
+            "print(','.join(carregados))\n"
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            dados = {
+                "database_path": str(tmp_path / "main.db"),
+                "log_path": str(tmp_path / "main.log"),
+                "backup_dir": str(tmp_path / "backup"),
+            }
+            cfg_path = tmp_path / "config.json"
+            cfg_path.write_text(json.dumps(dados), encoding="utf-8")
+            saida = subprocess.run(
+                [sys.executable, "-c", codigo, str(cfg_path)],
+                cwd=PROJECT_DIR,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+        self.assertEqual(saida.stdout.strip(), "")
+
+    def test_construtor_resolvido_na_primeira_leitura(self):
+        from APP.ui.caixa_ui import build_caixa_view
+
+        self.assertIs(APP.ui.build_caixa_view, build_caixa_view)
+        with self.assertRaises(AttributeError):
+            APP.ui.build_inexistente
+
+
+if __name__ == "__main__":
+    unittest.main()
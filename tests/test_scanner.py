@@ -0,0 +1,76 @@
+import os
+import sys
+import unittest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+PROJECT_DIR = os.path.join(ROOT_DIR, "meu_sistema_pdv")
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from APP.ui.scanner import DetectorLeitor
+
+
+class RelogioFalso:
+    def __init__(self):
+        self.agora = 100.0
+
+    def __call__(self):
+        return self.agora
+
+    def avancar(self, ms):
+        self.agora += ms / 1000
+
+
+class DetectorLeitorTests(unittest.TestCase):
+    def setUp(self):
+        self.relogio = RelogioFalso()
+        self.detector = DetectorLeitor(intervalo_max_ms=50, relogio=self.relogio)
+
+    def _digitar(self, texto, intervalo_ms):
+        respostas = []
+        for fim in range(1, len(texto) + 1):
+            self.relogio.avancar(intervalo_ms)
+            respostas.append(self.detector.registrar(texto[:fim]))
+        return respostas
+
+    def _digitar_resto(self, base, resto, intervalo_ms):
+        respostas = []
+        for i in range(1, len(resto) + 1):
+            self.relogio.avancar(intervalo_ms)
+            respostas.append(self.detector.registrar(base + resto[:i]))
+        return respostas
+
+    def test_rajada_de_digitos_e_leitura(self):
+        respostas = self._digitar("7891000100103", 4)
+        self.assertEqual(respostas, [False] + [True] * 12)
+        self.relogio.avancar(5)
+        self.assertTrue(self.detector.eh_leitura("7891000100103"))
+
+    def test_digitacao_humana_nao_e_leitura(self):
+        self.assertFalse(any(self._digitar("7891000100103", 180)))
+        self.assertFalse(self.detector.eh_leitura("7891000100103"))
+
+    def test_pausa_no_meio_quebra_a_rajada(self):
+        self._digitar("7891", 4)
+        self.relogio.avancar(300)
+        self.assertFalse(self.detector.registrar("78910"))
+        self.assertFalse(any(self._digitar_resto("78910", "00100103", 4)))
+        self.assertFalse(self.detector.eh_leitura("7891000100103"))
+
+    def test_texto_com_letras_nao_e_leitura(self):
+        self.assertEqual(self._digitar("cafe", 4), [False] * 4)
+
+    def test_codigo_curto_ou_enter_atrasado(self):
+        self._digitar("1234", 4)
+        self.assertFalse(self.detector.eh_leitura("1234"))
+        self._digitar_resto("1234", "5678", 4)
+        self.relogio.avancar(500)
+        self.assertFalse(self.detector.eh_leitura("12345678"))
+
+    def test_varios_digitos_num_so_evento(self):
+        self.assertTrue(self.detector.registrar("7891000100103"))
+        self.assertTrue(self.detector.eh_leitura("7891000100103"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+PROJECT_DIR = os.path.join(ROOT_DIR, "meu_sistema_pdv")
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from APP.ui.sugestoes import BuscadorSugestoes
+
+
+class BuscadorSugestoesTests(unittest.TestCase):
+    def setUp(self):
+        self.consultas = []
+        self.entregues = []
+        self.entregue = threading.Event()
+
+    def _buscar(self, texto):
+        self.consultas.append(texto)
+        return [texto.upper()]
+
+    def _entregar(self, pedido, resultados):
+        self.entregues.append((pedido.texto, resultados))
+        self.entregue.set()
+
+    def _buscador(self, **kwargs):
+        return BuscadorSugestoes(self._buscar, self._entregar, **kwargs)
+
+    def test_digitacao_rapida_gera_uma_consulta(self):
+        buscador = self._buscador(debounce_ms=80)
+        for texto in ("ar", "arr", "arro", "arroz"):
+            buscador.solicitar(texto)
+            time.sleep(0.01)
+        self.assertTrue(self.entregue.wait(2))
+        time.sleep(0.1)
+        self.assertEqual(self.consultas, ["arroz"])
+        self.assertEqual(self.entregues, [("arroz", ["ARROZ"])])
+
+    def test_resultado_obsoleto_e_descartado(self):
+        liberar = threading.Event()
+        iniciou = threading.Event()
+
+        def buscar_lento(texto):
+            iniciou.set()
+            liberar.wait(2)
+            return [texto]
+
+        buscador = BuscadorSugestoes(buscar_lento, self._entregar, debounce_ms=0)
+        buscador.solicitar("caf")
+        self.assertTrue(iniciou.wait(2))
+        buscador.cancelar()
+        liberar.set()
+        time.sleep(0.1)
+        self.assertEqual(self.entregues, [])
+
+    def test_cancelar_espera_a_entrega_em_andamento(self):
+        entregando = threading.Event()
+        liberar = threading.Event()
+        cancelado = threading.Event()
+
+        def entregar_lento(pedido, resultados):
+            entregando.set()
+            liberar.wait(2)
+            self.entregues.append(pedido.texto)
+
+        buscador = BuscadorSugestoes(self._buscar, entregar_lento, debounce_ms=0)
+        buscador.solicitar("arroz")
+        self.assertTrue(entregando.wait(2))
+        thread = threading.Thread(target=lambda: (buscador.cancelar(), cancelado.set()))
+        thread.start()
+        # O Enter que limpa o campo só segue depois que a entrega terminou.
+        self.assertFalse(cancelado.wait(0.1))
+        liberar.set()
+        thread.join(2)
+        self.assertTrue(cancelado.is_set())
+        self.assertEqual(self.entregues, ["arroz"])
+
+    def test_registra_latencia_ate_o_render(self):
+        buscador = self._buscador(debounce_ms=0)
+        pedido = buscador.solicitar("feijao")
+        self.assertTrue(self.entregue.wait(2))
+        self.assertGreater(buscador.registrar_render(pedido), 0)
+        self.assertEqual(buscador.resumo_latencia()["count"], 1)
+
+    def test_thread_ociosa_termina_e_e_recriada(self):
+        buscador = self._buscador(debounce_ms=0, ocioso_s=0.05)
+        buscador.solicitar("leite")
+        self.assertTrue(self.entregue.wait(2))
+        time.sleep(0.2)
+        self.assertIsNone(buscador._thread)
+        self.entregue.clear()
+        buscador.solicitar("leite condensado")
+        self.assertTrue(self.entregue.wait(2))
+        self.assertEqual(self.consultas, ["leite", "leite condensado"])
+
+
+if __name__ == "__main__":
+    unittest.main()
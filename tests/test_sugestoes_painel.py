@@ -0,0 +1,72 @@
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+PROJECT_DIR = os.path.join(ROOT_DIR, "meu_sistema_pdv")
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from APP.ui.atualizacoes import LoteAtualizacoes
+from APP.ui.sugestoes_painel import COR_DESTAQUE, PainelSugestoes
+from APP.ui.vendas_ui import PDVController
+
+
+def _produtos(n):
+    return [
+        {"id": i, "nome": f"Produto {i}", "codigo_barras": f"78900{i}", "preco_venda": 1.5}
+        for i in range(n)
+    ]
+
+
+class PainelSugestoesTests(unittest.TestCase):
+    def setUp(self):
+        self.escolher = MagicMock()
+        self.painel = PainelSugestoes(6, self.escolher)
+        self.linhas = list(self.painel.controle.controls)
+
+    def test_mostrar_reaproveita_as_linhas(self):
+        self.painel.mostrar(_produtos(6))
+        self.painel.mostrar(_produtos(3))
+
+        self.assertEqual(self.painel.controle.controls, self.linhas)
+        self.assertEqual([c.visible for c in self.linhas], [True] * 3 + [False] * 3)
+        self.assertEqual(self.linhas[2].content.controls[0].value, "Produto 2")
+        self.assertEqual(self.linhas[0].bgcolor, COR_DESTAQUE)
+
+    def test_destacar_devolve_so_as_duas_linhas(self):
+        self.painel.mostrar(_produtos(6))
+
+        alterados = self.painel.destacar(1)
+
+        self.assertEqual(alterados, [self.linhas[0], self.linhas[1]])
+        self.assertIsNone(self.linhas[0].bgcolor)
+        self.assertEqual(self.linhas[1].bgcolor, COR_DESTAQUE)
+        self.assertEqual(self.painel.destacar(1), [])
+
+    def test_clique_informa_a_posicao(self):
+        self.painel.mostrar(_produtos(6))
+        self.linhas[4].on_click(None)
+        self.escolher.assert_called_once_with(4)
+
+
+class PDVSetasSugestoesTests(unittest.TestCase):
+    def test_seta_envia_apenas_as_linhas_afetadas(self):
+        ctrl = object.__new__(PDVController)
+        ctrl.page = MagicMock()
+        ctrl._tela = LoteAtualizacoes(ctrl.page)
+        ctrl.painel_sugestoes = PainelSugestoes(6, MagicMock())
+        linhas = ctrl.painel_sugestoes.controle.controls
+        ctrl.sugestoes_dados = _produtos(6)
+        ctrl.sugestoes_index = 5
+        ctrl.painel_sugestoes.mostrar(ctrl.sugestoes_dados, 5)
+
+        ctrl.mover_sugestao(1)
+
+        self.assertEqual(ctrl.sugestoes_index, 0)
+        ctrl.page.update.assert_called_once_with(linhas[5], linhas[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
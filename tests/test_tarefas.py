@@ -0,0 +1,56 @@
+import os
+import sys
+import threading
+import unittest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+PROJECT_DIR = os.path.join(ROOT_DIR, "meu_sistema_pdv")
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from APP.core.tarefas import Cancelamento, Tarefas
+
+
+class TarefasTests(unittest.TestCase):
+    def setUp(self):
+        self.tarefas = Tarefas(max_workers=2)
+        self.addCleanup(self.tarefas.encerrar)
+
+    def test_resultados_chegam_pela_callback(self):
+        recebidos = []
+        token = Cancelamento()
+        for valor in range(4):
+            self.tarefas.enviar(lambda v=valor: v * 10, token=token, ao_concluir=recebidos.append)
+        self.tarefas.encerrar()
+        self.assertEqual(sorted(recebidos), [0, 10, 20, 30])
+        self.assertEqual(self.tarefas.stats()["concluidas"], 4)
+
+    def test_cancelamento_descarta_resultado_em_voo_e_fila(self):
+        liberar = threading.Event()
+        recebidos = []
+        token = Cancelamento()
+        for _ in range(3):
+            self.tarefas.enviar(liberar.wait, token=token, ao_concluir=recebidos.append)
+        token.cancelar()
+        liberar.set()
+        self.tarefas.encerrar()
+
+        self.assertEqual(recebidos, [])
+        self.assertEqual(self.tarefas.stats()["descartadas"], 3)
+
+    def test_falha_vai_para_ao_falhar(self):
+        erros = []
+
+        def quebrar():
+            raise ValueError("sem banco")
+
+        self.tarefas.enviar(
+            quebrar, token=Cancelamento(), ao_concluir=self.fail, ao_falhar=erros.append
+        )
+        self.tarefas.encerrar()
+        self.assertIsInstance(erros[0], ValueError)
+        self.assertEqual(self.tarefas.stats()["falhas"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
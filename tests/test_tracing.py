@@ -0,0 +1,120 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+PROJECT_DIR = os.path.join(ROOT_DIR, "meu_sistema_pdv")
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from APP.core import config, tracing
+from APP.core.tracing import Rastreador
+
+# Partida a frio num processo novo, com banco vazio (todas as migrações).
+PARTIDA_A_FRIO = """
+import json, sys
+from pathlib import Path
+tmp = Path(sys.argv[1])
+from APP.core import config, tracing
+config.load_config(tmp / "config.json")
+import main
+main.preparar()
+tracing.rastreador.concluir(tmp / "trace.json")
+"""
+
+
+class RastreadorTests(unittest.TestCase):
+    def test_desligado_nao_registra(self):
+        rastreador = Rastreador()
+        with rastreador.span("import"):
+            pass
+        self.assertEqual(rastreador.raiz.filhos, [])
+        self.assertIsNone(rastreador.concluir())
+
+    def test_monta_arvore_e_grava_relatorio(self):
+        rastreador = Rastreador(ativo=True)
+        with rastreador.span("import"):
+            with rastreador.span("flet"):
+                pass
+        with rastreador.span("banco"):
+            pass
+
+        with tempfile.TemporaryDirectory() as tmp:
+            destino = Path(tmp) / "trace.json"
+            raiz = rastreador.concluir(destino)
+            relatorio = json.loads(destino.read_text(encoding="utf-8"))
+
+        self.assertFalse(rastreador.ativo)
+        self.assertEqual([s.nome for s in raiz.filhos], ["import", "banco"])
+        self.assertEqual(relatorio["arvore"]["filhos"][0]["filhos"][0]["nome"], "flet")
+        self.assertGreaterEqual(relatorio["total_ms"], raiz.filhos[0].duracao_ms)
+        self.assertIn("  import:", rastreador.formatar())
+
+    def test_span_de_outra_thread_vai_para_a_raiz(self):
+        rastreador = Rastreador(ativo=True)
+
+        def outra():
+            with rastreador.span("main"):
+                pass
+
+        with rastreador.span("import"):
+            thread = threading.Thread(target=outra)
+            thread.start()
+            thread.join()
+
+        self.assertEqual(sorted(s.nome for s in rastreador.raiz.filhos), ["import", "main"])
+
+
+def _partida_a_frio() -> dict:
+    """Roda a partida num processo novo e devolve o relatório do rastreador."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        dados = {
+            "database_path": str(tmp_path / "frio.db"),
+            "log_path": str(tmp_path / "frio.log"),
+            "backup_dir": str(tmp_path / "backup"),
+        }
+        (tmp_path / "config.json").write_text(json.dumps(dados), encoding="utf-8")
+        subprocess.run(
+            [sys.executable, "-c", PARTIDA_A_FRIO, tmp],
+            cwd=PROJECT_DIR,
+            env={**os.environ, tracing.ENV_VAR: "1"},
+            capture_output=True,
+            check=True,
+        )
+        return json.loads((tmp_path / "trace.json").read_text(encoding="utf-8"))
+
+
+class PartidaAFrioTests(unittest.TestCase):
+    def test_rastreia_todas_as_fases(self):
+        nomes = json.dumps(_partida_a_frio()["arvore"], ensure_ascii=False)
+        for fase in ("import", "flet", "config", "logger", "banco", "dados iniciais"):
+            self.assertIn(fase, nomes)
+
+
+@unittest.skipUnless(
+    os.environ.get("PDV_BUDGET_TEST"), "defina PDV_BUDGET_TEST=1 para medir a partida"
+)
+class OrcamentoPartidaTests(unittest.TestCase):
+    """Falha se a partida a frio passar de `startup.budget_ms` do config.json.
+
+    Depende do tempo de relógio da máquina, por isso só roda quando pedido.
+    """
+
+    def test_partida_a_frio_dentro_do_orcamento(self):
+        orcamento = config.load_config(config.CONFIG_FILE).startup["budget_ms"]
+        relatorio = _partida_a_frio()
+        self.assertLessEqual(
+            relatorio["total_ms"],
+            orcamento,
+            f"partida a frio levou {relatorio['total_ms']:.0f} ms (orçamento {orcamento} ms)",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,195 @@
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from tests.db_helpers import BancoTemporarioTestCase
+
+from APP.core import database
+from APP.core.utils import POPULARIDADE_REBASE_MEIAS_VIDAS, agora_carimbo, hoje_intervalo
+from APP.models import caixa_models, produtos_models, resumos_models, vendas_models
+
+
+class FinalizarVendaTests(BancoTemporarioTestCase):
+    def setUp(self):
+        super().setUp()
+        self.produto_id = produtos_models.criar_produto(
+            "Arroz 5kg", 25.0, 10, 2, codigo_barras="7890000000001"
+        )
+        self.itens = [
+            {
+                "produto_id": self.produto_id,
+                "nome": "Arroz 5kg",
+                "quantidade": 2,
+                "preco_unitario": 25.0,
+            }
+        ]
+
+    def _contar(self, tabela):
+        return database.execute(f"SELECT COUNT(*) AS qtd FROM {tabela}", fetchone=True)["qtd"]
+
+    def test_venda_e_movimento_do_caixa_no_mesmo_commit(self):
+        caixa_id = caixa_models.abrir_caixa(1, 100)
+        venda = vendas_models.finalizar_venda(
+            self.itens,
+            usuario_id=1,
+            cliente_id=None,
+            desconto_valor=5,
+            pagamentos=[{"forma": "PIX", "valor": 45.0}],
+        )
+        self.assertEqual(venda["caixa_id"], caixa_id)
+        self.assertEqual(venda["total"], 45.0)
+        totais = {
+            row["forma_pagamento"]: row["total"]
+            for row in caixa_models.total_por_forma(caixa_id)
+        }
+        self.assertEqual(totais, {"PIX": 45.0})
+        self.assertEqual(produtos_models.obter_produto(self.produto_id)["estoque"], 8)
+
+    def test_sem_caixa_aberto_registra_apenas_a_venda(self):
+        venda = vendas_models.finalizar_venda(
+            self.itens, usuario_id=1, cliente_id=None, desconto_valor=0
+        )
+        self.assertIsNone(venda["caixa_id"])
+        self.assertEqual(self._contar("vendas"), 1)
+        self.assertEqual(self._contar("caixa_movimentos"), 0)
+
+    def test_falha_no_caixa_desfaz_a_venda_inteira(self):
+        caixa_models.abrir_caixa(1, 100)
+        with patch.object(
+            caixa_models, "registrar_movimentos_venda", side_effect=RuntimeError("falha")
+        ):
+            with self.assertRaises(RuntimeError):
+                vendas_models.finalizar_venda(
+                    self.itens, usuario_id=1, cliente_id=None, desconto_valor=0
+                )
+        self.assertEqual(self._contar("vendas"), 0)
+        self.assertEqual(self._contar("venda_itens"), 0)
+        self.assertEqual(self._contar("pagamentos"), 0)
+        self.assertEqual(produtos_models.obter_produto(self.produto_id)["estoque"], 10)
+
+    def test_carrinho_vazio(self):
+        with self.assertRaises(ValueError):
+            vendas_models.finalizar_venda([], usuario_id=1, cliente_id=None, desconto_valor=0)
+
+
+class ContadoresDeVendaTests(BancoTemporarioTestCase):
+    def setUp(self):
+        super().setUp()
+        self.ids = {
+            nome: produtos_models.criar_produto(nome, 10.0, 100, 1)
+            for nome in ("Açúcar Cristal", "Açúcar Refinado", "Açaí")
+        }
+
+    def _vender(self, nome, quantidade, vezes=1):
+        for _ in range(vezes):
+            vendas_models.finalizar_venda(
+                [
+                    {
+                        "produto_id": self.ids[nome],
+                        "nome": nome,
+                        "quantidade": quantidade,
+                        "preco_unitario": 10.0,
+                    }
+                ],
+                usuario_id=1,
+                cliente_id=None,
+                desconto_valor=0,
+            )
+
+    def test_sugestao_mais_vendida_vem_primeiro(self):
+        self.assertEqual(produtos_models.buscar_sugestoes("acu")[0]["nome"], "Açúcar Cristal")
+        self._vender("Açúcar Refinado", 1, vezes=3)
+        for fts in (True, False):
+            with self.subTest(fts=fts), patch.object(
+                produtos_models, "fts_disponivel", return_value=fts
+            ):
+                self.assertEqual(
+                    produtos_models.buscar_sugestoes("acu")[0]["nome"], "Açúcar Refinado"
+                )
+
+    def test_contadores_acompanham_o_checkout(self):
+        self._vender("Açaí", 2, vezes=2)
+        self._vender("Açúcar Cristal", 5)
+        populares = produtos_models.produtos_populares(2)
+        self.assertEqual(
+            [(p["nome"], p["quantidade_vendida"], p["vendas"]) for p in populares],
+            [("Açúcar Cristal", 5, 1), ("Açaí", 4, 2)],
+        )
+        mais_vendidos = vendas_models.produtos_mais_vendidos(*hoje_intervalo(), limite=3)
+        self.assertEqual(
+            [(r["nome"], r["quantidade"]) for r in mais_vendidos],
+            [("Açúcar Cristal", 5), ("Açaí", 4)],
+        )
+
+    def test_periodo_fora_da_meia_noite_agrega_os_itens(self):
+        self._vender("Açaí", 3)
+        inicio, fim = hoje_intervalo()
+        mais_vendidos = vendas_models.produtos_mais_vendidos(inicio + 1, fim + 1)
+        self.assertEqual([(r["nome"], r["quantidade"]) for r in mais_vendidos], [("Açaí", 3)])
+
+    def test_venda_importada_entra_nos_mais_vendidos(self):
+        self._vender("Açaí", 2)
+        ts, criado = agora_carimbo()
+        with database.transaction() as conn:
+            venda_id = conn.execute(
+                "INSERT INTO vendas (codigo, usuario_id, total_liquido, criado_em, criado_ts) "
+                "VALUES ('IMPORTADA', 1, 50, ?, ?)",
+                (criado, ts),
+            ).lastrowid
+            conn.execute(
+                "INSERT INTO venda_itens (venda_id, produto_id, quantidade, preco_unitario, "
+                "total_item) VALUES (?, ?, 5, 10, 50)",
+                (venda_id, self.ids["Açúcar Cristal"]),
+            )
+        inicio, fim = hoje_intervalo()
+        esperado = [("Açúcar Cristal", 5), ("Açaí", 2)]
+        for periodo in ((inicio, fim), (inicio - 86400, fim + 86400)):
+            with self.subTest(periodo=periodo):
+                mais_vendidos = vendas_models.produtos_mais_vendidos(*periodo)
+                self.assertEqual([(r["nome"], r["quantidade"]) for r in mais_vendidos], esperado)
+
+        # Depois de resumida, a venda passa para os contadores por dia.
+        resumos_models.reconstruir()
+        mais_vendidos = vendas_models.produtos_mais_vendidos(inicio, fim)
+        self.assertEqual([(r["nome"], r["quantidade"]) for r in mais_vendidos], esperado)
+
+    def test_popularidade_segue_valendo_decadas_a_frente(self):
+        referencias = []
+        for ano, nome, quantidade in (
+            (2060, "Açúcar Cristal", 50),
+            (2070, "Açaí", 1),
+            (2080, "Açúcar Refinado", 1),
+        ):
+            momento = datetime(ano, 1, 1, 12)
+            with patch.object(
+                vendas_models,
+                "agora_carimbo",
+                return_value=(int(momento.timestamp()), momento.isoformat()),
+            ):
+                self._vender(nome, quantidade)
+            referencias.append(
+                database.execute(
+                    "SELECT valor FROM contadores WHERE nome = 'popularidade_referencia'",
+                    fetchone=True,
+                )["valor"]
+            )
+
+        self.assertEqual(len(set(referencias)), 3)
+        populares = produtos_models.produtos_populares(3)
+        self.assertEqual(
+            [p["nome"] for p in populares], ["Açúcar Refinado", "Açaí", "Açúcar Cristal"]
+        )
+        self.assertLess(populares[0]["popularidade"], 2.0**POPULARIDADE_REBASE_MEIAS_VIDAS)
+
+    def test_venda_desfeita_nao_conta(self):
+        caixa_models.abrir_caixa(1, 0)
+        with patch.object(
+            caixa_models, "registrar_movimentos_venda", side_effect=RuntimeError("falha")
+        ):
+            with self.assertRaises(RuntimeError):
+                self._vender("Açaí", 1)
+        self.assertEqual(produtos_models.produtos_populares(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()